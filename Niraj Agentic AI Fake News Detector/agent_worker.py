@@ -0,0 +1,56 @@
+# agent_worker.py
+"""
+Runs the monitoring agent as its own process (multi-worker mode, see serve.py).
+Verifications are broadcast through the Socket.IO message queue and dashboard updates go to
+the shared store, so web workers pick them up without sharing memory with the agent.
+
+    SHARED_STATE=1 SOCKETIO_MESSAGE_QUEUE=sqlite:///socketio_bus.db python agent_worker.py [--agent simple|multimodal]
+    kill -USR2 <pid>    # write a PROFILE_SECONDS sampling profile to PROFILE_DIR (see profiler.py)
+"""
+
+import os
+import time
+import signal
+import asyncio
+import argparse
+
+from shared_state import external_emitter, SHARED_STATE_ENABLED
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SECONDS = float(os.getenv("PROFILE_SECONDS", "30"))
+
+def _profile_on_signal(signum, frame):
+    # kill -USR2 <pid>: sample the agent for PROFILE_SECONDS and write collapsed stacks
+    import profiler
+    path = os.path.join(PROFILE_DIR, f"agent-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.folded")
+    profiler.profile_to_file(path, PROFILE_SECONDS)
+
+def main(agent: str = "simple"):
+    if hasattr(signal, "SIGUSR2"):
+        signal.signal(signal.SIGUSR2, _profile_on_signal)
+    if not SHARED_STATE_ENABLED:
+        print("⚠️ SHARED_STATE is not enabled; web workers won't see this agent's updates")
+    emitter = external_emitter()
+    if emitter is None:
+        print("⚠️ SOCKETIO_MESSAGE_QUEUE not set; live broadcasts are disabled")
+    else:
+        import publisher
+        import publisher_realtime
+        publisher.init_socketio(emitter)
+        publisher_realtime.init_socketio(emitter)
+
+    if agent == "multimodal":
+        from multimodal_agent import run_agent
+        asyncio.run(run_agent())
+    else:
+        from simple_agent import run_simple_agent
+        asyncio.run(run_simple_agent())
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Monitoring agent as a standalone process")
+    ap.add_argument("--agent", choices=["simple", "multimodal"], default=os.getenv("AGENT_KIND", "simple"))
+    args = ap.parse_args()
+    try:
+        main(args.agent)
+    except KeyboardInterrupt:
+        pass
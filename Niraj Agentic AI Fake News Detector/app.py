@@ -9,7 +9,83 @@ import os
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-socketio = SocketIO(app, cors_allowed_origins="*")
+# In multi-worker mode (serve.py) SOCKETIO_MESSAGE_QUEUE lets every worker broadcast to every client
+from shared_state import socketio_options, get_shared_state, SHARED_STATE_ENABLED
+socketio = SocketIO(app, cors_allowed_origins="*", **socketio_options())
+
+import time
+import metrics
+import hmac
+import tracing
+from rules import get_rule_matcher
+from http_cache import cached_json, dumps, register_version, version
+from flask import g, Response
+import assets
+from work_scheduler import get_scheduler, INTERACTIVE, REVIEW
+
+# hashed, precompressed JS/CSS (python assets.py build); templates link them with asset_url()
+assets.init_app(app)
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def _record_request(response):
+    start = getattr(g, "request_start", None)
+    if start is not None:
+        # label by route pattern, not raw path, to keep cardinality bounded
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.HTTP_REQUEST_SECONDS.labels(endpoint, request.method).observe(time.perf_counter() - start)
+        metrics.HTTP_RESPONSES.labels(endpoint, str(response.status_code)).inc()
+    return response
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/debug/traces')
+def debug_traces():
+    """Recent per-item / per-claim traces, slowest first (?limit=20&min_ms=0&name=item)"""
+    limit = min(request.args.get('limit', 20, type=int), tracing.TRACE_BUFFER_SIZE)
+    min_ms = request.args.get('min_ms', 0.0, type=float)
+    traces = tracing.recent_traces(limit=limit, min_ms=min_ms, name=request.args.get('name'))
+    return jsonify({'enabled': tracing.TRACE_ENABLED, 'count': len(traces), 'traces': traces})
+
+@app.route('/debug/traces/<trace_id>')
+def debug_trace(trace_id):
+    trace = tracing.get_trace(trace_id)
+    if trace is None:
+        return jsonify({'error': 'Trace not found (expired from the buffer?)'}), 404
+    return jsonify(trace)
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+@app.route('/admin/profile', methods=['POST'])
+def admin_profile():
+    """Sample this worker for ?seconds=10 (&interval_ms=5&format=collapsed|json&idle=0)"""
+    token = request.headers.get('X-Admin-Token') or request.args.get('token', '')
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Profiling disabled: set ADMIN_TOKEN'}), 403
+    if not hmac.compare_digest(token, ADMIN_TOKEN):
+        return jsonify({'error': 'Invalid admin token'}), 401
+
+    import profiler
+    try:
+        result = profiler.profile(seconds=request.args.get('seconds', 10.0, type=float),
+                                  interval_ms=request.args.get('interval_ms', profiler.PROFILE_INTERVAL_MS, type=float),
+                                  include_idle=request.args.get('idle', '0') == '1')
+    except profiler.ProfilerUnavailable as e:
+        return jsonify({'error': str(e)}), 501
+    if result is None:
+        return jsonify({'error': 'A profile is already running in this worker'}), 409
+    if request.args.get('format', 'collapsed') == 'json':
+        summary = result.summary()
+        summary['pid'] = os.getpid()
+        summary['collapsed'] = result.collapsed()
+        return jsonify(summary)
+    return Response(result.collapsed(), mimetype='text/plain',
+                    headers={'X-Profile-Samples': str(result.samples), 'X-Profile-Pid': str(os.getpid())})
 
 # Initialize socketio in publisher
 try:
@@ -71,8 +147,12 @@ def analyze_text():
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
+        # optional "priority": "review" - the human review desk's Re-check button
+        # (human_review.js recheckClaim); anything else is interactive
+        work_class = REVIEW if data.get('priority') == REVIEW else INTERACTIVE
+        
         # Use hybrid verification
-        verification = hybrid_verify_claim(text)
+        verification = hybrid_verify_claim(text, work_class)
         
         return jsonify({
             'claims': [text],
@@ -83,81 +163,55 @@ def analyze_text():
         print(f"❌ Error in /api/analyze: {e}")
         return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
 
-def hybrid_verify_claim(claim):
+_TIER_KNOWN = metrics.VERIFY_TIER_SECONDS.labels("known_fact")
+_TIER_EXTERNAL = metrics.VERIFY_TIER_SECONDS.labels("external_apis")
+_TIER_PATTERN = metrics.VERIFY_TIER_SECONDS.labels("pattern_analysis")
+
+@tracing.traced("hybrid_verify_claim", root=True)
+def hybrid_verify_claim(claim, work_class=INTERACTIVE):
     """Hybrid verification combining multiple approaches"""
     print(f"🔄 Starting hybrid verification for: {claim}")
+    start = time.perf_counter()
     
     # 1. Check known facts first (fastest)
-    known_result = check_known_facts(claim)
+    with tracing.span("known_facts"):
+        known_result = check_known_facts(claim)
     if known_result is not None:
         print("✅ Known fact match")
+        _TIER_KNOWN.observe(time.perf_counter() - start)
         return build_verification_result(known_result, "KNOWN_FACT", 0.95)
     
-    # 2. Check external APIs
-    try:
-        api_result = asyncio.run(external_factcheck_apis(claim))
-        if api_result and api_result.get('score') != 0:
-            print("✅ External API result")
-            return api_result
-    except Exception as e:
-        print(f"⚠️ External API failed: {e}")
+    # 2. Check external APIs (shares quota with the agent; see work_scheduler.py)
+    with get_scheduler().slot(work_class) as admitted:
+        if admitted:
+            try:
+                with tracing.span("external_apis"):
+                    api_result = asyncio.run(external_factcheck_apis(claim))
+                if api_result and api_result.get('score') != 0:
+                    print("✅ External API result")
+                    _TIER_EXTERNAL.observe(time.perf_counter() - start)
+                    return api_result
+            except Exception as e:
+                print(f"⚠️ External API failed: {e}")
+        else:
+            print("⏳ Saturated: skipping external APIs")
     
     # 3. Use enhanced pattern analysis
     print("🔍 Using enhanced pattern analysis")
-    return enhanced_pattern_analysis(claim)
+    with tracing.span("pattern_analysis"):
+        result = enhanced_pattern_analysis(claim)
+    if not admitted:
+        result['degraded'] = True   # local tiers only; the client may retry later
+    _TIER_PATTERN.observe(time.perf_counter() - start)
+    return result
 
 # ===== KNOWLEDGE BASE =====
 
 def check_known_facts(claim):
-    """Check against known facts database"""
-    claim_lower = claim.lower().strip()
-    
-    # Geography facts
-    geography_facts = {
-        "delhi is capital of india": True,
-        "new delhi is capital of india": True,
-        "mumbai is capital of india": False,
-        "tokyo is capital of japan": True,
-        "beijing is capital of china": True,
-        "washington dc is capital of usa": True,
-        "london is capital of uk": True,
-        "paris is capital of france": True,
-    }
-    
-    # Political facts
-    political_facts = {
-        "narendra modi is prime minister of india": True,
-        "prime minister of india is narendra modi": True,
-        "president of india is": True,
-        "joe biden is president of usa": True,
-    }
-    
-    # Scientific facts
-    scientific_facts = {
-        "earth is round": True,
-        "earth is flat": False,
-        "water boils at 100 degrees celsius": True,
-        "gravity exists": True,
-        "vaccines are effective": True,
-        "climate change is real": True,
-    }
-    
-    # Known misinformation
-    known_falsehoods = {
-        "vaccines cause autism": False,
-        "covid is a hoax": False,
-        "5g causes coronavirus": False,
-        "moon landing was fake": False,
-        "holocaust didn't happen": False,
-        "chemtrails are real": False,
-    }
-    
-    # Check all knowledge bases
-    all_facts = {**geography_facts, **political_facts, **scientific_facts, **known_falsehoods}
-    
-    for fact, truth_value in all_facts.items():
-        if fact in claim_lower:
-            return truth_value
+    """Check against known facts database (tables in rules.py)"""
+    known = get_rule_matcher().match(claim.lower().strip())["known_facts"]
+    if known:
+        return bool(known[0][1])   # first fact in table order
     
     return None  # Unknown fact
 
@@ -254,57 +308,19 @@ def enhanced_pattern_analysis(claim):
     claim_lower = claim.lower()
     score = 0.0
     
-    # First, check for basic factual statements that should be TRUE
-    basic_truths = {
-        "mumbai is in india": 0.9,
-        "india is a country": 0.9,
-        "delhi is capital of india": 0.9,
-        "new delhi is capital of india": 0.9,
-        "earth is round": 0.9,
-        "water boils at 100 degrees": 0.8,
-        "gravity exists": 0.9,
-        "vaccines are effective": 0.8,
-        "climate change is real": 0.8,
-    }
-    
-    # Check basic truths first
-    for truth, truth_score in basic_truths.items():
-        if truth in claim_lower:
-            return build_verification_result(truth_score, "BASIC_FACT", 0.9)
-    
-    # Credibility indicators
-    credible_patterns = {
-        "study shows": 0.7, "research indicates": 0.8, "according to study": 0.7,
-        "scientists found": 0.6, "evidence shows": 0.8, "data indicates": 0.7,
-        "official report": 0.6, "medical journal": 0.7, "clinical trial": 0.8,
-        "peer-reviewed": 0.9, "scientific consensus": 0.8,
-        "university of": 0.5, "research institute": 0.6,
-        "government announces": 0.4, "official statement": 0.4,
-    }
+    # One pass over the claim finds every phrase from every table (rules.py)
+    matches = get_rule_matcher().match(claim_lower)
     
-    # Misinformation indicators
-    false_patterns = {
-        "miracle cure": -0.9, "secret they don't want you to know": -0.8,
-        "government cover-up": -0.7, "big pharma": -0.6, 
-        "mainstream media lying": -0.7, "100% effective": -0.8,
-        "instant cure": -0.9, "hidden truth": -0.7,
-        "conspiracy": -0.5, "they're hiding": -0.6,
-        "breakthrough doctors hate": -0.8, "lose weight fast": -0.6,
-        "cure they don't want you to know": -0.8,
-    }
+    # First, check for basic factual statements that should be TRUE
+    if matches["basic_truths"]:
+        return build_verification_result(matches["basic_truths"][0][1], "BASIC_FACT", 0.9)
     
     # Crisis misinformation (extra penalty) - ONLY apply when combined with false patterns
-    crisis_terms = ["death", "kills", "dead", "died", "dangerous", "emergency", "outbreak"]
-    crisis_count = sum(1 for term in crisis_terms if term in claim_lower)
-    
-    # Calculate scores
-    for pattern, weight in credible_patterns.items():
-        if pattern in claim_lower:
-            score += weight
+    crisis_count = len(matches["crisis"])
     
-    for pattern, weight in false_patterns.items():
-        if pattern in claim_lower:
-            score += weight
+    # Calculate scores: credibility and misinformation indicators
+    for _, weight in matches["credible"] + matches["false"]:
+        score += weight
     
     # Extra penalty for crisis misinformation ONLY if already suspicious
     if crisis_count > 0 and score < -0.3:
@@ -378,23 +394,37 @@ def get_analysis_explanation(score, method):
 
 # ===== KEEP EXISTING ENDPOINTS =====
 
+if SHARED_STATE_ENABLED:
+    # the agent runs in another process; its bump("updates") never reaches this one
+    register_version("updates", lambda: get_shared_state().latest_update_id())
+
+def recent_updates(n=10):
+    if SHARED_STATE_ENABLED:
+        return get_shared_state().recent_updates(n)
+    return latest_updates[-n:]  # a copy: the agent thread keeps appending to the list
+
 @app.route('/api/updates')
+@cached_json("updates")
 def get_updates():
-    return jsonify({'updates': latest_updates[-10:]})  # Only recent updates
+    return jsonify({'updates': recent_updates(10)})  # Only recent updates
 
 @app.route('/api/trends')
+@cached_json()
 def get_trends():
+    return jsonify({'trends': trends_panel()})
+
+def trends_panel():
     # Mock trends data
-    trends = [
+    return [
         {'topic': 'Health Misinformation', 'mentions': 45, 'falseClaims': 38},
         {'topic': 'Political Conspiracies', 'mentions': 32, 'falseClaims': 28},
         {'topic': 'Financial Scams', 'mentions': 21, 'falseClaims': 18},
         {'topic': 'Technology Fears', 'mentions': 18, 'falseClaims': 15},
         {'topic': 'Entertainment Rumors', 'mentions': 12, 'falseClaims': 10}
     ]
-    return jsonify({'trends': trends})
 
 @app.route('/api/claims')
+@cached_json("claims")
 def get_claims():
     try:
         # Get filter parameters from request
@@ -404,27 +434,7 @@ def get_claims():
         
         print(f"API Request - Category: {category_filter}, Status: {status_filter}, Time: {time_period}")
         
-        # Filter claims based on parameters
-        filtered_claims = SAMPLE_CLAIMS.copy()
-        
-        # Apply category filter
-        if category_filter != 'all':
-            filtered_claims = [claim for claim in filtered_claims if claim['category'].lower() == category_filter.lower()]
-        
-        # Apply status filter
-        if status_filter != 'all':
-            filtered_claims = [claim for claim in filtered_claims if claim['status'] == status_filter]
-        
-        # Apply time period filter (simplified)
-        if time_period != 'all':
-            # In a real implementation, you would filter by actual dates
-            # For demo, we'll just return a subset based on the time period
-            if time_period == '7d':
-                filtered_claims = filtered_claims[:3]  # Simulate recent claims
-            elif time_period == '30d':
-                filtered_claims = filtered_claims[:6]  # Simulate last month claims
-            elif time_period == '90d':
-                filtered_claims = filtered_claims  # All claims (simulated)
+        filtered_claims = filter_claims(category_filter, status_filter, time_period)
         
         print(f"API Response: {len(filtered_claims)} claims")
         return jsonify({'claims': filtered_claims})
@@ -433,6 +443,31 @@ def get_claims():
         print(f"Error in /api/claims: {e}")
         return jsonify({'error': str(e), 'claims': []}), 500
 
+def filter_claims(category_filter='all', status_filter='all', time_period='all'):
+    # Filter claims based on parameters
+    filtered_claims = SAMPLE_CLAIMS.copy()
+    
+    # Apply category filter
+    if category_filter != 'all':
+        filtered_claims = [claim for claim in filtered_claims if claim['category'].lower() == category_filter.lower()]
+    
+    # Apply status filter
+    if status_filter != 'all':
+        filtered_claims = [claim for claim in filtered_claims if claim['status'] == status_filter]
+    
+    # Apply time period filter (simplified)
+    if time_period != 'all':
+        # In a real implementation, you would filter by actual dates
+        # For demo, we'll just return a subset based on the time period
+        if time_period == '7d':
+            filtered_claims = filtered_claims[:3]  # Simulate recent claims
+        elif time_period == '30d':
+            filtered_claims = filtered_claims[:6]  # Simulate last month claims
+        elif time_period == '90d':
+            filtered_claims = filtered_claims  # All claims (simulated)
+    
+    return filtered_claims
+
 @app.route('/api/claims/detailed')
 def get_detailed_claims():
     """Get detailed claims data for the detailed view"""
@@ -467,10 +502,13 @@ def get_detailed_claims():
     return jsonify({'claims': detailed_claims})
 
 @app.route('/api/insights')
+@cached_json()
 def get_insights():
     # Get filter parameters
     time_period = request.args.get('time_period', '30d')
-    
+    return jsonify({'insights': insights_panel(time_period)})
+
+def insights_panel(time_period='30d'):
     # Filter insights based on time period (simplified)
     if time_period == '7d':
         filtered_insights = SAMPLE_INSIGHTS[:2]  # Recent insights
@@ -481,9 +519,10 @@ def get_insights():
     else:
         filtered_insights = SAMPLE_INSIGHTS
     
-    return jsonify({'insights': filtered_insights})
+    return filtered_insights
 
 @app.route('/api/insights/all')
+@cached_json()
 def get_all_insights():
     """Get all insights for the insights view"""
     time_period = request.args.get('time_period', 'all')
@@ -502,10 +541,13 @@ def get_all_insights():
     return jsonify({'insights': all_insights})
 
 @app.route('/api/sources/analysis')
+@cached_json()
 def get_sources_analysis():
     """Get detailed sources analysis"""
     time_period = request.args.get('time_period', '30d')
-    
+    return jsonify(sources_panel(time_period))
+
+def sources_panel(time_period='30d'):
     sources_data = {
         'social_media': {
             'total_claims': 1250,
@@ -538,7 +580,7 @@ def get_sources_analysis():
         }
     }
     
-    return jsonify(sources_data)
+    return sources_data
 
 # Add to app.py after existing routes
 @app.route('/api/crisis-alerts')
@@ -569,14 +611,56 @@ def get_crisis_alerts():
     return jsonify({'alerts': crisis_alerts})
 
 @app.route('/api/crisis-stats')
+@cached_json()
 def get_crisis_stats():
     """Get crisis-specific statistics"""
-    return jsonify({
+    return jsonify(crisis_stats_panel())
+
+def crisis_stats_panel():
+    return {
         'active_crises': 3,
         'crisis_claims_today': 47,
         'high_risk_alerts': 8,
         'response_time_minutes': 28
-    })
+    }
+
+# ===== DASHBOARD BUNDLE =====
+# panel -> builder(filters); each panel has the same shape as its standalone endpoint
+DASHBOARD_PANELS = {
+    'claims': lambda f: filter_claims(f['category'], f['status'], f['time_period']),
+    'insights': lambda f: insights_panel(f['time_period']),
+    'trends': lambda f: trends_panel(),
+    'sources': lambda f: sources_panel(f['time_period']),
+    'crisis_stats': lambda f: crisis_stats_panel(),
+    'updates': lambda f: recent_updates(10),
+}
+# wrappers the dashboard scripts already know how to render
+_PANEL_KEYS = {'claims': 'claims', 'insights': 'insights', 'trends': 'trends', 'updates': 'updates'}
+
+@app.route('/api/dashboard/bundle')
+@cached_json("claims", "updates")
+def get_dashboard_bundle():
+    """All requested dashboard panels for one filter set, in one response.
+    ?panels=claims,insights (default: all) &category= &status= &time_period=
+    """
+    requested = [p for p in request.args.get('panels', ','.join(DASHBOARD_PANELS)).split(',') if p]
+    unknown = [p for p in requested if p not in DASHBOARD_PANELS]
+    if unknown:
+        return jsonify({'error': f"unknown panels: {', '.join(unknown)}", 'available': list(DASHBOARD_PANELS)}), 400
+    filters = {
+        'category': request.args.get('category', 'all'),
+        'status': request.args.get('status', 'all'),
+        'time_period': request.args.get('time_period', 'all'),
+    }
+    # versions are read before the panels, so the snapshot is never newer than its tag
+    versions = {'claims': version('claims'), 'updates': version('updates')}
+    panels = {}
+    for name in requested:
+        data = DASHBOARD_PANELS[name](filters)
+        panels[name] = {_PANEL_KEYS[name]: data} if name in _PANEL_KEYS else data
+    body = {'panels': panels, 'filters': filters, 'versions': versions,
+            'generated_at': datetime.now().isoformat()}
+    return Response(dumps(body), mimetype='application/json')
 
 @app.route('/api/export')
 def export_data():
@@ -635,11 +719,12 @@ def start_agent():
         print(f"Agent error: {e}")
 
 if __name__ == '__main__':
-    # Start agent in background
-    try:
-        agent_thread = threading.Thread(target=start_agent, daemon=True)
-        agent_thread.start()
-    except Exception as e:
-        print(f"Could not start agent: {e}")
+    # Start agent in background (serve.py runs it as its own process instead)
+    if os.getenv("AGENT_IN_PROCESS", "1") == "1":
+        try:
+            agent_thread = threading.Thread(target=start_agent, daemon=True, name="agent")
+            agent_thread.start()
+        except Exception as e:
+            print(f"Could not start agent: {e}")
     
     socketio.run(app, debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,136 @@
+# artifacts.py
+"""
+Precompiled, memory-mapped artifacts for warm starts.
+Compiled matchers and indexes are written once into flat binary files and mapped read-only by
+every process, so startup is a header parse instead of a rebuild and workers share the pages
+through the OS page cache instead of each holding a private copy.
+- write_artifact(path, kind, digest, arrays, meta)   # atomic; arrays are array.array
+- open_artifact(path, kind, digest=None) -> Artifact or None (missing / other version / stale)
+- Artifact.arrays[name] is a zero-copy memoryview over the mapping
+Layout: magic, u32 header length, JSON header (kind, format, digest, meta, array table), then
+8-byte aligned arrays. The format version is also in the file name, so old and new code can
+run side by side during a deploy.
+
+    python artifacts.py build [rules] [images]     # run before starting workers (serve.py does)
+    python artifacts.py info
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import array
+import struct
+import tempfile
+from typing import Dict, Optional
+
+FORMAT_VERSION = 1
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts"))
+# build in-process when an artifact is missing or stale, and save it for the next start
+ARTIFACT_AUTOBUILD = os.getenv("ARTIFACT_AUTOBUILD", "1") == "1"
+_MAGIC = b"SBART\x00\x00\x01"
+
+def artifact_path(kind: str) -> str:
+    return os.path.join(ARTIFACT_DIR, f"{kind}.v{FORMAT_VERSION}.bin")
+
+class Artifact:
+    def __init__(self, path: str, mm: mmap.mmap, header: Dict, header_len: int):
+        self.path = path
+        self.kind = header["kind"]
+        self.digest = header.get("digest")
+        self.meta = header.get("meta", {})
+        self.created = header.get("created")
+        self.size = len(mm)
+        self._mm = mm                   # kept open for the life of the process
+        view = memoryview(mm)
+        start = _data_start(header_len)
+        self.arrays = {name: view[start + offset:start + offset + nbytes].cast(typecode)
+                       for name, (offset, typecode, nbytes) in header["arrays"].items()}
+
+def _data_start(header_len: int) -> int:
+    start = len(_MAGIC) + 4 + header_len
+    return start + (-start % 8)
+
+def write_artifact(path: str, kind: str, digest: str, arrays: Dict[str, array.array], meta: Optional[Dict] = None):
+    table, offset = {}, 0               # offsets are relative to the 8-byte aligned data start
+    for name, arr in arrays.items():
+        nbytes = len(arr) * arr.itemsize
+        table[name] = [offset, arr.typecode, nbytes]
+        offset += nbytes + (-nbytes % 8)
+    header = json.dumps({"kind": kind, "format": FORMAT_VERSION, "digest": digest, "created": time.time(),
+                         "byteorder": sys.byteorder, "meta": meta or {}, "arrays": table}).encode("utf-8")
+    start = _data_start(len(header))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_MAGIC + struct.pack("<I", len(header)) + header)
+            f.write(b"\0" * (start - f.tell()))
+            for name, arr in arrays.items():
+                f.write(arr.tobytes())
+                f.write(b"\0" * (-f.tell() % 8))
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)           # workers with the old file mapped keep reading the old inode
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def open_artifact(path: str, kind: str, digest: Optional[str] = None) -> Optional[Artifact]:
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        if mm[:len(_MAGIC)] != _MAGIC:
+            raise ValueError("bad magic")
+        (length,) = struct.unpack_from("<I", mm, len(_MAGIC))
+        header = json.loads(bytes(mm[len(_MAGIC) + 4:len(_MAGIC) + 4 + length]))
+        if header.get("format") != FORMAT_VERSION or header.get("kind") != kind:
+            raise ValueError("other format")
+        if header.get("byteorder") != sys.byteorder:
+            raise ValueError("other byte order")
+        if digest is not None and header.get("digest") != digest:
+            raise ValueError("stale")
+        end = _data_start(length) + max((off + n for off, _, n in header["arrays"].values()), default=0)
+        if end > len(mm):
+            raise ValueError("truncated")
+        return Artifact(path, mm, header, length)
+    except (ValueError, KeyError, TypeError, struct.error):
+        mm.close()
+        return None
+
+def build_all(kinds=("rules", "images")) -> Dict[str, float]:
+    """Rebuild the named artifacts; returns build seconds per kind."""
+    timings = {}
+    for kind in kinds:
+        start = time.perf_counter()
+        if kind == "rules":
+            import rules
+            rules.build_artifact()
+        elif kind == "images":
+            import image_index
+            image_index.build_artifact()
+        else:
+            raise ValueError(f"unknown artifact kind: {kind}")
+        timings[kind] = time.perf_counter() - start
+        print(f"📦 Built {kind} artifact in {timings[kind] * 1000:.0f} ms -> {artifact_path(kind)}")
+    return timings
+
+def info() -> Dict:
+    out = {}
+    for kind in ("rules", "images"):
+        art = open_artifact(artifact_path(kind), kind)
+        out[kind] = None if art is None else {
+            "path": art.path, "bytes": art.size, "digest": art.digest, "created": art.created, "meta": art.meta,
+        }
+    return out
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        build_all(tuple(sys.argv[2:]) or ("rules", "images"))
+    else:
+        print(json.dumps(info(), indent=2))
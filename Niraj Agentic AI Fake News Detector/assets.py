@@ -0,0 +1,292 @@
+# assets.py
+"""
+Content-hashed static assets with precompressed variants and far-future caching.
+- build(): minify static/js/*.js and static/css/*.css into static/dist/<dir>/<name>.<hash>.<ext>,
+  plus .gz (and .br if the `brotli` package is installed), then write static/dist/manifest.json
+- init_app(app): registers the asset_url() template helper and the /assets/<path> route
+- {{ asset_url('js/dashboard.js') }} -> /assets/js/dashboard.3f2a9c1be0.js when it is built and
+  current, otherwise the plain /static/ URL (so development works without a build step)
+- /assets/ responses are immutable for a year and served from the .br/.gz file the client accepts
+A changed source gets a new name, so a deploy never needs a cache purge.
+
+    python assets.py build          # run before starting workers (serve.py does)
+    python assets.py info
+"""
+
+import os
+import re
+import sys
+import json
+import gzip
+import hashlib
+import mimetypes
+import tempfile
+from typing import Dict, Optional
+
+from lazy_imports import optional
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(_HERE, "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_PATH = os.path.join(DIST_DIR, "manifest.json")
+ASSET_MAX_AGE = int(os.getenv("ASSET_MAX_AGE", str(365 * 24 * 3600)))
+ASSET_SOURCES = ("js", "css")          # subdirectories of static/ that get built
+
+# ===== MINIFIERS =====
+
+def minify_css(source: str) -> str:
+    """Drops comments and redundant whitespace; strings and url(...) are copied untouched."""
+    out, i, n = [], 0, len(source)
+    while i < n:
+        ch = source[i]
+        if ch in "\"'":
+            end = i + 1
+            while end < n and source[end] != ch:
+                end += 2 if source[end] == "\\" else 1
+            out.append(source[i:end + 1])
+            i = end + 1
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif ch.isspace():
+            while i < n and source[i].isspace():
+                i += 1
+            if out and out[-1] != " ":
+                out.append(" ")
+        else:
+            out.append(ch)
+            i += 1
+    css = "".join(out)
+    # only around punctuation where whitespace never matters (not ":" - "a :hover" != "a:hover")
+    css = re.sub(r" ?([{};,>]) ?", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+# a "/" after one of these (or at the start) begins a regex literal, otherwise it is division
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = ("return", "typeof", "case", "in", "of", "void", "delete")
+
+def minify_js(source: str) -> str:
+    """
+    Conservative minifier: removes comments, indentation, trailing spaces and blank lines.
+    Line breaks are kept (so automatic semicolon insertion is unaffected), as is everything
+    inside string, template and regex literals.
+    """
+    out, i, n = [], 0, len(source)
+    templates = []                      # brace depth at each open ${ ... } of a template literal
+    depth = 0
+
+    def regex_allowed():
+        tail = "".join(out[-8:]).rstrip()
+        if not tail or tail[-1] in _REGEX_PRECEDERS:
+            return True
+        return re.search(r"(?:^|[^\w$])(?:%s)$" % "|".join(_REGEX_KEYWORDS), tail) is not None
+
+    def copy_template(start):
+        # copies from the opening ` (or the } closing a ${...}) up to the closing ` or the next ${
+        i = start + 1
+        while i < n:
+            if source[i] == "\\":
+                i += 2
+            elif source[i] == "`":
+                out.append(source[start:i + 1])
+                return i + 1
+            elif source.startswith("${", i):
+                out.append(source[start:i + 2])
+                templates.append(depth)
+                return i + 2
+            else:
+                i += 1
+        out.append(source[start:])
+        return n
+
+    while i < n:
+        ch = source[i]
+        if ch in "\"'":
+            end = i + 1
+            while end < n and source[end] != ch and source[end] != "\n":
+                end += 2 if source[end] == "\\" else 1
+            out.append(source[i:end + 1])
+            i = end + 1
+        elif ch == "`":
+            i = copy_template(i)
+        elif ch == "}" and templates and templates[-1] == depth:
+            templates.pop()
+            i = copy_template(i)
+        elif source.startswith("//", i):
+            end = source.find("\n", i)
+            i = n if end < 0 else end
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif ch == "/" and regex_allowed():
+            end, in_class = i + 1, False
+            while end < n and source[end] != "\n":
+                if source[end] == "\\":
+                    end += 2
+                    continue
+                if source[end] == "[":
+                    in_class = True
+                elif source[end] == "]":
+                    in_class = False
+                elif source[end] == "/" and not in_class:
+                    break
+                end += 1
+            out.append(source[i:end + 1])
+            i = end + 1
+        elif ch == "\n" or ch == "\r":
+            while out and out[-1] in (" ", "\t"):
+                out.pop()
+            if out and out[-1] != "\n":
+                out.append("\n")
+            i += 1
+            while i < n and source[i] in " \t\r\n":
+                i += 1
+        elif ch in " \t":
+            if out and out[-1] not in (" ", "\n"):
+                out.append(" ")
+            i += 1
+        else:
+            if ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+            out.append(ch)
+            i += 1
+    return "".join(out).strip() + "\n"
+
+_MINIFIERS = {".js": minify_js, ".css": minify_css}
+
+# ===== BUILD =====
+
+def _write(path: str, data: bytes):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+def build(static_dir: str = STATIC_DIR, dist_dir: str = DIST_DIR) -> Dict:
+    """Minify, hash and precompress every source asset; returns the manifest."""
+    brotli = optional("brotli")
+    manifest = {"assets": {}}
+    for sub in ASSET_SOURCES:
+        src_dir = os.path.join(static_dir, sub)
+        if not os.path.isdir(src_dir):
+            continue
+        os.makedirs(os.path.join(dist_dir, sub), exist_ok=True)
+        for name in sorted(os.listdir(src_dir)):
+            stem, ext = os.path.splitext(name)
+            if ext not in _MINIFIERS:
+                continue
+            with open(os.path.join(src_dir, name), "rb") as f:
+                raw = f.read()
+            body = _MINIFIERS[ext](raw.decode("utf-8")).encode("utf-8")
+            digest = hashlib.sha256(body).hexdigest()[:10]
+            built = f"{sub}/{stem}.{digest}{ext}"
+            target = os.path.join(dist_dir, built)
+            _write(target, body)
+            _write(target + ".gz", gzip.compress(body, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _write(target + ".br", brotli.compress(body, quality=11))
+            manifest["assets"][f"{sub}/{name}"] = {
+                "file": built,
+                "source_sha": hashlib.sha256(raw).hexdigest(),
+                "bytes": len(raw), "minified": len(body),
+            }
+    _write(os.path.join(dist_dir, "manifest.json"), json.dumps(manifest, indent=2).encode("utf-8"))
+    _prune(dist_dir, manifest)
+    total = sum(a["bytes"] for a in manifest["assets"].values())
+    minified = sum(a["minified"] for a in manifest["assets"].values())
+    print(f"📦 Built {len(manifest['assets'])} assets: {total} -> {minified} bytes"
+          f"{'' if brotli is not None else ' (no brotli; .gz only)'}")
+    return manifest
+
+def _prune(dist_dir: str, manifest: Dict, keep: int = 2):
+    """Remove hashed files older than the last `keep` builds of each asset (pages cached before a
+    deploy may still reference the previous names for a while)."""
+    current = {a["file"] for a in manifest["assets"].values()}
+    for sub in ASSET_SOURCES:
+        folder = os.path.join(dist_dir, sub)
+        if not os.path.isdir(folder):
+            continue
+        by_stem: Dict[str, list] = {}
+        for name in os.listdir(folder):
+            if name.endswith((".gz", ".br")):
+                continue
+            parts = name.split(".")
+            if len(parts) == 3:
+                by_stem.setdefault((parts[0], parts[2]), []).append(os.path.join(folder, name))
+        for paths in by_stem.values():
+            paths.sort(key=os.path.getmtime, reverse=True)
+            for path in paths[keep:]:
+                if os.path.relpath(path, dist_dir).replace(os.sep, "/") in current:
+                    continue
+                for suffix in ("", ".gz", ".br"):
+                    if os.path.exists(path + suffix):
+                        os.remove(path + suffix)
+
+# ===== SERVING =====
+
+_manifest: Optional[Dict[str, str]] = None
+
+def load_manifest(static_dir: str = STATIC_DIR, path: str = MANIFEST_PATH) -> Dict[str, str]:
+    """source name -> built name, for entries whose source has not changed since the build."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            assets = json.load(f)["assets"]
+    except (OSError, ValueError, KeyError):
+        return {}
+    current = {}
+    for name, entry in assets.items():
+        try:
+            with open(os.path.join(static_dir, name), "rb") as f:
+                fresh = hashlib.sha256(f.read()).hexdigest() == entry["source_sha"]
+        except OSError:
+            fresh = False
+        if fresh:
+            current[name] = entry["file"]
+        else:
+            print(f"⚠️ Asset {name} changed since the last build; serving it unhashed")
+    return current
+
+def asset_url(filename: str) -> str:
+    global _manifest
+    from flask import url_for
+    if _manifest is None:
+        _manifest = load_manifest()
+    built = _manifest.get(filename)
+    if built is None:
+        return url_for("static", filename=filename)
+    return url_for("hashed_asset", filename=built)
+
+def init_app(app):
+    from flask import request, send_from_directory, abort
+
+    app.add_template_global(asset_url)
+
+    @app.route("/assets/<path:filename>", endpoint="hashed_asset")
+    def hashed_asset(filename):
+        accept = request.accept_encodings
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        encoding = None
+        for enc, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if accept[enc] and os.path.isfile(os.path.join(DIST_DIR, filename + suffix)):
+                encoding = enc
+                filename += suffix
+                break
+        if encoding is None and not os.path.isfile(os.path.join(DIST_DIR, filename)):
+            abort(404)
+        response = send_from_directory(DIST_DIR, filename, mimetype=mimetype, max_age=ASSET_MAX_AGE,
+                                       etag=False, conditional=encoding is None)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        response.vary.add("Accept-Encoding")
+        return response
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        build()
+    else:
+        print(json.dumps(load_manifest(), indent=2))
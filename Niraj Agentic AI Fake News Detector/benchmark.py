@@ -0,0 +1,234 @@
+# benchmark.py
+"""
+Benchmarks for the hot paths, run on generated claim corpora.
+
+    python benchmark.py                                  # sizes 1k,100k,1M -> bench_results.json
+    python benchmark.py --sizes 1000 --only canonicalize,cluster_claims
+    python benchmark.py --save-baseline bench_baseline.json
+    python benchmark.py --baseline bench_baseline.json   # prints deltas, exit 1 on regressions
+
+Quadratic benchmarks have a size cap (MAX_N) so the 1M run stays practical; the effective n
+is recorded next to each result. Nothing here touches the network: hybrid_verify_claim is timed
+with its external tier returning no verdict (known facts -> pattern analysis).
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+import contextlib
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+REGRESSION_THRESHOLD = 0.20   # 20% slower than baseline per op
+
+_SUBJECTS = ["Vaccines", "5G towers", "The government", "Scientists", "A new study", "Doctors", "Officials",
+             "The WHO", "Big pharma", "Local hospitals", "Climate researchers", "The prime minister"]
+_VERBS = ["cause", "prevent", "are hiding", "confirm", "announce", "reveal", "deny", "are linked to",
+          "leads to", "proves that", "shows that"]
+_OBJECTS = ["autism", "a miracle cure", "the outbreak", "flood damage", "the death toll", "a secret they don't want you to know",
+            "wildfire risk", "a vaccine side effect", "election fraud", "the hidden truth", "a 100% effective treatment",
+            "new clinical trial results", "peer-reviewed evidence", "an emergency lockdown"]
+_SUFFIXES = ["", " according to study", " in a medical journal", " says official report", " - conspiracy!",
+             " before the hurricane", " during the pandemic", " earth is flat", " delhi is capital of india"]
+
+def generate_claims(n: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}{rng.choice(_SUFFIXES)}"
+            for _ in range(n)]
+
+def generate_articles(claims: List[str], sentences_per_article: int = 4) -> List[str]:
+    return [". ".join(claims[i:i + sentences_per_article]) + "."
+            for i in range(0, len(claims), sentences_per_article)]
+
+def generate_rss(claims: List[str]) -> str:
+    items = "".join(f"<item><title>{c}</title><description>&lt;p&gt;{c}&lt;/p&gt;</description>"
+                    f"<link>https://example.org/{i}</link><guid>g{i}</guid></item>"
+                    for i, c in enumerate(claims))
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>bench</title><ttl>15</ttl>{items}</channel></rss>'
+
+# ===== BENCHMARKS =====
+# Each entry: name -> (max_n, setup(claims) -> (callable, ops))
+
+async def _no_external_verdict(claim):
+    return None
+
+def _bench_hybrid(claims):
+    # local tiers only: the external tier is network-bound (and would spend real API quota with
+    # keys set); load_driver.py measures it end to end against stub_apis.py instead
+    import app
+
+    def run():
+        saved = app.external_factcheck_apis
+        app.external_factcheck_apis = _no_external_verdict
+        try:
+            for c in claims:
+                app.hybrid_verify_claim(c)
+        finally:
+            app.external_factcheck_apis = saved
+    return run, len(claims)
+
+def _bench_pattern(claims):
+    from app import enhanced_pattern_analysis
+    return (lambda: [enhanced_pattern_analysis(c) for c in claims]), len(claims)
+
+def _bench_extract(claims):
+    from multimodal_analyzer import extract_claims_from_text
+    articles = generate_articles(claims)
+    return (lambda: [extract_claims_from_text(a) for a in articles]), len(claims)
+
+def _bench_enhanced_analyze(claims):
+    from simple_agent import enhanced_analyze_text
+    articles = generate_articles(claims)
+
+    async def run():
+        for a in articles:
+            await enhanced_analyze_text(a)
+    return (lambda: asyncio.run(run())), len(claims)
+
+def _bench_canonicalize(claims):
+    from emergence_detector import canonicalize
+    return (lambda: [canonicalize(c) for c in claims]), len(claims)
+
+def _bench_detect_emerging(claims):
+    import emergence_detector as ed
+    from emergence_detector import canonicalize
+    now = time.time()
+    window = ed.WINDOW_SECONDS
+    observations = deque((now - window + window * i / len(claims), canonicalize(c)) for i, c in enumerate(claims))
+
+    def run():
+        saved = ed.recent_claims
+        ed.recent_claims = observations
+        try:
+            ed.detect_emerging()
+        finally:
+            ed.recent_claims = saved
+    return run, len(claims)
+
+def _bench_cluster(claims):
+    from emergence_detector import cluster_claims, canonicalize
+    canon = [canonicalize(c) for c in claims]
+    return (lambda: cluster_claims(canon)), len(claims)
+
+def _bench_parse_rss(claims):
+    from multimodal_ingest import parse_rss_content
+    xml = generate_rss(claims)
+    return (lambda: parse_rss_content(xml, "bench", max_items=len(claims))), len(claims)
+
+BENCHMARKS: Dict[str, tuple] = {
+    "hybrid_verify_claim": (100_000, _bench_hybrid),
+    "enhanced_pattern_analysis": (None, _bench_pattern),
+    "extract_claims_from_text": (None, _bench_extract),
+    "enhanced_analyze_text": (None, _bench_enhanced_analyze),
+    "canonicalize": (None, _bench_canonicalize),
+    "detect_emerging": (None, _bench_detect_emerging),
+    "cluster_claims": (500, _bench_cluster),         # O(n^2) SequenceMatcher comparisons
+    "parse_rss_content": (100_000, _bench_parse_rss),
+}
+
+def run_one(name: str, claims: List[str], repeat: int = 1) -> Dict:
+    max_n, setup = BENCHMARKS[name]
+    if max_n is not None and len(claims) > max_n:
+        claims = claims[:max_n]
+    fn, ops = setup(claims)
+    best = float("inf")
+    # the hot paths print progress; keep that out of the timing and the terminal
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        for _ in range(repeat):
+            sink.seek(0)
+            sink.truncate()
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    return {
+        "n": ops,
+        "seconds": round(best, 6),
+        "ops_per_sec": round(ops / best, 1) if best > 0 else None,
+        "us_per_op": round(best / ops * 1e6, 3) if ops else None,
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except Exception:
+        return None
+
+def run_suite(sizes: List[int], only: Optional[List[str]] = None, repeat: int = 1) -> Dict:
+    names = only or list(BENCHMARKS)
+    results: Dict[str, Dict[str, Dict]] = {name: {} for name in names}
+    corpus = generate_claims(max(sizes))
+    for size in sizes:
+        claims = corpus[:size]
+        for name in names:
+            res = run_one(name, claims, repeat)
+            results[name][str(size)] = res
+            print(f"  {name:<28} size={size:<9} n={res['n']:<9} {res['seconds']:>10.4f}s "
+                  f"{res['us_per_op']:>10.2f} µs/op", file=sys.stderr)
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "commit": _git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+
+def compare(current: Dict, baseline: Dict, threshold: float = REGRESSION_THRESHOLD) -> List[Dict]:
+    """Per-op time deltas against a baseline; entries with ratio > 1 + threshold are regressions."""
+    rows = []
+    for name, by_size in current["results"].items():
+        for size, res in by_size.items():
+            base = baseline.get("results", {}).get(name, {}).get(size)
+            if not base or not base.get("us_per_op") or not res.get("us_per_op"):
+                continue
+            ratio = res["us_per_op"] / base["us_per_op"]
+            rows.append({"benchmark": name, "size": size, "baseline_us": base["us_per_op"],
+                         "current_us": res["us_per_op"], "ratio": round(ratio, 3),
+                         "regression": ratio > 1 + threshold})
+    return rows
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Hot-path benchmarks on synthetic corpora")
+    ap.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES))
+    ap.add_argument("--only", help="comma-separated benchmark names: " + ", ".join(BENCHMARKS))
+    ap.add_argument("--repeat", type=int, default=1, help="best-of-N timing")
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--baseline", help="compare against this results file")
+    ap.add_argument("--save-baseline", help="also write results here as the new baseline")
+    ap.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = ap.parse_args()
+
+    only = [n.strip() for n in args.only.split(",")] if args.only else None
+    unknown = [n for n in (only or []) if n not in BENCHMARKS]
+    if unknown:
+        sys.exit(f"Unknown benchmarks: {', '.join(unknown)}")
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    print(f"⏱️ Running {len(only or BENCHMARKS)} benchmarks at sizes {sizes}", file=sys.stderr)
+    report = run_suite(sizes, only, args.repeat)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare(report, json.load(f), args.threshold)
+        report["comparison"] = rows
+        for r in rows:
+            flag = "❌ REGRESSION" if r["regression"] else ("✅ faster" if r["ratio"] < 1 else "")
+            print(f"  {r['benchmark']:<28} size={r['size']:<9} {r['baseline_us']:>10.2f} -> "
+                  f"{r['current_us']:>10.2f} µs/op (x{r['ratio']}) {flag}", file=sys.stderr)
+        if any(r["regression"] for r in rows):
+            exit_code = 1
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+    print(f"💾 Results written to {args.out}", file=sys.stderr)
+    sys.exit(exit_code)
@@ -3,32 +3,26 @@
 """
 Lightweight vision helpers using local OCR (Tesseract) when possible.
 Provides:
-- encode_image(path_or_url) -> base64 (helper used elsewhere)
+- encode_image(path_or_url) -> base64 (only for remote APIs that need it; local OCR takes bytes)
 - analyze_image_with_query(prompt, encode_image_b64) -> fallback to OCR-extracted text + heuristic
 No external LLMs by default (keeps it free).
+Downloads go through media_fetch (streamed, size-capped, content-type checked).
 """
 import os
 import base64
-import httpx
 from typing import Optional
 
-def _read_file_bytes(path: str) -> bytes:
-    with open(path, "rb") as f:
-        return f.read()
-
-def _fetch_url_bytes(url: str, timeout: int = 30) -> bytes:
-    with httpx.Client(timeout=timeout) as client:
-        r = client.get(url)
-        r.raise_for_status()
-        return r.content
+from media_fetch import load_media
 
 def encode_image(path_or_url: str) -> str:
     """Return base64 of image bytes (no data: prefix). Accepts local path or http(s) URL."""
-    if path_or_url.startswith("http://") or path_or_url.startswith("https://"):
-        data = _fetch_url_bytes(path_or_url)
-    else:
-        data = _read_file_bytes(path_or_url)
-    return base64.b64encode(data).decode("utf-8")
+    with load_media(path_or_url, "image") as buf:
+        # encode straight from the spooled/mapped body instead of copying it to bytes first
+        view = buf.view()
+        try:
+            return base64.b64encode(view).decode("ascii")
+        finally:
+            view.release()
 
 # analyze_image_with_query: default behavior is to return OCR text (if available) or a short note.
 def analyze_image_with_query(prompt: str, encode_image: str = None, image_path: str = None) -> str:
@@ -40,12 +34,18 @@ def analyze_image_with_query(prompt: str, encode_image: str = None, image_path:
     """
     try:
         # import local OCR utility (uses pytesseract if installed)
-        from image_ocr import extract_text_from_image
+        from image_ocr import extract_text_from_image, extract_text_from_bytes
     except Exception:
-        extract_text_from_image = None
+        extract_text_from_image = extract_text_from_bytes = None
 
     if image_path and extract_text_from_image:
         text, method = extract_text_from_image(image_path)
         return text or ""
-    # If only encode_image provided, we can't easily run OCR here — return prompt as fallback note.
+    if encode_image and extract_text_from_bytes:
+        # callers that already hold base64: decode once and OCR the bytes
+        try:
+            text, method = extract_text_from_bytes(base64.b64decode(encode_image))
+            return text or ""
+        except ValueError:
+            return ""
     return ""
@@ -0,0 +1,249 @@
+# cassette.py
+"""
+Record/replay of external HTTP responses (Google Fact Check, NewsData, GNews, Mediastack, RSS).
+- CASSETTE_MODE=off (default) | record | replay
+- CASSETTE_PATH: SQLite file holding zlib-compressed responses and their measured latency
+- CASSETTE_LATENCY_SCALE: replay delay multiplier (1.0 = as recorded, 0 = no delay)
+- CASSETTE_MAX_BODY: bytes of each body kept when recording. The body is teed while the caller
+  streams it, so byte caps on downloads still hold; a longer (or abandoned) body is stored as
+  the prefix that was read, marked X-Cassette-Truncated. A truncated gzip/deflate prefix is
+  stored decoded (a cut-off compressed stream would fail to decode on replay); other encodings
+  are not recorded when truncated
+Works at the httpx transport level: create clients with async_client(...) instead of
+httpx.AsyncClient(...) and every request goes through the cassette. Requests are keyed by
+method, URL and a hash of the request body (POSTs with different payloads are different
+entries). API keys/tokens are stripped from URLs before they are used as keys or written to disk.
+"""
+
+import os
+import json
+import time
+import zlib
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import httpx
+
+from metrics import provider_for, EXTERNAL_SECONDS, EXTERNAL_ERRORS
+from tracing import span
+
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off").lower()
+CASSETTE_PATH = os.getenv("CASSETTE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes.db"))
+CASSETTE_LATENCY_SCALE = float(os.getenv("CASSETTE_LATENCY_SCALE", "1.0"))
+CASSETTE_MAX_BODY = int(os.getenv("CASSETTE_MAX_BODY", str(5 * 1024 * 1024)))
+
+SECRET_PARAMS = {"apikey", "api_key", "key", "token", "access_key"}
+# framing / hop-by-hop headers are not replayed (the stored body is the raw, still-encoded
+# bytes, so Content-Encoding is kept and httpx decodes it on replay as it did live)
+_DROP_HEADERS = {"content-length", "transfer-encoding", "connection"}
+
+class CassetteMiss(Exception):
+    """Replay mode: no recorded response for this request."""
+
+def _redact(url: httpx.URL) -> str:
+    parts = urlsplit(str(url))
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+def request_key(method: str, url: httpx.URL, body: bytes = b"") -> Tuple[str, str]:
+    clean = _redact(url)
+    key = f"{method.upper()} {clean}"
+    if body:
+        # bodiless requests keep the method+URL key, so existing cassettes still match
+        key += " " + hashlib.sha1(body).hexdigest()
+    return hashlib.sha1(key.encode("utf-8")).hexdigest(), clean
+
+def _decode_prefix(body: bytes, encoding: str) -> Optional[bytes]:
+    """Decode the start of a gzip/deflate body (whatever the prefix holds); None otherwise."""
+    wbits = {"gzip": 16 + zlib.MAX_WBITS, "x-gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}.get(encoding)
+    if wbits is None:
+        return None
+    try:
+        return zlib.decompressobj(wbits).decompress(body)
+    except zlib.error:
+        if encoding != "deflate":
+            return None
+        try:
+            return zlib.decompressobj(-zlib.MAX_WBITS).decompress(body)     # raw deflate
+        except zlib.error:
+            return None
+
+class CassetteStore:
+    def __init__(self, path: str = CASSETTE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._index: Optional[Dict[str, List[Tuple]]] = None
+        self._cursor: Dict[str, int] = {}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT,
+                    url TEXT,
+                    status INTEGER,
+                    headers_z BLOB,
+                    body_z BLOB,
+                    latency REAL,
+                    recorded_at REAL
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_key ON responses(key)")
+        return self._conn
+
+    def record(self, key: str, url: str, status: int, headers: Dict[str, str], body: bytes, latency: float):
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT INTO responses (key, url, status, headers_z, body_z, latency, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, zlib.compress(json.dumps(headers).encode("utf-8")),
+                 zlib.compress(body, 6), latency, time.time()))
+            db.commit()
+
+    def next_response(self, key: str) -> Optional[Tuple[int, Dict[str, str], bytes, float]]:
+        """Recorded responses for a key are served in recording order, cycling when exhausted."""
+        with self._lock:
+            if self._index is None:
+                self._index = {}
+                for k, status, headers_z, body_z, latency in self._db().execute(
+                        "SELECT key, status, headers_z, body_z, latency FROM responses ORDER BY id"):
+                    self._index.setdefault(k, []).append((status, headers_z, body_z, latency))
+            entries = self._index.get(key)
+            if not entries:
+                return None
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = i + 1
+            status, headers_z, body_z, latency = entries[i % len(entries)]
+        return status, json.loads(zlib.decompress(headers_z)), zlib.decompress(body_z), latency
+
+_store: Optional[CassetteStore] = None
+
+def get_store() -> CassetteStore:
+    global _store
+    if _store is None:
+        _store = CassetteStore()
+    return _store
+
+class _TeeStream(httpx.AsyncByteStream):
+    """Passes the live body through unchanged, keeping a copy of the first `cap` bytes; the copy
+    is handed to on_close when the caller closes the response."""
+    def __init__(self, inner: httpx.AsyncByteStream, on_close, cap: int):
+        self.inner = inner
+        self.on_close = on_close
+        self.cap = cap
+        self.chunks: List[bytes] = []
+        self.size = 0
+        self.truncated = False
+        self.complete = False
+        self.closed = False
+
+    async def __aiter__(self):
+        async for chunk in self.inner:
+            if not self.truncated:
+                if self.size + len(chunk) > self.cap:
+                    self.truncated = True
+                else:
+                    self.chunks.append(chunk)
+                    self.size += len(chunk)
+            yield chunk
+        self.complete = True
+
+    async def aclose(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self.inner.aclose()
+        finally:
+            await self.on_close(b"".join(self.chunks), self.truncated or not self.complete)
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    def __init__(self, mode: str, inner: Optional[httpx.AsyncBaseTransport] = None,
+                 store: Optional[CassetteStore] = None, latency_scale: float = CASSETTE_LATENCY_SCALE):
+        self.mode = mode
+        self.inner = inner or httpx.AsyncHTTPTransport()
+        self.store = store or get_store()
+        self.latency_scale = latency_scale
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        # reading a streamed request body here keeps it replayable for the inner transport
+        key, clean_url = request_key(request.method, request.url, await request.aread())
+        if self.mode == "replay":
+            hit = self.store.next_response(key)
+            if hit is None:
+                raise CassetteMiss(f"No recorded response for {request.method} {clean_url}")
+            status, headers, body, latency = hit
+            if latency and self.latency_scale > 0:
+                await asyncio.sleep(latency * self.latency_scale)
+            return httpx.Response(status, headers=headers, content=body, request=request)
+
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        latency = time.perf_counter() - start           # time to headers; replay streams instantly
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS}
+
+        async def save(body: bytes, truncated: bool):
+            stored = dict(headers, **({"X-Cassette-Truncated": "1"} if truncated else {}))
+            encoding = response.headers.get("content-encoding", "").strip().lower()
+            if truncated and encoding and encoding != "identity":
+                body = _decode_prefix(body, encoding)
+                if body is None:
+                    print(f"⚠️ Cassette: not recording truncated {encoding} body of {clean_url}")
+                    return
+                stored = {k: v for k, v in stored.items() if k.lower() != "content-encoding"}
+            # sqlite commit off the event loop
+            await asyncio.to_thread(self.store.record, key, clean_url, response.status_code, stored, body, latency)
+
+        return httpx.Response(response.status_code, headers=response.headers,
+                              stream=_TeeStream(response.stream, save, CASSETTE_MAX_BODY),
+                              request=request, extensions=response.extensions)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+class MetricsTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        provider = provider_for(request.url)
+        start = time.perf_counter()
+        try:
+            with span("http:" + provider) as s:
+                response = await self.inner.handle_async_request(request)
+                s.set(status=response.status_code)
+        except httpx.TimeoutException:
+            EXTERNAL_ERRORS.labels(provider, "timeout").inc()
+            raise
+        except httpx.HTTPError:
+            EXTERNAL_ERRORS.labels(provider, "transport").inc()
+            raise
+        finally:
+            EXTERNAL_SECONDS.labels(provider).observe(time.perf_counter() - start)
+        if response.status_code == 429:
+            EXTERNAL_ERRORS.labels(provider, "429").inc()
+        elif response.status_code >= 500:
+            EXTERNAL_ERRORS.labels(provider, "5xx").inc()
+        return response
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+def async_client(**kwargs) -> httpx.AsyncClient:
+    """httpx.AsyncClient routed through the cassette when CASSETTE_MODE is record/replay.
+    Every request is timed per provider (MetricsTransport)."""
+    transport = kwargs.pop("transport", None)
+    if transport is None:
+        if CASSETTE_MODE in ("record", "replay"):
+            transport = CassetteTransport(CASSETTE_MODE)
+        else:
+            transport = httpx.AsyncHTTPTransport(**({"limits": kwargs.pop("limits")} if "limits" in kwargs else {}))
+    kwargs["transport"] = MetricsTransport(transport)
+    return httpx.AsyncClient(**kwargs)
@@ -0,0 +1,130 @@
+# dedup.py
+"""
+Cross-source article deduplication with fixed memory.
+- normalize_url(url): scheme/host/tracking-param insensitive form of an article URL
+- content_fingerprint(title, text): hash of the normalized headline (wire copies share it)
+- RotatingBloomFilter: two-generation Bloom filter; entries expire after 1-2 rotation periods
+- ArticleDeduplicator.is_duplicate(item): True if the URL, GUID or fingerprint was seen recently
+"""
+
+import os
+import re
+import math
+import time
+import hashlib
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEDUP_CAPACITY = int(os.getenv("DEDUP_CAPACITY", "200000"))        # keys per generation
+DEDUP_ERROR_RATE = float(os.getenv("DEDUP_ERROR_RATE", "0.001"))
+DEDUP_WINDOW_SECONDS = float(os.getenv("DEDUP_WINDOW_SECONDS", "86400"))
+
+_TRACKING_PARAMS = {"fbclid", "gclid", "ref", "cmpid", "ocid", "mc_cid", "mc_eid", "at_medium", "at_campaign"}
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {"a", "an", "the", "of", "to", "in", "on", "for", "and", "or", "is", "are", "at", "by", "with"}
+
+def normalize_url(url: Optional[str]) -> str:
+    if not url or url == "#":
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return ""
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS)
+    path = parts.path.rstrip("/") or "/"
+    # http/https and fragments don't make a different article
+    return urlunsplit(("", host, path, urlencode(query), ""))
+
+def content_fingerprint(title: Optional[str], text: Optional[str] = None) -> str:
+    """Fingerprint of the headline (falls back to the body start when there is no title)."""
+    words = [w for w in _WORD_RE.findall((title or text or "")[:300].lower()) if w not in _STOPWORDS]
+    if len(words) < 3:
+        return ""
+    return hashlib.blake2b(" ".join(words).encode("utf-8"), digest_size=16).hexdigest()
+
+class RotatingBloomFilter:
+    """
+    Two fixed-size Bloom filters. New keys go into `current`; lookups check both.
+    When `current` is full or `rotate_seconds` elapsed, `previous` is dropped and `current`
+    takes its place — memory never grows and keys expire after one to two windows.
+    """
+    def __init__(self, capacity: int = DEDUP_CAPACITY, error_rate: float = DEDUP_ERROR_RATE,
+                 rotate_seconds: float = DEDUP_WINDOW_SECONDS):
+        self.capacity = capacity
+        self.rotate_seconds = rotate_seconds
+        self.num_bits = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.current = bytearray((self.num_bits + 7) // 8)
+        self.previous = bytearray(len(self.current))
+        self.count = 0
+        self.rotated_at = time.time()
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    @staticmethod
+    def _has(bits: bytearray, positions) -> bool:
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    def _maybe_rotate(self):
+        if self.count >= self.capacity or time.time() - self.rotated_at >= self.rotate_seconds:
+            self.previous = self.current
+            self.current = bytearray(len(self.previous))
+            self.count = 0
+            self.rotated_at = time.time()
+
+    def __contains__(self, key: str) -> bool:
+        positions = self._positions(key)
+        return self._has(self.current, positions) or self._has(self.previous, positions)
+
+    def add(self, key: str):
+        self._maybe_rotate()
+        positions = self._positions(key)
+        if not self._has(self.current, positions):
+            for p in positions:
+                self.current[p >> 3] |= 1 << (p & 7)
+            self.count += 1
+
+    def memory_bytes(self) -> int:
+        return len(self.current) + len(self.previous)
+
+class ArticleDeduplicator:
+    def __init__(self, bloom: Optional[RotatingBloomFilter] = None):
+        self.bloom = bloom or RotatingBloomFilter()
+        self.checked = 0
+        self.dropped = 0
+
+    @staticmethod
+    def keys(item: Dict):
+        keys = []
+        url = normalize_url(item.get("url"))
+        if url:
+            keys.append("u:" + url)
+        guid = (item.get("guid") or "").strip()
+        if guid:
+            keys.append("g:" + guid)
+        fp = content_fingerprint(item.get("title"), item.get("text"))
+        if fp:
+            keys.append("f:" + fp)
+        return keys
+
+    def is_duplicate(self, item: Dict) -> bool:
+        """Check and record an item. All of its keys are recorded, so later copies match on any of them."""
+        self.checked += 1
+        keys = self.keys(item)
+        duplicate = any(k in self.bloom for k in keys)
+        for k in keys:
+            self.bloom.add(k)
+        if duplicate:
+            self.dropped += 1
+        return duplicate
+
+    def stats(self) -> Dict:
+        return {"checked": self.checked, "dropped": self.dropped, "memory_bytes": self.bloom.memory_bytes()}
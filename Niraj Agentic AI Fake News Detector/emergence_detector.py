@@ -3,6 +3,8 @@ import time
 from collections import defaultdict, deque
 from difflib import SequenceMatcher
 
+from shared_state import SHARED_STATE_ENABLED, get_shared_state
+
 WINDOW_SECONDS = 3600      # 1 hour rolling window
 MIN_SIMILARITY = 0.75
 
@@ -19,6 +21,10 @@ def similar(a: str, b: str) -> float:
 
 def add_claim_observation(canonical_text: str):
     """Add a claim observation to rolling window."""
+    if SHARED_STATE_ENABLED:
+        # multi-worker mode: every process sees the same window
+        get_shared_state().add_observation(canonical_text, WINDOW_SECONDS)
+        return
     now = time.time()
     recent_claims.append((now, canonical_text))
 
@@ -35,7 +41,8 @@ def detect_emerging(min_count: int = 4, min_velocity: float = 0.6):
     recent_counts = defaultdict(int)
     previous_counts = defaultdict(int)
 
-    for ts, claim in recent_claims:
+    observations = get_shared_state().observations(WINDOW_SECONDS) if SHARED_STATE_ENABLED else recent_claims
+    for ts, claim in observations:
         if ts >= now - half_window:
             recent_counts[claim] += 1
         else:
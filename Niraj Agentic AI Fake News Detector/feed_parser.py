@@ -0,0 +1,156 @@
+# feed_parser.py
+"""
+Incremental RSS 2.0 / Atom parser with bounded memory.
+- FeedParser(source_name, max_items, seen_ids).feed(chunk) -> newly completed items
+- Works on byte chunks straight off the network (XMLPullParser), so a feed can be
+  abandoned as soon as `max_items` new items have been produced
+- Handles Atom and the common RSS extension namespaces (content:encoded, dc:date)
+- Items whose guid/id is in `seen_ids` are skipped before any item dict is built
+- Each finished <item>/<entry> is detached from its parent, so the tree never grows
+"""
+
+import re
+import html
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Dict, List, Optional, Iterable
+
+_TAG_RE = re.compile(r"<[^<]+?>")
+_WS_RE = re.compile(r"\s+")
+
+ITEM_TAGS = {"item", "entry"}
+TEXT_MAX_CHARS = 2000
+
+def _local(tag: str) -> str:
+    """'{http://www.w3.org/2005/Atom}entry' -> 'entry'"""
+    return tag.rsplit("}", 1)[-1] if "}" in tag else tag
+
+def strip_html(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    return _WS_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", text))).strip()
+
+def _first_text(fields: Dict[str, str], *names: str) -> str:
+    for name in names:
+        value = fields.get(name)
+        if value:
+            return value
+    return ""
+
+def _identity(elem: ET.Element):
+    """(guid, link) of an <item>/<entry>; guid falls back to the link."""
+    ids: Dict[str, str] = {}
+    link = ""
+    for child in elem:
+        name = _local(child.tag)
+        if name == "link":
+            # Atom puts the URL in href; prefer rel="alternate" (or no rel)
+            href = child.get("href")
+            if href and child.get("rel", "alternate") == "alternate":
+                link = link or href
+            elif child.text:
+                link = link or child.text.strip()
+        elif name in ("guid", "id") and name not in ids and child.text:
+            ids[name] = child.text
+    return _first_text(ids, "guid", "id").strip() or link, link
+
+class FeedParser:
+    def __init__(self, source_name: str, max_items: int = 5, seen_ids: Optional[Iterable[str]] = None):
+        self.source_name = source_name
+        self.max_items = max_items
+        self.seen_ids = seen_ids if seen_ids is not None else ()
+        self.ttl: Optional[int] = None
+        self.items_seen = 0
+        self.skipped = 0
+        self.produced = 0
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack: List[ET.Element] = []
+        self._in_item = 0
+
+    @property
+    def done(self) -> bool:
+        return self.produced >= self.max_items
+
+    def feed(self, chunk) -> List[Dict]:
+        """Feed bytes/str; returns items completed by this chunk (never more than max_items overall)."""
+        if self.done:
+            return []
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> List[Dict]:
+        if self.done:
+            return []
+        try:
+            self._parser.close()
+        except ET.ParseError:
+            # truncated feed: keep whatever complete items we already produced
+            return []
+        return self._drain()
+
+    def _drain(self) -> List[Dict]:
+        out = []
+        for event, elem in self._parser.read_events():
+            name = _local(elem.tag)
+            if event == "start":
+                self._stack.append(elem)
+                if name in ITEM_TAGS:
+                    self._in_item += 1
+                continue
+
+            self._stack.pop()
+            if name == "ttl" and not self._in_item and elem.text and elem.text.strip().isdigit():
+                self.ttl = int(elem.text.strip())
+            if name not in ITEM_TAGS:
+                continue
+
+            self._in_item -= 1
+            item = self._build_item(elem)
+            # detach the finished item so memory stays flat regardless of feed length
+            elem.clear()
+            if self._stack:
+                self._stack[-1].remove(elem)
+            if item is not None:
+                out.append(item)
+                self.produced += 1
+                if self.done:
+                    break
+        return out
+
+    def _build_item(self, elem: ET.Element) -> Optional[Dict]:
+        self.items_seen += 1
+        # identity first: a seen item costs one scan of its children and nothing else
+        guid, link = _identity(elem)
+        if guid and guid in self.seen_ids:
+            self.skipped += 1
+            return None
+
+        fields: Dict[str, str] = {}
+        for child in elem:
+            name = _local(child.tag)
+            if name != "link" and name not in fields and child.text:
+                fields[name] = child.text
+
+        title = strip_html(fields.get("title"))
+        if not title:
+            return None
+        description = strip_html(_first_text(fields, "description", "summary", "encoded", "content"))
+        return {
+            "type": "text",
+            "source": self.source_name,
+            "title": title,
+            "text": description[:TEXT_MAX_CHARS],
+            "image_url": None,
+            "url": link,
+            "guid": guid,
+            "published": _first_text(fields, "pubDate", "published", "updated", "date").strip()
+                         or datetime.utcnow().isoformat()
+        }
+
+def parse_feed(xml_content, source_name: str, max_items: int = 5,
+               seen_ids: Optional[Iterable[str]] = None) -> List[Dict]:
+    """Parse a whole document already in memory (convenience wrapper around FeedParser)."""
+    parser = FeedParser(source_name, max_items=max_items, seen_ids=seen_ids)
+    items = parser.feed(xml_content)
+    items.extend(parser.close())
+    return items
@@ -0,0 +1,117 @@
+# feed_scheduler.py
+"""
+Per-feed polling state for RSS/Atom ingestion.
+- Keeps ETag / Last-Modified per feed so refetches are conditional (304 = nothing to parse).
+  A fetch that stopped reading early keeps the previous validators: the unread rest of the
+  document would otherwise be skipped by a 304 until the feed changes again
+- Respects the feed's own <ttl> (minutes) as a lower bound on the poll interval
+- Adapts the interval per feed: feeds that keep producing new items are polled more often,
+  feeds that return 304 or only already-seen items back off towards MAX_INTERVAL.
+"""
+
+import os
+import time
+import random
+from collections import deque
+from typing import Dict, List, Optional, Iterable
+
+MIN_INTERVAL = float(os.getenv("FEED_MIN_INTERVAL", "60"))
+MAX_INTERVAL = float(os.getenv("FEED_MAX_INTERVAL", "1800"))
+DEFAULT_INTERVAL = float(os.getenv("FEED_DEFAULT_INTERVAL", "300"))
+SPEEDUP = 0.5      # interval multiplier after a poll with new items
+BACKOFF = 1.5      # interval multiplier after a poll without new items
+SEEN_IDS_PER_FEED = 500
+
+class FeedState:
+    def __init__(self, name: str, url: str, interval: float = DEFAULT_INTERVAL):
+        self.name = name
+        self.url = url
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.ttl_seconds: float = 0.0
+        self.interval = interval
+        self.next_due = 0.0
+        self.polls = 0
+        self.not_modified = 0
+        self.last_new_items = 0
+        self._seen_order = deque()
+        self.seen_ids = set()
+
+    def request_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def mark_seen(self, ids: Iterable[str]) -> int:
+        """Remember item ids (guid/link); returns how many were new."""
+        new = 0
+        for item_id in ids:
+            if not item_id or item_id in self.seen_ids:
+                continue
+            new += 1
+            self.seen_ids.add(item_id)
+            self._seen_order.append(item_id)
+            if len(self._seen_order) > SEEN_IDS_PER_FEED:
+                self.seen_ids.discard(self._seen_order.popleft())
+        return new
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "interval": round(self.interval, 1),
+            "ttl_seconds": self.ttl_seconds,
+            "next_due_in": round(max(0.0, self.next_due - time.time()), 1),
+            "polls": self.polls,
+            "not_modified": self.not_modified,
+            "last_new_items": self.last_new_items,
+        }
+
+class FeedScheduler:
+    def __init__(self, min_interval: float = MIN_INTERVAL, max_interval: float = MAX_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.feeds: Dict[str, FeedState] = {}
+
+    def state(self, feed: Dict) -> FeedState:
+        st = self.feeds.get(feed["url"])
+        if st is None:
+            st = self.feeds[feed["url"]] = FeedState(feed["name"], feed["url"])
+        return st
+
+    def due(self, feeds: List[Dict], now: Optional[float] = None) -> List[Dict]:
+        now = now or time.time()
+        return [f for f in feeds if self.state(f).next_due <= now]
+
+    def record(self, st: FeedState, status_code: int, headers=None, ttl_minutes: Optional[int] = None,
+               new_items: int = 0, truncated: bool = False):
+        """Update validators and schedule the next poll from the outcome of one fetch."""
+        headers = headers or {}
+        st.polls += 1
+        st.last_new_items = new_items
+        if status_code == 304:
+            st.not_modified += 1
+        elif not truncated:
+            st.etag = headers.get("etag") or st.etag
+            st.last_modified = headers.get("last-modified") or st.last_modified
+        if ttl_minutes:
+            st.ttl_seconds = ttl_minutes * 60.0
+
+        if new_items > 0:
+            st.interval *= SPEEDUP
+        else:
+            st.interval *= BACKOFF
+        floor = max(self.min_interval, st.ttl_seconds)
+        st.interval = min(max(st.interval, floor), max(self.max_interval, floor))
+        # a little jitter so feeds sharing an interval don't all fire in the same cycle
+        st.next_due = time.time() + st.interval * random.uniform(0.9, 1.1)
+
+    def record_error(self, st: FeedState):
+        st.polls += 1
+        st.interval = min(st.interval * BACKOFF, self.max_interval)
+        st.next_due = time.time() + st.interval
+
+    def snapshot(self) -> List[Dict]:
+        return [st.to_dict() for st in self.feeds.values()]
@@ -0,0 +1,147 @@
+# http_cache.py
+"""
+Conditional, compressed responses for the read-only JSON endpoints the dashboard polls.
+- @cached_json("claims", max_age=15) under @app.route: the view runs once per
+  (endpoint, query string, data versions); later polls reuse the serialized body
+- bump("claims") when the underlying data changes (publishers do); the next poll re-renders
+- Weak ETag = hash of the cache key (endpoint, query string, data versions) and a per-process
+  token, so a matching If-None-Match gets a 304 before the view runs or anything is serialized.
+  The contract is the cache's own: the view's output depends only on the key
+- Entries are evicted least recently used first (HTTP_CACHE_ENTRIES)
+- Cache-Control: public, max-age=N; Vary: Accept-Encoding
+- gzip (stdlib) or brotli (if the `brotli` package is installed), compressed once per version
+- register_version("updates", fn): version read from fn() instead, for data kept outside the process
+- dumps(obj) -> compact JSON bytes, via orjson when it is installed
+Versions are per process; in multi-worker mode each worker renders and tags its own copy.
+"""
+
+import os
+import json
+import gzip
+import hashlib
+import threading
+import functools
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import Response, current_app, request
+
+from lazy_imports import optional
+from metrics import Counter
+
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "10"))
+HTTP_CACHE_ENTRIES = int(os.getenv("HTTP_CACHE_ENTRIES", "256"))
+COMPRESS_MIN_BYTES = 512
+
+HTTP_CACHE = Counter("sachbol_http_cache", "Cached JSON responses by outcome", ("outcome",))
+_HIT = HTTP_CACHE.labels("hit")
+_MISS = HTTP_CACHE.labels("miss")
+_NOT_MODIFIED = HTTP_CACHE.labels("not_modified")
+
+_versions: Dict[str, int] = {}
+_version_sources: Dict[str, Callable[[], int]] = {}
+_entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+_lock = threading.Lock()
+# versions restart at 0 with the process; keeps a restarted worker from matching old ETags
+_PROCESS_TOKEN = os.urandom(8).hex()
+
+def bump(*names: str):
+    """Mark data as changed; cached responses that depend on it are re-rendered on next request."""
+    with _lock:
+        for name in names:
+            _versions[name] = _versions.get(name, 0) + 1
+
+def register_version(name: str, source: Callable[[], int]):
+    """Take name's version from source() (e.g. the newest row id in a shared store)."""
+    _version_sources[name] = source
+
+def version(name: str) -> int:
+    source = _version_sources.get(name)
+    if source is not None:
+        return source()
+    return _versions.get(name, 0)
+
+def dumps(obj) -> bytes:
+    """Compact JSON; orjson if available (several times faster than the stdlib encoder)."""
+    orjson = optional("orjson")
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+def _etag(key: Tuple) -> str:
+    return hashlib.blake2b(repr((_PROCESS_TOKEN, key)).encode("utf-8"), digest_size=12).hexdigest()
+
+class _Entry:
+    __slots__ = ("body", "mimetype", "etag", "_encoded")
+
+    def __init__(self, body: bytes, mimetype: str, etag: str):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = etag
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        data = self._encoded.get(encoding)
+        if data is None:
+            if encoding == "br":
+                data = optional("brotli").compress(self.body, quality=5)
+            else:
+                data = gzip.compress(self.body, compresslevel=6, mtime=0)
+            self._encoded[encoding] = data
+        return data
+
+def _pick_encoding(size: int) -> Optional[str]:
+    if size < COMPRESS_MIN_BYTES:
+        return None
+    accept = request.accept_encodings
+    if accept["br"] and optional("brotli") is not None:
+        return "br"
+    if accept["gzip"]:
+        return "gzip"
+    return None
+
+def _respond(entry: Optional[_Entry], etag: str, max_age: int) -> Response:
+    """entry=None answers 304 Not Modified."""
+    if entry is None:
+        response = Response(status=304)
+    else:
+        encoding = _pick_encoding(len(entry.body))
+        response = Response(entry.encoded(encoding) if encoding else entry.body, mimetype=entry.mimetype)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag, weak=True)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    response.vary.add("Accept-Encoding")
+    return response
+
+def cached_json(*depends: str, max_age: int = HTTP_CACHE_MAX_AGE):
+    """Cache a GET view's 200 response per query string and versions of `depends`."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key: Tuple = (request.endpoint, request.query_string, tuple(sorted(kwargs.items())),
+                          tuple(version(name) for name in depends))
+            etag = _etag(key)
+            with _lock:
+                entry = _entries.get(key)
+                if entry is not None:
+                    _entries.move_to_end(key)
+            if request.if_none_match.contains_weak(etag):
+                _NOT_MODIFIED.inc()
+                return _respond(None, etag, max_age)
+            if entry is None:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough:
+                    return response
+                _MISS.inc()
+                entry = _Entry(response.get_data(), response.mimetype, etag)
+                with _lock:
+                    _entries[key] = entry
+                    while len(_entries) > HTTP_CACHE_ENTRIES:
+                        _entries.popitem(last=False)
+            else:
+                _HIT.inc()
+            return _respond(entry, etag, max_age)
+        return wrapper
+    return decorator
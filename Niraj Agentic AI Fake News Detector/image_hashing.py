@@ -0,0 +1,87 @@
+# image_hashing.py
+"""
+Image identity helpers.
+- content_hash(data): sha256 of the raw bytes (exact copies)
+- phash(img) / dhash(img): 64-bit perceptual hashes that survive resizing and recompression
+- image_hashes(data) -> (sha256, phash, dhash); top-level so it can run in a process pool
+- open_image(data): PIL image from bytes or a binary file (MediaBuffer.fileobj(), read in place)
+`data` may be bytes, a memoryview, a seekable binary file or a file path (MediaBuffer.payload())
+everywhere here.
+- hamming(a, b): bit distance between two 64-bit hashes
+Pure Python + PIL (no numpy): the DCT only computes the 8x8 low-frequency block it needs.
+"""
+
+import io
+import math
+import hashlib
+from typing import Tuple
+
+_N = 32          # pHash works on a 32x32 downscale
+_K = 8           # keeps the top-left 8x8 DCT coefficients -> 64 bits
+_READ_CHUNK = 256 * 1024
+
+# cos((2x+1) u pi / 2N) for u < K, x < N
+_COS = [[math.cos((2 * x + 1) * u * math.pi / (2 * _N)) for x in range(_N)] for u in range(_K)]
+
+def content_hash(data) -> str:
+    if isinstance(data, str):
+        with open(data, "rb") as f:
+            return content_hash(f)
+    if hasattr(data, "read"):
+        data.seek(0)
+        h = hashlib.sha256()
+        for chunk in iter(lambda: data.read(_READ_CHUNK), b""):
+            h.update(chunk)
+        return h.hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+def open_image(data):
+    from PIL import Image
+    if isinstance(data, str):
+        return Image.open(data)
+    if hasattr(data, "read"):
+        data.seek(0)
+        return Image.open(data)
+    # BytesIO shares a bytes object's buffer; other buffers (memoryview) are copied
+    return Image.open(io.BytesIO(data))
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def _gray(img, size):
+    from PIL import Image
+    if getattr(img, "format", None) == "JPEG":
+        img.draft("L", (size[0] * 4, size[1] * 4))   # let libjpeg downscale while decoding
+    return img.convert("L").resize(size, Image.LANCZOS)
+
+def dhash(img) -> int:
+    """Difference hash: is each pixel brighter than its right neighbour (9x8 grid)."""
+    px = list(_gray(img, (9, 8)).getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return bits
+
+def phash(img) -> int:
+    """DCT hash: low-frequency 8x8 DCT coefficients compared against their median."""
+    px = list(_gray(img, (_N, _N)).getdata())
+    rows = [px[r * _N:(r + 1) * _N] for r in range(_N)]
+    # 1-D DCT along rows (only K coefficients), then along columns
+    row_dct = [[sum(c * v for c, v in zip(_COS[u], row)) for u in range(_K)] for row in rows]
+    coeffs = []
+    for v in range(_K):
+        cos_v = _COS[v]
+        for u in range(_K):
+            coeffs.append(sum(cos_v[y] * row_dct[y][u] for y in range(_N)))
+    ac = sorted(coeffs[1:])                 # DC term dominates; leave it out of the median
+    median = (ac[len(ac) // 2 - 1] + ac[len(ac) // 2]) / 2
+    bits = 0
+    for c in coeffs:
+        bits = (bits << 1) | (c > median)
+    return bits
+
+def image_hashes(data) -> Tuple[str, int, int]:
+    sha = content_hash(data)
+    with open_image(data) as img:
+        return sha, phash(img), dhash(img)
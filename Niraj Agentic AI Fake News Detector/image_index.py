@@ -0,0 +1,292 @@
+# image_index.py
+"""
+Image fingerprint index for spotting recycled photos (old disaster images reshared as "new").
+- add(sha, phash, dhash, url) -> image_id     # records a sighting; exact copies share one row
+- lookup(phash, dhash) -> earliest-seen near-duplicate + prior verdicts, or None
+- record_verdict(image_id, verification)      # remembers what claims attached to the image scored
+pHash lives in an in-memory multi-index table (see MultiIndexHash), so a radius-8 search probes
+a few hundred buckets instead of scanning millions of hashes. dHash is checked on the
+candidates to weed out pHash collisions. Rows persist in SQLite. On start the index maps the
+prebuilt artifact (`python artifacts.py build images`, see MappedMultiIndexHash) and loads only
+rows added since into memory; without an artifact every row is loaded.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import array
+import threading
+from typing import Dict, List, Optional
+
+from image_hashing import hamming
+from artifacts import artifact_path, open_artifact, write_artifact
+
+IMAGE_INDEX_PATH = os.getenv("IMAGE_INDEX_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "image_index.db"))
+PHASH_RADIUS = int(os.getenv("IMAGE_PHASH_RADIUS", "8"))
+DHASH_RADIUS = int(os.getenv("IMAGE_DHASH_RADIUS", "12"))
+MAX_VERDICTS_PER_IMAGE = int(os.getenv("IMAGE_MAX_VERDICTS", "20"))
+MAX_CANDIDATES = 500
+
+def _signed(h: int) -> int:
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+def _unsigned(h: int) -> int:
+    return h & ((1 << 64) - 1)
+
+class MultiIndexHash:
+    """
+    Multi-index Hamming search over 64-bit hashes (Norouzi et al.): the hash is split into
+    four 16-bit segments, each with its own bucket table. If two hashes are within r bits,
+    at least one segment is within r // 4 bits (pigeonhole), so a query only probes the
+    buckets at that small per-segment radius and verifies the candidates it finds.
+    """
+
+    SEGMENTS = 4
+    BITS = 16
+
+    def __init__(self):
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(self.SEGMENTS)]
+        self._hash: Dict[int, int] = {}
+        self._masks: Dict[int, List[int]] = {}
+
+    def __len__(self):
+        return len(self._hash)
+
+    def _segments(self, h: int) -> List[int]:
+        return [(h >> (self.BITS * i)) & 0xFFFF for i in range(self.SEGMENTS)]
+
+    def _probe_masks(self, radius: int) -> List[int]:
+        # all 16-bit masks with popcount <= radius (137 masks at radius 2)
+        masks = self._masks.get(radius)
+        if masks is None:
+            masks = self._masks[radius] = [m for m in range(1 << self.BITS) if bin(m).count("1") <= radius]
+        return masks
+
+    def add(self, h: int, item_id: int):
+        self._hash[item_id] = h
+        for table, seg in zip(self._tables, self._segments(h)):
+            table.setdefault(seg, []).append(item_id)
+
+    def search(self, h: int, radius: int) -> List[tuple]:
+        """All (distance, id) within radius."""
+        out = []
+        seen = set()
+        masks = self._probe_masks(radius // self.SEGMENTS)
+        for table, seg in zip(self._tables, self._segments(h)):
+            for mask in masks:
+                bucket = table.get(seg ^ mask)
+                if not bucket:
+                    continue
+                for item_id in bucket:
+                    if item_id in seen:
+                        continue
+                    seen.add(item_id)
+                    d = hamming(h, self._hash[item_id])
+                    if d <= radius:
+                        out.append((d, item_id))
+        return out
+
+class MappedMultiIndexHash(MultiIndexHash):
+    """
+    Read-only MultiIndexHash over a memory-mapped artifact, shared by every worker.
+    Rows are sorted by id; per segment, positions[offsets[v]:offsets[v + 1]] are the rows whose
+    segment value is v. max_id is the last row included; later rows live in a normal index.
+    """
+
+    def __init__(self, art):
+        super().__init__()
+        a = art.arrays
+        self._ids, self._phash, self._dhash = a["ids"], a["phash"], a["dhash"]
+        self._offsets = [a[f"offsets{i}"] for i in range(self.SEGMENTS)]
+        self._positions = [a[f"positions{i}"] for i in range(self.SEGMENTS)]
+        self.max_id = art.meta["max_id"]
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, h: int, item_id: int):
+        raise TypeError("artifact index is read-only")
+
+    def search(self, h: int, radius: int) -> List[tuple]:
+        """All (distance, id, dhash) within radius."""
+        out = []
+        seen = set()
+        masks = self._probe_masks(radius // self.SEGMENTS)
+        for offsets, positions, seg in zip(self._offsets, self._positions, self._segments(h)):
+            for mask in masks:
+                value = seg ^ mask
+                start, end = offsets[value], offsets[value + 1]
+                if start == end:
+                    continue
+                for pos in positions[start:end]:
+                    if pos in seen:
+                        continue
+                    seen.add(pos)
+                    d = hamming(h, self._phash[pos])
+                    if d <= radius:
+                        out.append((d, self._ids[pos], self._dhash[pos]))
+        return out
+
+def build_artifact(path: str = IMAGE_INDEX_PATH, out: Optional[str] = None) -> Dict:
+    """Snapshot every row of the image index into the mmap artifact."""
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        rows = conn.execute("SELECT id, phash, dhash, sha FROM images ORDER BY id").fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    finally:
+        conn.close()
+    segs, bits = MultiIndexHash.SEGMENTS, MultiIndexHash.BITS
+    arrays = {
+        "ids": array.array("q", (r[0] for r in rows)),
+        "phash": array.array("Q", (_unsigned(r[1]) for r in rows)),
+        "dhash": array.array("Q", (_unsigned(r[2]) for r in rows)),
+    }
+    for i in range(segs):
+        # counting sort by segment value -> CSR buckets
+        values = [(h >> (bits * i)) & 0xFFFF for h in arrays["phash"]]
+        offsets = array.array("I", [0] * ((1 << bits) + 1))
+        for v in values:
+            offsets[v + 1] += 1
+        for v in range(1 << bits):
+            offsets[v + 1] += offsets[v]
+        positions = array.array("I", [0] * len(values))
+        fill = offsets[:-1]
+        for pos, v in enumerate(values):
+            positions[fill[v]] = pos
+            fill[v] += 1
+        arrays[f"offsets{i}"] = offsets
+        arrays[f"positions{i}"] = positions
+    meta = {"max_id": rows[-1][0] if rows else 0, "last_sha": rows[-1][3] if rows else None,
+            "count": len(rows), "source": os.path.abspath(path)}
+    write_artifact(out or artifact_path("images"), "images", None, arrays, meta)
+    return meta
+
+class ImageIndex:
+    def __init__(self, path: str = IMAGE_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS images (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sha TEXT UNIQUE,
+                phash INTEGER,
+                dhash INTEGER,
+                first_seen REAL,
+                first_url TEXT,
+                last_seen REAL,
+                count INTEGER DEFAULT 1
+            );
+            CREATE TABLE IF NOT EXISTS image_verdicts (
+                image_id INTEGER,
+                claim TEXT,
+                severity TEXT,
+                score REAL,
+                timestamp REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_image_verdicts ON image_verdicts(image_id);
+        """)
+        self._base = self._open_artifact()
+        self._hashes = MultiIndexHash()         # rows added after the artifact was built
+        self._dhash: Dict[int, int] = {}
+        floor = self._base.max_id if self._base is not None else 0
+        for image_id, ph, dh in self._conn.execute("SELECT id, phash, dhash FROM images WHERE id > ?", (floor,)):
+            self._hashes.add(_unsigned(ph), image_id)
+            self._dhash[image_id] = _unsigned(dh)
+
+    def _open_artifact(self) -> Optional[MappedMultiIndexHash]:
+        art = open_artifact(artifact_path("images"), "images")
+        if art is None or art.meta.get("source") != os.path.abspath(self.path):
+            return None
+        # a snapshot of this database only if its last row is still the same image
+        if art.meta["max_id"]:
+            row = self._conn.execute("SELECT sha FROM images WHERE id = ?", (art.meta["max_id"],)).fetchone()
+            if row is None or row[0] != art.meta["last_sha"]:
+                return None
+        return MappedMultiIndexHash(art)
+
+    def add(self, sha: str, phash: int, dhash: int, url: Optional[str] = None, ts: Optional[float] = None) -> int:
+        ts = ts or time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM images WHERE sha = ?", (sha,)).fetchone()
+            if row:
+                self._conn.execute("UPDATE images SET last_seen = ?, count = count + 1 WHERE id = ?", (ts, row[0]))
+                self._conn.commit()
+                return row[0]
+            cur = self._conn.execute(
+                "INSERT INTO images (sha, phash, dhash, first_seen, first_url, last_seen) VALUES (?, ?, ?, ?, ?, ?)",
+                (sha, _signed(phash), _signed(dhash), ts, url, ts))
+            self._conn.commit()
+            image_id = cur.lastrowid
+            self._hashes.add(phash, image_id)
+            self._dhash[image_id] = dhash
+            return image_id
+
+    def lookup(self, phash: int, dhash: int, radius: int = PHASH_RADIUS,
+               dhash_radius: int = DHASH_RADIUS, exclude_sha: Optional[str] = None) -> Optional[Dict]:
+        """Earliest-seen near-duplicate (across all exact copies) with its prior verdicts."""
+        with self._lock:
+            candidates = [(d, i) for d, i in self._hashes.search(phash, radius)
+                          if hamming(dhash, self._dhash[i]) <= dhash_radius]
+            if self._base is not None:
+                candidates += [(d, i) for d, i, dh in self._base.search(phash, radius)
+                               if hamming(dhash, dh) <= dhash_radius]
+            if not candidates:
+                return None
+            # the closest few hundred are plenty and keep the IN (...) list under SQLite's limit
+            candidates = sorted(candidates)[:MAX_CANDIDATES]
+            ids = [i for _, i in candidates]
+            dist = dict((i, d) for d, i in candidates)
+            marks = ",".join("?" * len(ids))
+            rows = self._conn.execute(
+                f"SELECT id, sha, first_seen, first_url, last_seen, count FROM images WHERE id IN ({marks}) "
+                f"ORDER BY first_seen", ids).fetchall()
+            if exclude_sha:
+                rows = [r for r in rows if r[1] != exclude_sha]
+            if not rows:
+                return None
+            first = rows[0]
+            # only the copies that survived exclude_sha, or the image's own verdicts come back as "prior"
+            prior_ids = [r[0] for r in rows]
+            verdicts = self._conn.execute(
+                f"SELECT claim, severity, score, timestamp FROM image_verdicts "
+                f"WHERE image_id IN ({','.join('?' * len(prior_ids))}) "
+                f"ORDER BY timestamp DESC LIMIT ?", prior_ids + [MAX_VERDICTS_PER_IMAGE]).fetchall()
+        return {
+            "image_id": first[0],
+            "first_seen": first[2],
+            "first_url": first[3],
+            "distance": dist[first[0]],
+            "copies": len(rows),
+            "sightings": sum(r[5] for r in rows),
+            "prior_verdicts": [{"claim": c, "severity": s, "score": sc, "timestamp": t} for c, s, sc, t in verdicts],
+        }
+
+    def record_verdict(self, image_id: int, verification: Dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO image_verdicts (image_id, claim, severity, score, timestamp) VALUES (?, ?, ?, ?, ?)",
+                (image_id, (verification.get("claim") or "")[:500], verification.get("severity", "Uncertain"),
+                 verification.get("score", 0.0), time.time()))
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            verdicts = self._conn.execute("SELECT COUNT(*) FROM image_verdicts").fetchone()[0]
+        base = len(self._base) if self._base is not None else 0
+        return {"images": len(self._dhash) + base, "indexed": len(self._hashes) + base,
+                "from_artifact": base, "verdicts": verdicts}
+
+_index: Optional[ImageIndex] = None
+
+def get_image_index() -> ImageIndex:
+    global _index
+    if _index is None:
+        _index = ImageIndex()
+    return _index
+
+if __name__ == "__main__":
+    print(json.dumps(get_image_index().stats(), indent=2))
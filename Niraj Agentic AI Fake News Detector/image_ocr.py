@@ -9,15 +9,10 @@ import os
 import re
 from typing import Tuple
 
-# Try to import pytesseract + PIL
-try:
-    import pytesseract
-    from PIL import Image
-    _PYTESS_OK = True
-except Exception:
-    pytesseract = None
-    Image = None
-    _PYTESS_OK = False
+from lazy_imports import available, optional
+
+# pytesseract + PIL are imported by the first OCR call; here we only check they are installed
+_PYTESS_OK = available("pytesseract") and available("PIL")
 
 # Simple heuristics
 _CLAIM_KEYWORDS = {"cause","causes","leads to","linked to","prevent","cure","cures","proven","study shows","studies show"}
@@ -25,15 +20,68 @@ _NEWS_KEYWORDS = {"reported","reports","breaking","announced","confirmed","state
 _OPINION_KEYWORDS = {"i think","in my opinion","we should","we must","i believe","opinion","imo"}
 _SATIRE_KEYWORDS = {"satire","parody","not real","joke","fake news"}
 
+# Preprocessing: Tesseract does best on grayscale text around 300 DPI; phone screenshots and
+# memes are usually far larger than needed, which only costs time.
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "2000"))
+OCR_MIN_SIDE = int(os.getenv("OCR_MIN_SIDE", "400"))
+
 def _clean_text(t: str) -> str:
     return re.sub(r'\s+', ' ', (t or "").strip())
 
+def preprocess_image(img):
+    """Grayscale, crop uniform borders, and rescale into the OCR-friendly size range."""
+    from PIL import Image, ImageOps, ImageChops
+    img = ImageOps.exif_transpose(img).convert("L")
+    # crop flat borders (letterboxing, padding) by diffing against the corner colour
+    bg = Image.new("L", img.size, img.getpixel((0, 0)))
+    bbox = ImageChops.difference(img, bg).point(lambda p: 255 if p > 24 else 0).getbbox()
+    if bbox and (bbox[2] - bbox[0]) * (bbox[3] - bbox[1]) < img.size[0] * img.size[1]:
+        # keep a small quiet zone around the text; Tesseract misreads glyphs touching the edge
+        m = 10
+        img = img.crop((max(0, bbox[0] - m), max(0, bbox[1] - m),
+                        min(img.size[0], bbox[2] + m), min(img.size[1], bbox[3] + m)))
+    longest, shortest = max(img.size), min(img.size)
+    if longest > OCR_MAX_SIDE:
+        scale = OCR_MAX_SIDE / longest
+    elif 0 < shortest < OCR_MIN_SIDE:
+        scale = min(OCR_MIN_SIDE / shortest, OCR_MAX_SIDE / longest, 4.0)
+    else:
+        scale = 1.0
+    if scale != 1.0:
+        img = img.resize((max(1, int(img.size[0] * scale)), max(1, int(img.size[1] * scale))), Image.LANCZOS)
+    return img
+
+def ocr_image_bytes(data, timeout: float = 0) -> str:
+    """OCR raw image bytes, a binary file or a file path (preprocessed). Top-level so it can run
+    in a process pool worker."""
+    if not _PYTESS_OK:
+        raise RuntimeError("pytesseract or PIL not available")
+    from image_hashing import open_image
+    pytesseract = optional("pytesseract")
+    with open_image(data) as img:
+        prepared = preprocess_image(img)
+    return _clean_text(pytesseract.image_to_string(prepared, timeout=timeout))
+
 def ocr_with_pytesseract(image_path: str) -> str:
     if not _PYTESS_OK:
         raise RuntimeError("pytesseract or PIL not available")
-    img = Image.open(image_path)
-    text = pytesseract.image_to_string(img)
-    return _clean_text(text)
+    with open(image_path, "rb") as f:
+        return ocr_image_bytes(f.read())
+
+def _cached_ocr(data) -> str:
+    # same cache as ocr_service.analyze_image: exact bytes first, then near-duplicate pHash
+    from media_cache import get_media_cache
+    from image_hashing import image_hashes
+    cache = get_media_cache()
+    sha, ph, _ = image_hashes(data)
+    hit = cache.get_by_sha(sha) or cache.get_by_phash(ph)
+    if hit is not None:
+        return hit["text"]
+    cache.record_miss()
+    text = ocr_image_bytes(data)
+    label, details = classify_text_info(text)
+    cache.put(sha, ph, text, label, details)
+    return text
 
 def extract_text_from_image(path_or_url: str) -> Tuple[str, str]:
     """
@@ -42,20 +90,24 @@ def extract_text_from_image(path_or_url: str) -> Tuple[str, str]:
     """
     if _PYTESS_OK:
         try:
-            # If url-like, download first
-            if path_or_url.startswith("http://") or path_or_url.startswith("https://"):
-                import httpx, io
-                r = httpx.get(path_or_url, timeout=20)
-                r.raise_for_status()
-                img = Image.open(io.BytesIO(r.content))
-                text = pytesseract.image_to_string(img)
-                return _clean_text(text), "pytesseract"
-            else:
-                return ocr_with_pytesseract(path_or_url), "pytesseract"
+            # streamed + size-capped download for URLs; local files are size-checked the same way.
+            # Hashing and PIL read the spooled file in place, so the body is never copied to bytes
+            from media_fetch import load_media
+            with load_media(path_or_url, "image") as buf:
+                return _cached_ocr(buf.fileobj()), "pytesseract"
         except Exception as e:
             return "", "none"
     return "", "none"
 
+def extract_text_from_bytes(data: bytes) -> Tuple[str, str]:
+    """Same as extract_text_from_image for bytes already in hand."""
+    if _PYTESS_OK and data:
+        try:
+            return _cached_ocr(data), "pytesseract"
+        except Exception:
+            return "", "none"
+    return "", "none"
+
 def classify_text_info(text: str) -> Tuple[str, dict]:
     """
     Heuristic classifier. Returns (label, details).
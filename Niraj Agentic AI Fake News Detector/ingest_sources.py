@@ -0,0 +1,276 @@
+# ingest_sources.py
+"""
+Pluggable ingest sources.
+- IngestSource: base class; subclasses implement `stream(client, query, limit)` (async generator of items)
+- Built-in kinds: newsdata, gnews, mediastack, rss (one source per feed), replay (local JSONL corpus)
+- register_source(kind) adds a factory; build_sources("newsdata,rss,...", **ctx) instantiates them
+Items are plain dicts in the shape multimodal_analyzer expects (type/source/title/text/image_url/url/published).
+"""
+
+import os
+import json
+import time
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Callable, AsyncIterator, Optional
+
+import httpx
+from feed_parser import FeedParser
+from metrics import register_provider
+
+NEWSDATA_KEY = os.getenv("NEWSDATA_API_KEY", "")
+GNEWS_KEY = os.getenv("GNEWS_API_KEY", "")
+MEDIASTACK_KEY = os.getenv("MEDIASTACK_API_KEY", "")
+
+NEWSDATA_URL = os.getenv("NEWSDATA_URL", "https://newsdata.io/api/1/news")
+GNEWS_URL = os.getenv("GNEWS_URL", "https://gnews.io/api/v4/search")
+MEDIASTACK_URL = os.getenv("MEDIASTACK_URL", "http://api.mediastack.com/v1/news")
+for _url, _provider in ((NEWSDATA_URL, "newsdata"), (GNEWS_URL, "gnews"), (MEDIASTACK_URL, "mediastack")):
+    register_provider(_url, _provider)
+
+RSS_MAX_ITEMS = int(os.getenv("RSS_MAX_ITEMS", "5"))          # new articles kept per feed per poll
+RSS_MAX_BYTES = int(os.getenv("RSS_MAX_BYTES", str(5 * 1024 * 1024)))
+
+REPLAY_FILE = os.getenv("INGEST_REPLAY_FILE", "")
+REPLAY_RATE = float(os.getenv("INGEST_REPLAY_RATE", "0"))       # items/second, 0 = as fast as possible
+REPLAY_MAX_ITEMS = int(os.getenv("INGEST_REPLAY_MAX_ITEMS", "0"))  # per cycle, 0 = rest of the file
+REPLAY_LOOP = os.getenv("INGEST_REPLAY_LOOP", "0") == "1"
+
+DEFAULT_SOURCES = "newsdata,gnews,mediastack,rss,replay"
+
+async def _get_json(client: httpx.AsyncClient, url: str, params: dict = None):
+    r = await client.get(url, params=params)
+    r.raise_for_status()
+    return r.json()
+
+class IngestSource:
+    name = "source"
+    # Per-source deadline for one cycle; None = no deadline (e.g. long replays)
+    timeout: Optional[float] = 20.0
+
+    def is_due(self) -> bool:
+        return True
+
+    async def fetch(self, client: httpx.AsyncClient, query: str, limit: int) -> List[Dict]:
+        raise NotImplementedError
+
+    async def stream(self, client: httpx.AsyncClient, query: str, limit: int) -> AsyncIterator[Dict]:
+        """Default: one request, then yield its items. Override to yield incrementally."""
+        for item in await self.fetch(client, query, limit):
+            yield item
+
+class NewsDataSource(IngestSource):
+    name = "NewsData"
+
+    async def fetch(self, client, query, limit):
+        js = await _get_json(client, NEWSDATA_URL, {"apikey": NEWSDATA_KEY, "q": query, "language": "en", "page": 1})
+        return [{
+            "type": "text",
+            "source": a.get("source_id") or "newsdata",
+            "title": a.get("title"),
+            "text": (a.get("content") or a.get("description") or "")[:4000],
+            "image_url": a.get("image_url"),
+            "url": a.get("link"),
+            "published": a.get("pubDate") or datetime.utcnow().isoformat()
+        } for a in js.get("results", [])[:limit]]
+
+class GNewsSource(IngestSource):
+    name = "GNews"
+
+    async def fetch(self, client, query, limit):
+        js = await _get_json(client, GNEWS_URL, {"q": query, "token": GNEWS_KEY, "max": limit})
+        return [{
+            "type": "text",
+            "source": a.get("source", {}).get("name", "gnews"),
+            "title": a.get("title"),
+            "text": (a.get("content") or a.get("description") or "")[:4000],
+            "image_url": a.get("image"),
+            "url": a.get("url"),
+            "published": a.get("publishedAt") or datetime.utcnow().isoformat()
+        } for a in js.get("articles", [])[:limit]]
+
+class MediastackSource(IngestSource):
+    name = "Mediastack"
+
+    async def fetch(self, client, query, limit):
+        js = await _get_json(client, MEDIASTACK_URL, {"access_key": MEDIASTACK_KEY, "keywords": query, "limit": limit})
+        return [{
+            "type": "text",
+            "source": a.get("source", "mediastack"),
+            "title": a.get("title"),
+            "text": (a.get("description") or "")[:4000],
+            "image_url": a.get("image"),
+            "url": a.get("url"),
+            "published": a.get("published_at") or datetime.utcnow().isoformat()
+        } for a in js.get("data", [])[:limit]]
+
+class RSSFeedSource(IngestSource):
+    """One RSS/Atom feed, polled per its FeedScheduler state (conditional GET, TTL, adaptive interval)."""
+
+    def __init__(self, feed: Dict, scheduler):
+        self.feed = feed
+        self.name = feed["name"]
+        self.scheduler = scheduler
+        register_provider(feed["url"], "rss")
+
+    def is_due(self) -> bool:
+        return bool(self.scheduler.due([self.feed]))
+
+    async def fetch(self, client, query, limit):
+        """Stream the feed through the incremental parser; stop reading once enough new items are in."""
+        st = self.scheduler.state(self.feed)
+        parser = FeedParser(self.name, max_items=RSS_MAX_ITEMS, seen_ids=st.seen_ids)
+        items: List[Dict] = []
+        received = 0
+        truncated = False
+        try:
+            async with client.stream("GET", self.feed["url"], headers=st.request_headers()) as r:
+                if r.status_code == 304:
+                    self.scheduler.record(st, 304)
+                    return []
+                r.raise_for_status()
+                async for chunk in r.aiter_bytes():
+                    received += len(chunk)
+                    items.extend(parser.feed(chunk))
+                    if parser.done or received >= RSS_MAX_BYTES:
+                        truncated = True
+                        break
+                else:
+                    items.extend(parser.close())
+        except BaseException:
+            self.scheduler.record_error(st)
+            raise
+        st.mark_seen(it["guid"] for it in items)
+        self.scheduler.record(st, r.status_code, r.headers, parser.ttl, len(items), truncated=truncated)
+        return items
+
+class JSONLReplaySource(IngestSource):
+    """
+    Replays a recorded corpus (one item per line) at `rate` items/second, or as fast as possible.
+    Reads line by line, so corpus size is not limited by memory; the file position carries over
+    between cycles and wraps around when `loop` is set.
+    """
+    timeout = None
+
+    def __init__(self, path: str, rate: float = REPLAY_RATE, max_items: int = REPLAY_MAX_ITEMS,
+                 loop: bool = REPLAY_LOOP):
+        self.path = path
+        self.name = f"replay:{os.path.basename(path)}"
+        self.rate = rate
+        self.max_items = max_items
+        self.loop = loop
+        self._offset = 0
+        self._exhausted = False
+
+    def is_due(self) -> bool:
+        return not self._exhausted
+
+    @staticmethod
+    def _normalize(raw: Dict) -> Dict:
+        item = dict(raw)
+        item.setdefault("type", "text")
+        item.setdefault("source", "replay")
+        item.setdefault("image_url", None)
+        item.setdefault("url", "")
+        item.setdefault("published", datetime.utcnow().isoformat())
+        return item
+
+    async def stream(self, client, query, limit):
+        produced = 0
+        wrapped_at = None
+        start = time.perf_counter()
+        with open(self.path, "r", encoding="utf-8") as f:
+            f.seek(self._offset)
+            while not self.max_items or produced < self.max_items:
+                line = f.readline()
+                if not line:
+                    # wrap once per new item produced; a second EOF with nothing new means an empty corpus
+                    if self.loop and wrapped_at != produced:
+                        wrapped_at = produced
+                        f.seek(0)
+                        continue
+                    self._exhausted = not self.loop
+                    break
+                self._offset = f.tell()
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    raw = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if self.rate > 0:
+                    # pace against the schedule rather than per-item sleeps, so drift doesn't accumulate
+                    delay = start + produced / self.rate - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                elif produced % 500 == 0:
+                    await asyncio.sleep(0)   # let consumers run
+                produced += 1
+                yield self._normalize(raw)
+
+# ===== REGISTRY =====
+
+_REGISTRY: Dict[str, Callable[..., List[IngestSource]]] = {}
+
+def register_source(kind: str):
+    """Decorator: register a factory returning a list of sources (empty when not configured)."""
+    def decorator(factory):
+        _REGISTRY[kind] = factory
+        return factory
+    return decorator
+
+@register_source("newsdata")
+def _newsdata_sources(**ctx):
+    return [NewsDataSource()] if NEWSDATA_KEY else []
+
+@register_source("gnews")
+def _gnews_sources(**ctx):
+    return [GNewsSource()] if GNEWS_KEY else []
+
+@register_source("mediastack")
+def _mediastack_sources(**ctx):
+    return [MediastackSource()] if MEDIASTACK_KEY else []
+
+@register_source("rss")
+def _rss_sources(feeds=(), scheduler=None, **ctx):
+    return [RSSFeedSource(feed, scheduler) for feed in feeds] if scheduler else []
+
+@register_source("replay")
+def _replay_sources(replay_file: str = REPLAY_FILE, **ctx):
+    return [JSONLReplaySource(replay_file)] if replay_file else []
+
+def available_sources() -> List[str]:
+    return sorted(_REGISTRY)
+
+def build_sources(spec: str = DEFAULT_SOURCES, **ctx) -> List[IngestSource]:
+    sources: List[IngestSource] = []
+    for kind in (k.strip() for k in spec.split(",")):
+        if not kind:
+            continue
+        factory = _REGISTRY.get(kind)
+        if factory is None:
+            print(f"⚠️ Unknown ingest source '{kind}' (available: {', '.join(available_sources())})")
+            continue
+        sources.extend(factory(**ctx))
+    return sources
+
+def write_jsonl(items, path: str) -> int:
+    """Append items to a JSONL corpus usable by the replay source."""
+    n = 0
+    with open(path, "a", encoding="utf-8") as f:
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            n += 1
+    return n
+
+if __name__ == "__main__":
+    # Record a replay corpus from the live sources: python ingest_sources.py out.jsonl [cycles]
+    import sys
+    from multimodal_ingest import ingest_text_sources
+    out = sys.argv[1] if len(sys.argv) > 1 else "corpus.jsonl"
+    cycles = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    total = 0
+    for _ in range(cycles):
+        total += write_jsonl(asyncio.run(ingest_text_sources()), out)
+    print(f"💾 Recorded {total} items to {out}")
@@ -0,0 +1,61 @@
+# lazy_imports.py
+"""
+Optional heavy dependencies, imported on first use rather than when a module is loaded.
+- optional("groq") -> module or None (cached, including failures)
+- available("pytesseract") -> bool, checked with find_spec so nothing is imported
+- DEPLOYMENT_PROFILE=text: text-only deployment. The media libraries (groq, elevenlabs,
+  pytesseract, PIL) are never imported and image/audio analysis is skipped. This saves their
+  first-use import and memory, not start-up time: app doesn't import them in either profile, and
+  its cold import is dominated by Flask and Flask-SocketIO (see startup_report.py)
+- loaded_media_libraries(): which of them are in sys.modules (the startup report checks it)
+"""
+
+import os
+import sys
+import time
+import importlib
+import importlib.util
+import threading
+from typing import Dict, List, Optional
+
+DEPLOYMENT_PROFILE = os.getenv("DEPLOYMENT_PROFILE", "full").lower()
+TEXT_ONLY = DEPLOYMENT_PROFILE in ("text", "text-only")
+MEDIA_LIBRARIES = ("groq", "elevenlabs", "pytesseract", "PIL")
+
+_lock = threading.Lock()
+_modules: Dict[str, Optional[object]] = {}
+IMPORT_SECONDS: Dict[str, float] = {}       # first-use import cost of each optional dependency
+
+def _blocked(name: str) -> bool:
+    return TEXT_ONLY and name.split(".")[0] in MEDIA_LIBRARIES
+
+def available(name: str) -> bool:
+    """True if the package could be imported (without importing it)."""
+    if _blocked(name):
+        return False
+    if name in _modules:
+        return _modules[name] is not None
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+def optional(name: str):
+    """Import name on first call; None if it is missing, broken, or blocked by the text-only profile."""
+    if name in _modules:
+        return _modules[name]
+    with _lock:
+        if name not in _modules:
+            module = None
+            if not _blocked(name):
+                start = time.perf_counter()
+                try:
+                    module = importlib.import_module(name)
+                except Exception:
+                    module = None
+                IMPORT_SECONDS[name] = time.perf_counter() - start
+            _modules[name] = module
+    return _modules[name]
+
+def loaded_media_libraries() -> List[str]:
+    return [name for name in MEDIA_LIBRARIES if name in sys.modules]
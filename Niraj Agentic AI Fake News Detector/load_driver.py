@@ -0,0 +1,125 @@
+# load_driver.py
+"""
+Open-loop load generator for POST /api/analyze.
+Requests are issued on a fixed schedule (target QPS) regardless of how fast the server answers,
+so queueing inside the service shows up in the latency percentiles instead of being hidden.
+
+    python load_driver.py --url http://127.0.0.1:5000 --qps 20 --duration 60 [--claims claims.txt] [--json out.json]
+
+Pair with stub_apis.py so verification hits local stand-ins instead of the real APIs.
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from typing import Dict, List, Optional
+
+import httpx
+
+DEFAULT_CLAIMS = [
+    "Vaccines cause autism",
+    "New study shows exercise benefits heart health",
+    "5G towers spread the coronavirus",
+    "Government announces new flood relief package",
+    "Miracle cure for cancer they don't want you to know about",
+    "Scientists found evidence of water on Mars",
+    "Wildfire smoke linked to increase in hospital visits",
+    "Official report confirms ceasefire in the region",
+    "Drinking bleach kills the virus instantly",
+    "Peer-reviewed clinical trial shows vaccine effective",
+]
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+def summarize(latencies: List[float], statuses: Dict[str, int], elapsed: float, skipped: int) -> Dict:
+    lat = sorted(latencies)
+    ms = lambda v: round(v * 1000, 1)
+    return {
+        "requests": len(lat),
+        "achieved_qps": round(len(lat) / elapsed, 2) if elapsed else 0.0,
+        "skipped_inflight_cap": skipped,
+        "statuses": statuses,
+        "latency_ms": {
+            "p50": ms(percentile(lat, 50)), "p90": ms(percentile(lat, 90)), "p95": ms(percentile(lat, 95)),
+            "p99": ms(percentile(lat, 99)), "max": ms(lat[-1]) if lat else 0.0,
+            "mean": ms(sum(lat) / len(lat)) if lat else 0.0,
+        },
+    }
+
+async def run_load(url: str, qps: float, duration: float, claims: List[str], max_inflight: int = 500,
+                   timeout: float = 60.0) -> Dict:
+    endpoint = url.rstrip("/") + "/api/analyze"
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    skipped = 0
+    inflight = set()
+    rng = random.Random(42)
+
+    limits = httpx.Limits(max_connections=max_inflight, max_keepalive_connections=max_inflight)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        async def one(text: str):
+            start = time.perf_counter()
+            try:
+                r = await client.post(endpoint, json={"text": text})
+                key = str(r.status_code)
+            except httpx.TimeoutException:
+                key = "timeout"
+            except httpx.HTTPError as e:
+                key = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[key] = statuses.get(key, 0) + 1
+
+        start = time.perf_counter()
+        total = int(qps * duration)
+        for i in range(total):
+            delay = start + i / qps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(inflight) >= max_inflight:
+                skipped += 1
+                continue
+            task = asyncio.create_task(one(rng.choice(claims)))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+        if inflight:
+            await asyncio.gather(*inflight, return_exceptions=True)
+        elapsed = time.perf_counter() - start
+
+    return summarize(latencies, statuses, elapsed, skipped)
+
+def _load_claims(path: Optional[str]) -> List[str]:
+    if not path:
+        return DEFAULT_CLAIMS
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            lines = [json.loads(l) for l in f if l.strip()]
+            return [(l.get("title") or l.get("text") or "") if isinstance(l, dict) else str(l) for l in lines]
+        return [l.strip() for l in f if l.strip()]
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Open-loop load driver for /api/analyze")
+    ap.add_argument("--url", default="http://127.0.0.1:5000")
+    ap.add_argument("--qps", type=float, default=10.0)
+    ap.add_argument("--duration", type=float, default=30.0)
+    ap.add_argument("--claims", help="text file (one claim per line) or JSONL corpus")
+    ap.add_argument("--max-inflight", type=int, default=500)
+    ap.add_argument("--json", help="write the summary to this file")
+    args = ap.parse_args()
+
+    print(f"🚦 {args.qps} QPS for {args.duration}s against {args.url}/api/analyze")
+    result = asyncio.run(run_load(args.url, args.qps, args.duration, _load_claims(args.claims), args.max_inflight))
+    result["target_qps"] = args.qps
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    sys.exit(0 if result["requests"] else 1)
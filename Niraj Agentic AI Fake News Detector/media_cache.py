@@ -0,0 +1,157 @@
+# media_cache.py
+"""
+Content-addressed cache for image OCR / classification results (SQLite, disk-backed LRU).
+- Primary key: sha256 of the image bytes (exact reshares)
+- Secondary key: 64-bit pHash, for resized/recompressed copies. The hash is stored as four 16-bit
+  segments, each indexed; any hash within PHASH_MAX_DISTANCE <= 3 bits shares at least one
+  segment exactly (pigeonhole), so a near-match lookup is four indexed probes, not a scan.
+- URL alias: url -> sha256 for URL_ALIAS_TTL seconds, so a repeat URL skips the download as well
+Entries beyond MEDIA_CACHE_MAX_ENTRIES are evicted least-recently-used first.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+from image_hashing import hamming
+
+MEDIA_CACHE_PATH = os.getenv("MEDIA_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "media_cache.db"))
+MEDIA_CACHE_MAX_ENTRIES = int(os.getenv("MEDIA_CACHE_MAX_ENTRIES", "100000"))
+PHASH_MAX_DISTANCE = min(3, int(os.getenv("PHASH_MAX_DISTANCE", "3")))
+URL_ALIAS_TTL = float(os.getenv("MEDIA_URL_ALIAS_TTL", "86400"))
+
+def _segments(h: int):
+    return [(h >> shift) & 0xFFFF for shift in (48, 32, 16, 0)]
+
+def _signed(h: int) -> int:
+    # SQLite integers are signed 64-bit
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+class MediaCache:
+    def __init__(self, path: str = MEDIA_CACHE_PATH, max_entries: int = MEDIA_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = {"sha": 0, "phash": 0, "url": 0}
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_cache (
+                sha TEXT PRIMARY KEY,
+                phash INTEGER,
+                s0 INTEGER, s1 INTEGER, s2 INTEGER, s3 INTEGER,
+                text TEXT,
+                label TEXT,
+                details TEXT,
+                created REAL,
+                last_access REAL,
+                hits INTEGER DEFAULT 0
+            )""")
+        for i in range(4):
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_ocr_s{i} ON ocr_cache(s{i})")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_access ON ocr_cache(last_access)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS url_alias (url TEXT PRIMARY KEY, sha TEXT, seen REAL)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM ocr_cache").fetchone()[0]
+
+    def _row(self, row) -> Dict:
+        sha, phash, text, label, details = row
+        return {"sha": sha, "phash": phash & ((1 << 64) - 1) if phash is not None else None,
+                "text": text, "label": label, "details": json.loads(details or "{}")}
+
+    def _touch(self, sha: str):
+        self._conn.execute("UPDATE ocr_cache SET last_access = ?, hits = hits + 1 WHERE sha = ?", (time.time(), sha))
+        self._conn.commit()
+
+    def get_by_sha(self, sha: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT sha, phash, text, label, details FROM ocr_cache WHERE sha = ?",
+                                     (sha,)).fetchone()
+            if row:
+                self._touch(sha)
+                self.hits["sha"] += 1
+                return self._row(row)
+        return None
+
+    def get_by_phash(self, phash: int, max_distance: int = PHASH_MAX_DISTANCE) -> Optional[Dict]:
+        segs = _segments(phash)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sha, phash, text, label, details FROM ocr_cache "
+                "WHERE s0 = ? OR s1 = ? OR s2 = ? OR s3 = ?", segs).fetchall()
+            best, best_d = None, max_distance + 1
+            for row in rows:
+                d = hamming(phash, row[1] & ((1 << 64) - 1))
+                if d < best_d:
+                    best, best_d = row, d
+            if best is not None:
+                self._touch(best[0])
+                self.hits["phash"] += 1
+                return self._row(best)
+        return None
+
+    def get_by_url(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT sha, seen FROM url_alias WHERE url = ?", (url,)).fetchone()
+        if not row or time.time() - row[1] > URL_ALIAS_TTL:
+            return None
+        hit = self.get_by_sha(row[0])
+        if hit:
+            with self._lock:
+                self.hits["sha"] -= 1
+                self.hits["url"] += 1
+        return hit
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def put(self, sha: str, phash: Optional[int], text: str, label: str, details: Optional[Dict] = None,
+            url: Optional[str] = None):
+        now = time.time()
+        segs = _segments(phash) if phash is not None else [None] * 4
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO ocr_cache (sha, phash, s0, s1, s2, s3, text, label, details, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (sha, _signed(phash) if phash is not None else None, *segs, text, label,
+                 json.dumps(details or {}), now, now))
+            self._count += cur.rowcount
+            if url:
+                self._conn.execute("INSERT OR REPLACE INTO url_alias (url, sha, seen) VALUES (?, ?, ?)", (url, sha, now))
+            self._conn.commit()
+            if self._count > self.max_entries:
+                self._evict()
+
+    def alias_url(self, url: str, sha: str):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO url_alias (url, sha, seen) VALUES (?, ?, ?)", (url, sha, time.time()))
+            self._conn.commit()
+
+    def _evict(self):
+        # drop ~10% below the cap in one go so eviction doesn't run on every insert
+        target = int(self.max_entries * 0.9)
+        excess = self._count - target
+        self._conn.execute(
+            "DELETE FROM ocr_cache WHERE sha IN (SELECT sha FROM ocr_cache ORDER BY last_access LIMIT ?)", (excess,))
+        self._conn.execute("DELETE FROM url_alias WHERE seen < ? OR sha NOT IN (SELECT sha FROM ocr_cache)",
+                           (time.time() - URL_ALIAS_TTL,))
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM ocr_cache").fetchone()[0]
+
+    def stats(self) -> Dict:
+        lookups = sum(self.hits.values()) + self.misses
+        return {"entries": self._count, "hits": dict(self.hits), "misses": self.misses,
+                "hit_rate": round(sum(self.hits.values()) / lookups, 3) if lookups else 0.0}
+
+_cache: Optional[MediaCache] = None
+
+def get_media_cache() -> MediaCache:
+    global _cache
+    if _cache is None:
+        _cache = MediaCache()
+    return _cache
@@ -0,0 +1,221 @@
+# media_fetch.py
+"""
+Bounded media downloads for OCR / STT.
+- fetch_media(url, kind) / afetch_media(url, kind) -> MediaBuffer   # sync / async
+- open_media(path, kind) -> MediaBuffer                            # local files, same checks
+Downloads are streamed with a hard byte cap (Content-Length is checked up front, the running
+total while streaming) and a wall-clock deadline for the whole download (httpx's timeout is
+per read, so a server trickling bytes would otherwise never time out), and the Content-Type
+must match the media kind. The body spools into
+memory up to MEDIA_SPOOL_BYTES and rolls over to a temp file beyond that, so one oversized or
+slow item can't blow up the worker. MediaBuffer.view() gives a zero-copy memoryview (mmap for
+spooled/local files); .read() returns bytes when a consumer needs them. .payload() is what to
+hand a worker process: the file's path once the body is on disk, bytes only for small bodies.
+"""
+
+import io
+import os
+import mmap
+import time
+import asyncio
+import tempfile
+from typing import Optional
+
+import httpx
+
+MEDIA_MAX_IMAGE_BYTES = int(os.getenv("MEDIA_MAX_IMAGE_BYTES", str(15 * 1024 * 1024)))
+MEDIA_MAX_AUDIO_BYTES = int(os.getenv("MEDIA_MAX_AUDIO_BYTES", str(50 * 1024 * 1024)))
+MEDIA_SPOOL_BYTES = int(os.getenv("MEDIA_SPOOL_BYTES", str(1024 * 1024)))
+MEDIA_FETCH_TIMEOUT = float(os.getenv("MEDIA_FETCH_TIMEOUT", "20"))
+
+_MAX_BYTES = {"image": MEDIA_MAX_IMAGE_BYTES, "audio": MEDIA_MAX_AUDIO_BYTES}
+# servers often send these for media; the magic-byte sniff decides instead
+_GENERIC_TYPES = ("application/octet-stream", "binary/octet-stream", "")
+
+_MAGIC = {
+    "image": [b"\xff\xd8\xff", b"\x89PNG", b"GIF8", b"BM", b"II*\x00", b"MM\x00*"],
+    "audio": [b"ID3", b"\xff\xfb", b"\xff\xf3", b"\xff\xf2", b"OggS", b"fLaC", b"\x1aE\xdf\xa3"],
+}
+
+class MediaFetchError(RuntimeError):
+    pass
+
+def _sniff(kind: str, head: bytes) -> bool:
+    if head[:4] == b"RIFF":                     # WEBP / WAV share the RIFF container
+        return head[8:12] == (b"WEBP" if kind == "image" else b"WAVE")
+    if kind == "audio" and head[4:8] == b"ftyp":  # m4a / mp4 audio
+        return True
+    return any(head.startswith(m) for m in _MAGIC.get(kind, []))
+
+def _check_type(kind: str, content_type: str):
+    ctype = (content_type or "").split(";")[0].strip().lower()
+    if ctype in _GENERIC_TYPES:
+        return
+    if kind == "audio" and ctype in ("video/webm", "video/mp4", "video/ogg"):
+        return
+    if not ctype.startswith(kind + "/"):
+        raise MediaFetchError(f"unexpected content type {ctype!r} for {kind}")
+
+def _check_length(headers, limit: int):
+    length = headers.get("content-length")
+    if length and length.isdigit() and int(length) > limit:
+        raise MediaFetchError(f"media too large: {length} bytes (limit {limit})")
+
+class MediaBuffer:
+    """Spooled media body. Use as a context manager, or close() when done."""
+
+    def __init__(self, kind: str, content_type: str = "", source: str = "", fileobj=None):
+        self.kind = kind
+        self.content_type = content_type
+        self.source = source
+        self.size = 0
+        # body on disk (a local file, or the temp file a download rolled over to); None in memory
+        self.path: Optional[str] = getattr(fileobj, "name", None) if fileobj is not None else None
+        self._file = fileobj if fileobj is not None else io.BytesIO()
+        self._in_memory = fileobj is None
+        self._temp = False
+        self._mmap: Optional[mmap.mmap] = None
+
+    def _write(self, chunk: bytes, limit: int):
+        if self.size == 0 and chunk and not _sniff(self.kind, chunk[:16]) \
+                and (self.content_type.split(";")[0].strip().lower() in _GENERIC_TYPES):
+            raise MediaFetchError(f"content does not look like {self.kind}")
+        self.size += len(chunk)
+        if self.size > limit:
+            raise MediaFetchError(f"media too large: over {limit} bytes")
+        if self._in_memory and self.size > MEDIA_SPOOL_BYTES:
+            self._roll_over()
+        self._file.write(chunk)
+
+    def _roll_over(self):
+        # a named file (not TemporaryFile) so a worker process can open it by path
+        fd, path = tempfile.mkstemp(suffix=".media")
+        disk = os.fdopen(fd, "w+b")
+        disk.write(self._file.getbuffer())
+        self._file.close()
+        self._file, self.path, self._in_memory, self._temp = disk, path, False, True
+
+    def _map(self) -> mmap.mmap:
+        if self._mmap is None:
+            self._file.flush()
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def view(self) -> memoryview:
+        """Zero-copy view of the body; release() it before close()."""
+        if self.size == 0:
+            return memoryview(b"")
+        if self._in_memory:
+            return memoryview(self._file.getvalue())
+        return memoryview(self._map())
+
+    def read(self) -> bytes:
+        if self.size == 0:
+            return b""
+        if self._in_memory:
+            return self._file.getvalue()
+        return self._map()[:]
+
+    def payload(self):
+        """The body for a process-pool worker: its path when on disk, else (small) bytes."""
+        if self.path is not None and not self._in_memory:
+            self._file.flush()
+            return self.path
+        return self.read()
+
+    def fileobj(self):
+        """The underlying file, rewound - for consumers that take a file handle (PIL, STT clients)."""
+        self._file.seek(0)
+        return self._file
+
+    def close(self):
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass                # a caller still holds a view; the map goes with it
+            self._mmap = None
+        self._file.close()
+        if self._temp:
+            self._temp = False
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass                # Windows: a timed-out worker may still have it open
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _limit(kind: str, max_bytes: Optional[int]) -> int:
+    return max_bytes if max_bytes is not None else _MAX_BYTES.get(kind, MEDIA_MAX_IMAGE_BYTES)
+
+def fetch_media(url: str, kind: str = "image", max_bytes: Optional[int] = None,
+                timeout: float = MEDIA_FETCH_TIMEOUT) -> MediaBuffer:
+    limit = _limit(kind, max_bytes)
+    with httpx.Client(timeout=timeout, follow_redirects=True) as client:
+        with client.stream("GET", url) as r:
+            r.raise_for_status()
+            _check_type(kind, r.headers.get("content-type", ""))
+            _check_length(r.headers, limit)
+            buf = MediaBuffer(kind, r.headers.get("content-type", ""), url)
+            deadline = time.monotonic() + timeout
+            try:
+                # no chunk_size: httpx would hold data back until a full chunk arrived
+                for chunk in r.iter_bytes():
+                    buf._write(chunk, limit)
+                    # checked per chunk; one stalled read is still bounded by httpx's read timeout
+                    if time.monotonic() > deadline:
+                        raise MediaFetchError(f"download exceeded {timeout}s")
+            except BaseException:
+                buf.close()
+                raise
+    return buf
+
+async def afetch_media(url: str, kind: str = "image", max_bytes: Optional[int] = None,
+                       timeout: float = MEDIA_FETCH_TIMEOUT) -> MediaBuffer:
+    limit = _limit(kind, max_bytes)
+
+    async def download() -> MediaBuffer:
+        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+            async with client.stream("GET", url) as r:
+                r.raise_for_status()
+                _check_type(kind, r.headers.get("content-type", ""))
+                _check_length(r.headers, limit)
+                buf = MediaBuffer(kind, r.headers.get("content-type", ""), url)
+                try:
+                    async for chunk in r.aiter_bytes():
+                        buf._write(chunk, limit)
+                except BaseException:
+                    buf.close()
+                    raise
+        return buf
+
+    try:
+        return await asyncio.wait_for(download(), timeout)    # the whole download, not each read
+    except asyncio.TimeoutError as e:
+        raise MediaFetchError(f"download exceeded {timeout}s") from e
+
+def open_media(path: str, kind: str = "image", max_bytes: Optional[int] = None) -> MediaBuffer:
+    """Local file as a MediaBuffer (size-checked, mmap-backed; nothing is copied up front)."""
+    limit = _limit(kind, max_bytes)
+    size = os.path.getsize(path)
+    if size > limit:
+        raise MediaFetchError(f"media too large: {size} bytes (limit {limit})")
+    buf = MediaBuffer(kind, source=path, fileobj=open(path, "rb"))
+    buf.size = size
+    return buf
+
+def load_media(path_or_url: str, kind: str = "image", max_bytes: Optional[int] = None,
+               timeout: float = MEDIA_FETCH_TIMEOUT) -> MediaBuffer:
+    if path_or_url.startswith("http://") or path_or_url.startswith("https://"):
+        return fetch_media(path_or_url, kind, max_bytes, timeout)
+    return open_media(path_or_url, kind, max_bytes)
+
+async def aload_media(path_or_url: str, kind: str = "image", max_bytes: Optional[int] = None,
+                      timeout: float = MEDIA_FETCH_TIMEOUT) -> MediaBuffer:
+    if path_or_url.startswith("http://") or path_or_url.startswith("https://"):
+        return await afetch_media(path_or_url, kind, max_bytes, timeout)
+    return await asyncio.to_thread(open_media, path_or_url, kind, max_bytes)
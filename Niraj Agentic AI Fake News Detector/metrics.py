@@ -0,0 +1,277 @@
+# metrics.py
+"""
+In-process metrics exposed in Prometheus text format (GET /metrics).
+- Counter / Histogram with optional labels; bind labels once (metric.labels("google")) and keep
+  the child around on hot paths
+- Every thread writes only to its own shard (a preallocated list), so updates need no lock and
+  allocate nothing after the thread's first call; the scrape sums the shards and folds the
+  shards of exited threads into a per-child base, so thread churn doesn't grow them
+- Counters are created without the suffix and exposed as <name>_total (HELP, TYPE and samples),
+  the same family name collectors use for their counters
+- register_collector(fn) adds values computed at scrape time (cache hit rates, queue sizes)
+- register_provider(prefix, name) names external APIs; cassette.MetricsTransport times each call
+Each process has its own registry; in multi-worker mode (serve.py) scrape every worker port.
+"""
+
+import time
+import threading
+from bisect import bisect_right
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+_get_ident = threading.get_ident
+
+_REGISTRY: List["_Metric"] = []
+_COLLECTORS: List[Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]] = []
+_SCRAPE_LOCK = threading.Lock()         # folding into the bases is done by one scrape at a time
+
+def _fmt_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _num(v: float) -> str:
+    return str(int(v)) if v == int(v) else repr(v)
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _live_idents() -> Set[int]:
+    return {t.ident for t in threading.enumerate()}
+
+def _reap(shards: Dict[int, List[float]], live: Set[int]) -> Iterator[List[float]]:
+    """Pops the shards of threads that are gone. A thread that is in fact still running (a green
+    thread, or one started after `live` was taken) just starts a new shard on its next update;
+    at most an increment racing the pop is lost."""
+    for ident in [i for i in list(shards) if i not in live]:
+        shard = shards.pop(ident, None)
+        if shard is not None:
+            yield shard
+
+class _Metric:
+    kind = "untyped"
+    suffix = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    @property
+    def family(self) -> str:
+        return self.name + self.suffix
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _unlabelled(self):
+        return self.labels()
+
+class _CounterChild:
+    __slots__ = ("_shards", "_base")
+
+    def __init__(self):
+        self._shards: Dict[int, List[float]] = {}
+        self._base = 0.0
+
+    def inc(self, amount: float = 1.0):
+        shard = self._shards.get(_get_ident())
+        if shard is None:
+            shard = self._shards.setdefault(_get_ident(), [0.0])
+        shard[0] += amount
+
+    def value(self, live: Optional[Set[int]] = None) -> float:
+        if live is not None:
+            for shard in _reap(self._shards, live):
+                self._base += shard[0]
+        return self._base + sum(s[0] for s in list(self._shards.values()))
+
+class Counter(_Metric):
+    kind = "counter"
+    suffix = "_total"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._unlabelled().inc(amount)
+
+    def samples(self, live: Optional[Set[int]] = None):
+        for values, child in list(self._children.items()):
+            yield self.family, _fmt_labels(self.labelnames, values), child.value(live)
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_shards", "_base")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        self._shards: Dict[int, List[float]] = {}
+        self._base = [0.0] * (len(bounds) + 2)
+
+    def observe(self, value: float):
+        shard = self._shards.get(_get_ident())
+        if shard is None:
+            # bucket counts..., +Inf count, sum
+            shard = self._shards.setdefault(_get_ident(), [0.0] * (len(self._bounds) + 2))
+        shard[bisect_right(self._bounds, value)] += 1
+        shard[-1] += value
+
+    def time(self):
+        return _Timer(self)
+
+    def snapshot(self, live: Optional[Set[int]] = None) -> List[float]:
+        if live is not None:
+            for shard in _reap(self._shards, live):
+                for i, v in enumerate(shard):
+                    self._base[i] += v
+        total = list(self._base)
+        for shard in list(self._shards.values()):
+            for i, v in enumerate(shard):
+                total[i] += v
+        return total
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: _HistogramChild):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._start)
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._unlabelled().observe(value)
+
+    def time(self):
+        return self._unlabelled().time()
+
+    def samples(self, live: Optional[Set[int]] = None):
+        for values, child in list(self._children.items()):
+            snap = child.snapshot(live)
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, snap):
+                cumulative += count
+                yield self.name + "_bucket", _fmt_labels(self.labelnames, values, f'le="{bound}"'), cumulative
+            cumulative += snap[len(self.buckets)]
+            yield self.name + "_bucket", _fmt_labels(self.labelnames, values, 'le="+Inf"'), cumulative
+            yield self.name + "_sum", _fmt_labels(self.labelnames, values), snap[-1]
+            yield self.name + "_count", _fmt_labels(self.labelnames, values), cumulative
+
+def register_collector(fn: Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]):
+    """fn() yields (name, type, help, labels, value) at scrape time."""
+    _COLLECTORS.append(fn)
+    return fn
+
+def render() -> str:
+    lines = []
+    with _SCRAPE_LOCK:
+        live = _live_idents()
+        for metric in _REGISTRY:
+            lines.append(f"# HELP {metric.family} {metric.help}")
+            lines.append(f"# TYPE {metric.family} {metric.kind}")
+            for name, labels, value in metric.samples(live):
+                lines.append(f"{name}{labels} {_num(value)}")
+    # collectors may interleave families; the text format wants each family's samples together
+    families: Dict[str, List] = {}
+    for collector in _COLLECTORS:
+        try:
+            for name, kind, help, labels, value in collector():
+                family = families.setdefault(name, [f"# HELP {name} {help}", f"# TYPE {name} {kind}"])
+                label_str = "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}" if labels else ""
+                family.append(f"{name}{label_str} {_num(value)}")
+        except Exception as e:
+            lines.append(f"# collector error: {_escape(e)}")
+    for family in families.values():
+        lines.extend(family)
+    return "\n".join(lines) + "\n"
+
+# ===== PIPELINE METRICS =====
+
+HTTP_REQUEST_SECONDS = Histogram("sachbol_http_request_seconds", "Flask request latency", ("endpoint", "method"))
+HTTP_RESPONSES = Counter("sachbol_http_responses", "Flask responses by status", ("endpoint", "status"))
+VERIFY_TIER_SECONDS = Histogram("sachbol_verify_tier_seconds",
+                                "hybrid_verify_claim time by the tier that produced the verdict", ("tier",))
+EXTERNAL_SECONDS = Histogram("sachbol_external_request_seconds", "External API latency", ("provider",))
+EXTERNAL_ERRORS = Counter("sachbol_external_errors", "External API failures", ("provider", "kind"))
+AGENT_CYCLE_SECONDS = Histogram("sachbol_agent_cycle_seconds", "Agent cycle duration", ("agent",),
+                                buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600))
+AGENT_ITEMS = Counter("sachbol_agent_items", "Items through the agent by stage", ("stage",))
+SOCKET_EMITS = Counter("sachbol_socket_emits", "Socket.IO events emitted", ("event",))
+
+ITEMS_INGESTED = AGENT_ITEMS.labels("ingested")
+ITEMS_DUPLICATE = AGENT_ITEMS.labels("duplicate")
+ITEMS_VERIFIED = AGENT_ITEMS.labels("verified")
+
+def emit(sio, event: str, payload):
+    """socketio.emit + emit counter (no-op when sio is None)."""
+    if sio:
+        SOCKET_EMITS.labels(event).inc()
+        sio.emit(event, payload)
+
+# ===== EXTERNAL CALLS =====
+
+_PROVIDERS: List[Tuple[str, str]] = []
+
+def register_provider(url_prefix: str, name: str):
+    """Requests whose URL starts with url_prefix are reported under provider=name."""
+    if url_prefix and (url_prefix, name) not in _PROVIDERS:
+        _PROVIDERS.append((url_prefix, name))
+        _PROVIDERS.sort(key=lambda p: -len(p[0]))
+
+def provider_for(url) -> str:
+    """Provider name for an httpx.URL (httpx itself is only imported by the transport)."""
+    s = str(url)
+    for prefix, name in _PROVIDERS:
+        if s.startswith(prefix):
+            return name
+    return url.host or "unknown"
+
+# ===== CACHE HIT RATES =====
+
+@register_collector
+def _cache_stats():
+    import sys
+    caches: List[Tuple[str, Optional[Dict]]] = []
+    media = sys.modules.get("media_cache")
+    if media is not None and media._cache is not None:
+        s = media._cache.stats()
+        caches.append(("media_ocr", {"hits": sum(s["hits"].values()), "misses": s["misses"], "entries": s["entries"]}))
+    ingest = sys.modules.get("multimodal_ingest")
+    if ingest is not None:
+        s = ingest.deduplicator.stats()
+        caches.append(("ingest_dedup", {"hits": s["dropped"], "misses": s["checked"] - s["dropped"]}))
+    for name, s in caches:
+        lookups = s["hits"] + s["misses"]
+        yield "sachbol_cache_hits_total", "counter", "Cache hits", {"cache": name}, s["hits"]
+        yield "sachbol_cache_misses_total", "counter", "Cache misses", {"cache": name}, s["misses"]
+        yield "sachbol_cache_hit_ratio", "gauge", "Cache hit ratio", {"cache": name}, s["hits"] / lookups if lookups else 0.0
+        if "entries" in s:
+            yield "sachbol_cache_entries", "gauge", "Cache entries", {"cache": name}, s["entries"]
@@ -1,10 +1,17 @@
 # multimodal_agent.py - MODIFIED
 import os
 import asyncio
-from multimodal_ingest import ingest_text_sources
-from multimodal_analyzer import analyze_text_item
+import storage
+from multimodal_ingest import iter_text_sources
+from multimodal_analyzer import analyze_text_item, analyze_image_with_provenance
+from image_index import get_image_index
 from verifier import verify_claim
 from publisher_realtime import publish_realtime_only
+from publisher import publish_with_audiences
+from metrics import AGENT_CYCLE_SECONDS, ITEMS_VERIFIED
+from tracing import start_trace
+from lazy_imports import TEXT_ONLY
+from work_scheduler import get_scheduler, BACKGROUND
 
 async def _handle_item(item):
     text_claims = await analyze_text_item(item)
@@ -24,36 +31,85 @@ async def run_agent():
 
 CHECK_INTERVAL = int(os.getenv("AGENT_CHECK_INTERVAL", "60"))
 INITIALIZE_DB = True
+_CYCLE_SECONDS = AGENT_CYCLE_SECONDS.labels("multimodal")
+
+async def _verify_background(claim):
+    """verify_claim (Google Fact Check + NewsData) in a background slot; None when shed."""
+    # lowest priority: waits while interactive requests hold the external API slots
+    async with get_scheduler().aslot(BACKGROUND) as admitted:
+        if not admitted:
+            print(f"⏳ Saturated: skipping verification of {claim[:60]!r}")
+            return None
+        return await verify_claim(claim)
+
+async def _analyze_image_background(image_url):
+    """Fetch, OCR and analysis of an image in a background slot; None when shed."""
+    async with get_scheduler().aslot(BACKGROUND) as admitted:
+        if not admitted:
+            print(f"⏳ Saturated: skipping image {image_url}")
+            return None
+        return await analyze_image_with_provenance(image_url)
 
 async def _handle_item(item):
-    # analyze text
-    text_claims = await analyze_text_item(item)
-    for c in text_claims:
-        verification = await verify_claim(c)
-        await publish_with_audiences(verification, origin=item.get("url"))
-    # analyze image
-    if item.get("image_url"):
-        img_claims = await analyze_image_url(item["image_url"])
-        for c in img_claims:
-            verification = await verify_claim(c)
-            await publish_with_audiences(verification, origin=item.get("image_url"))
+    # one trace per item: analysis, verification and publishing of all its claims
+    with start_trace("item", url=item.get("url") or "", source=item.get("source") or ""):
+        # analyze text
+        text_claims = await analyze_text_item(item)
+        for c in text_claims:
+            verification = await _verify_background(c)
+            if verification is None:
+                continue
+            ITEMS_VERIFIED.inc()
+            await publish_with_audiences(verification, origin=item.get("url"))
+        # analyze image (its slot is released before the claims queue for their own)
+        image = None
+        if item.get("image_url") and not TEXT_ONLY:
+            image = await _analyze_image_background(item["image_url"])
+        if image is not None:
+            for c in image["claims"]:
+                verification = await _verify_background(c)
+                if verification is None:
+                    continue
+                ITEMS_VERIFIED.inc()
+                if image["match"]:
+                    verification["image_provenance"] = dict(image["match"], recycled=image["recycled"])
+                    if image["recycled"]:
+                        print(f"♻️ Recycled image: first seen {image['match']['first_url']} "
+                              f"({len(image['match']['prior_verdicts'])} prior verdicts)")
+                if image["image_id"] is not None:
+                    await asyncio.to_thread(get_image_index().record_verdict, image["image_id"], verification)
+                await publish_with_audiences(verification, origin=item.get("image_url"))
 
 async def cycle_once(query="breaking OR rumor OR viral OR claim", limit=12):
-    items = await ingest_text_sources(query=query, limit=limit)
-    tasks = []
-    for it in items:
-        tasks.append(asyncio.create_task(_handle_item(it)))
-    if tasks:
-        await asyncio.gather(*tasks, return_exceptions=True)
+    # Start analysing each item as soon as its source returns instead of after the slowest feed
+    with _CYCLE_SECONDS.time():
+        tasks = []
+        timings = {}
+        # the ingest gets its own trace (slot wait + one "ingest:<source>" span per feed);
+        # each item task then starts its own "item" trace
+        with start_trace("ingest_cycle", query=query, limit=limit) as trace:
+            # the feed fetches take one background slot for the whole ingest
+            async with get_scheduler().aslot(BACKGROUND) as admitted:
+                if not admitted:
+                    print("⏳ Saturated: skipping this ingest cycle")
+                    trace.set(skipped="saturated")
+                    return
+                async for it in iter_text_sources(query=query, limit=limit, timings=timings):
+                    tasks.append(asyncio.create_task(_handle_item(it)))
+            trace.set(items=len(tasks), sources=timings)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
 
 async def run_agent():
     if INITIALIZE_DB:
-        storage.init_db()
+        await asyncio.to_thread(storage.init_db)
     while True:
         try:
             await cycle_once()
         except Exception as e:
             print("agent cycle error:", e)
+        # archive + incremental vacuum can hold the database for a while
+        await asyncio.to_thread(storage.maybe_run_maintenance)
         await asyncio.sleep(CHECK_INTERVAL)
 
 if __name__ == "__main__":
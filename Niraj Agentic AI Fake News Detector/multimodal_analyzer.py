@@ -4,11 +4,13 @@
 
 import os
 import re
-from typing import List, Dict
+from typing import List, Dict, Optional
 import asyncio
 
-from brain_of_doctor import encode_image, analyze_image_with_query   # :contentReference[oaicite:5]{index=5}
-from voice_of_patient import transcribe_with_groq                   # :contentReference[oaicite:6]{index=6}
+# OCR, image hashing and transcription are imported inside the image/audio functions below,
+# so a text-only deployment never loads them (see lazy_imports.py)
+from tracing import traced
+from lazy_imports import TEXT_ONLY
 
 # Broad claim keywords for general fake-news detection
 CLAIM_KEYWORDS = [
@@ -84,24 +86,85 @@ def looks_like_assertion(sentence: str) -> bool:
     
     return any(pattern in sentence_lower for pattern in assertion_patterns)
 
+@traced("analyze_text_item")
 async def analyze_text_item(item: Dict) -> List[str]:
     text = ((item.get("title") or "") + ". " + (item.get("text") or "")).strip()
     return extract_claims_from_text(text)
 
 async def analyze_image_url(image_url: str) -> List[str]:
+    if TEXT_ONLY:
+        return []
     try:
-        b64 = encode_image(image_url)  # uses your helper to base64 encode local path or URL. :contentReference[oaicite:7]{index=7}
-        prompt = "List any assertive claims, headlines, or textual assertions visible in this image (one per line)."
-        resp = analyze_image_with_query(prompt, model="meta-llama/llama-4-scout-17b-16e-instruct", encode_image=b64)
-        return extract_claims_from_text(resp)
+        # OCR runs in the process pool; the event loop only awaits the result
+        from ocr_service import get_ocr_service
+        service = get_ocr_service()
+        if image_url.startswith("http://") or image_url.startswith("https://"):
+            text, method = await service.extract_text_from_url(image_url)
+        else:
+            text, method = await service.extract_text_from_path(image_url)
+        return extract_claims_from_text(text)
     except Exception as e:
         print("analyze_image_url error:", e)
         return []
 
+RECYCLED_MIN_AGE = float(os.getenv("RECYCLED_IMAGE_MIN_AGE", str(2 * 86400)))
+
+def _record_sighting(data, ph: int, dh: Optional[int], url: str):
+    """Earlier near-duplicate (or None) and the new sighting's id; SQLite, so run it in a thread."""
+    from image_hashing import content_hash
+    from image_index import get_image_index
+    index = get_image_index()
+    match = index.lookup(ph, dh)
+    return match, index.add(content_hash(data), ph, dh, url=url)
+
+async def analyze_image_with_provenance(image_url: str) -> Dict:
+    """
+    Claims from an image plus its fingerprint history.
+    Returns {"claims", "image_id", "match", "recycled"}; match is the earliest-seen near-duplicate
+    (see image_index.lookup) and recycled is True when that sighting is older than RECYCLED_MIN_AGE.
+    """
+    result = {"claims": [], "image_id": None, "match": None, "recycled": False}
+    if TEXT_ONLY:
+        return result
+    try:
+        import time
+        from ocr_service import get_ocr_service
+        service = get_ocr_service()
+        buf = await service.fetch(image_url)
+        if buf is None:
+            return result
+        with buf:
+            if buf.size == 0:
+                return result
+            data = buf.payload()        # a path once the download spilled to disk
+            ph, dh = await service.hash_image(data)
+            if ph is not None:
+                match, result["image_id"] = await asyncio.to_thread(_record_sighting, data, ph, dh, image_url)
+                if match:
+                    result["match"] = match
+                    result["recycled"] = time.time() - match["first_seen"] >= RECYCLED_MIN_AGE
+            analysis = await service.analyze_image(data, url=image_url, phash=ph)
+        result["claims"] = extract_claims_from_text(analysis["text"])
+    except Exception as e:
+        print("analyze_image_with_provenance error:", e)
+    return result
+
+async def iter_audio_claims(filepath: str):
+    """Yield (segment, claims) per transcribed chunk as soon as it is back (see transcription.py)."""
+    if TEXT_ONLY:
+        return
+    from transcription import iter_transcript
+    async for seg in iter_transcript(filepath):
+        yield seg, extract_claims_from_text(seg["text"])
+
 async def analyze_audio_file(filepath: str) -> List[str]:
+    claims, seen = [], set()
     try:
-        txt = transcribe_with_groq(GROQ_API_KEY=os.getenv("GROQ_API_KEY"), stt_model="whisper-large-v3", audio_filepath=filepath)
-        return extract_claims_from_text(txt)
+        async for seg, seg_claims in iter_audio_claims(filepath):
+            for c in seg_claims:
+                if c not in seen:
+                    seen.add(c)
+                    claims.append(c)
     except Exception as e:
         print("analyze_audio_file error:", e)
-        return []
+    return claims
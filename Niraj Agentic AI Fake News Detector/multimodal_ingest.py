@@ -1,136 +1,134 @@
 # multimodal_ingest.py - ENHANCED VERSION WITH RSS PARSING
 import os
+import time
+import asyncio
 import httpx
-import xml.etree.ElementTree as ET
-from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, AsyncIterator, Optional
+from feed_scheduler import FeedScheduler
+from feed_parser import parse_feed
+from dedup import ArticleDeduplicator
+from cassette import async_client
+from metrics import ITEMS_INGESTED, ITEMS_DUPLICATE
+from tracing import span, traced
+from ingest_sources import (IngestSource, build_sources, DEFAULT_SOURCES, RSS_MAX_ITEMS,
+                            NEWSDATA_KEY, GNEWS_KEY, MEDIASTACK_KEY)
 
-NEWSDATA_KEY = os.getenv("NEWSDATA_API_KEY", "")
-GNEWS_KEY = os.getenv("GNEWS_API_KEY", "")
-MEDIASTACK_KEY = os.getenv("MEDIASTACK_API_KEY", "")
-
-RSS_FEEDS = [
+DEFAULT_RSS_FEEDS = [
     {"name": "BBC", "url": "https://feeds.bbci.co.uk/news/rss.xml"},
     {"name": "CNN", "url": "http://rss.cnn.com/rss/edition.rss"},
     {"name": "NPR", "url": "https://feeds.npr.org/1001/rss.xml"},
     {"name": "ABC News", "url": "https://abcnews.go.com/abcnews/topstories"}
 ]
 
-async def _get_json(url: str, params: dict = None, timeout: int = 20):
-    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-        r = await client.get(url, params=params)
-        r.raise_for_status()
-        return r.json()
+def _feeds_from_env(spec: str) -> List[Dict]:
+    """RSS_FEEDS="BBC=https://...,CNN=https://..." (name=url pairs) -> feed dicts."""
+    feeds = []
+    for entry in spec.split(","):
+        name, sep, url = entry.partition("=")
+        if sep and name.strip() and url.strip():
+            feeds.append({"name": name.strip(), "url": url.strip()})
+        elif entry.strip():
+            print(f"⚠️ Ignoring RSS_FEEDS entry {entry.strip()!r} (expected name=url)")
+    return feeds
+
+# e.g. RSS_FEEDS="BBC=http://127.0.0.1:8099/rss/bbc" to poll stub_apis.py instead of the real feeds
+RSS_FEEDS = _feeds_from_env(os.getenv("RSS_FEEDS", "")) or DEFAULT_RSS_FEEDS
+
+SOURCE_TIMEOUT = float(os.getenv("INGEST_SOURCE_TIMEOUT", "20"))
+
+# Per-source timings of the most recently finished fan-out: {name: {"seconds", "items", "status"}}
+# (replaced as a whole, so overlapping runs never mix; pass `timings=` for one run's own)
+last_source_timings: Dict[str, Dict] = {}
 
-async def _get_text(url: str, timeout: int = 20):
-    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-        r = await client.get(url)
-        r.raise_for_status()
-        return r.text
+# Conditional-GET validators, TTLs and adaptive poll intervals for RSS_FEEDS
+feed_scheduler = FeedScheduler()
 
-def parse_rss_content(xml_content: str, source_name: str) -> List[Dict]:
-    """Parse RSS XML and extract actual article content"""
-    items = []
+# Drops wire copies of the same story arriving from several providers/feeds (fixed memory)
+deduplicator = ArticleDeduplicator()
+
+# Enabled source plugins, e.g. INGEST_SOURCES="replay" for offline load tests
+SOURCES: List[IngestSource] = build_sources(os.getenv("INGEST_SOURCES", DEFAULT_SOURCES),
+                                            feeds=RSS_FEEDS, scheduler=feed_scheduler)
+
+def parse_rss_content(xml_content: str, source_name: str, max_items: int = RSS_MAX_ITEMS,
+                      seen_ids=None) -> List[Dict]:
+    """Parse RSS/Atom XML and extract actual article content"""
     try:
-        root = ET.fromstring(xml_content)
-        
-        # Look for items in different RSS formats
-        for item in root.findall('.//item') or root.findall('.//entry'):
-            title_elem = item.find('title')
-            description_elem = item.find('description') or item.find('summary') or item.find('content:encoded', {'content': 'http://purl.org/rss/1.0/modules/content/'})
-            link_elem = item.find('link')
-            pub_date_elem = item.find('pubDate') or item.find('published')
-            
-            title = title_elem.text if title_elem is not None else "No title"
-            description = description_elem.text if description_elem is not None else ""
-            link = link_elem.text if link_elem is not None else ""
-            
-            # Clean up description (remove HTML tags, etc.)
-            import re
-            description = re.sub('<[^<]+?>', '', description)
-            
-            if title and title != "No title":
-                items.append({
-                    "type": "text",
-                    "source": source_name,
-                    "title": title.strip(),
-                    "text": description.strip()[:2000],  # Use actual content, not raw XML
-                    "image_url": None,
-                    "url": link,
-                    "published": datetime.utcnow().isoformat()
-                })
-                
+        return parse_feed(xml_content, source_name, max_items=max_items, seen_ids=seen_ids)
     except Exception as e:
         print(f"RSS parsing error for {source_name}: {e}")
-    
-    return items[:5]  # Return max 5 articles per feed
+        return []
 
-async def ingest_text_sources(query: str = "breaking OR rumor OR viral OR claim", limit: int = 10) -> List[Dict]:
-    items = []
-    
-    # NewsData.io
-    if NEWSDATA_KEY:
-        try:
-            js = await _get_json("https://newsdata.io/api/1/news", {"apikey": NEWSDATA_KEY, "q": query, "language": "en", "page": 1})
-            for a in js.get("results", [])[:limit]:
-                items.append({
-                    "type": "text",
-                    "source": a.get("source_id") or "newsdata",
-                    "title": a.get("title"),
-                    "text": (a.get("content") or a.get("description") or "")[:4000],
-                    "image_url": a.get("image_url"),
-                    "url": a.get("link"),
-                    "published": a.get("pubDate") or datetime.utcnow().isoformat()
-                })
-        except Exception as e:
-            print("NewsData ingest error:", e)
+async def _pump_source(source: IngestSource, client: httpx.AsyncClient, query: str, limit: int,
+                       timeout: Optional[float], queue: asyncio.Queue):
+    """Push a source's items onto the shared queue, then a (name, None, status, elapsed) marker."""
+    start = time.perf_counter()
+    status = "ok"
 
-    # GNews
-    if GNEWS_KEY:
-        try:
-            js = await _get_json("https://gnews.io/api/v4/search", {"q": query, "token": GNEWS_KEY, "max": limit})
-            for a in js.get("articles", [])[:limit]:
-                items.append({
-                    "type": "text",
-                    "source": a.get("source", {}).get("name", "gnews"),
-                    "title": a.get("title"),
-                    "text": (a.get("content") or a.get("description") or "")[:4000],
-                    "image_url": a.get("image"),
-                    "url": a.get("url"),
-                    "published": a.get("publishedAt") or datetime.utcnow().isoformat()
-                })
-        except Exception as e:
-            print("GNews ingest error:", e)
+    async def pump():
+        async for item in source.stream(client, query, limit):
+            await queue.put((source.name, item, None, None))
 
-    # Mediastack
-    if MEDIASTACK_KEY:
-        try:
-            js = await _get_json("http://api.mediastack.com/v1/news", {"access_key": MEDIASTACK_KEY, "keywords": query, "limit": limit})
-            for a in js.get("data", [])[:limit]:
-                items.append({
-                    "type": "text",
-                    "source": a.get("source", "mediastack"),
-                    "title": a.get("title"),
-                    "text": (a.get("description") or "")[:4000],
-                    "image_url": a.get("image"),
-                    "url": a.get("url"),
-                    "published": a.get("published_at") or datetime.utcnow().isoformat()
-                })
-        except Exception as e:
-            print("Mediastack ingest error:", e)
+    try:
+        with span("ingest:" + source.name):
+            await asyncio.wait_for(pump(), timeout)
+    except asyncio.TimeoutError:
+        status = "timeout"
+    except Exception as e:
+        status = f"error: {e}"
+    await queue.put((source.name, None, status, time.perf_counter() - start))
 
-    # RSS fallback - WITH PROPER PARSING
-    for feed in RSS_FEEDS:
+async def iter_text_sources(query: str = "breaking OR rumor OR viral OR claim", limit: int = 10,
+                            timeout: float = SOURCE_TIMEOUT, dedup: bool = True,
+                            sources: Optional[List[IngestSource]] = None,
+                            timings: Optional[Dict[str, Dict]] = None) -> AsyncIterator[Dict]:
+    """
+    Run every due source concurrently and yield items as soon as each source produces them.
+    Each source gets its own deadline (`timeout`, or the source's own), so a slow feed only
+    loses its own items. Items already seen (same URL, GUID or headline fingerprint) are
+    dropped when `dedup` is on. This run's per-source timings are filled into `timings` (when
+    given) and, once every source is done, become `last_source_timings`.
+    """
+    global last_source_timings
+    timings = {} if timings is None else timings
+    active = [s for s in (SOURCES if sources is None else sources) if s.is_due()]
+    if not active:
+        last_source_timings = timings
+        return
+    counts = {s.name: [0, 0] for s in active}   # name -> [yielded, duplicates]
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+    async with async_client(timeout=timeout, follow_redirects=True) as client:
+        tasks = [asyncio.create_task(_pump_source(s, client, query, limit,
+                                                  s.timeout if s.timeout is not None else timeout, queue))
+                 for s in active]
+        pending = len(tasks)
         try:
-            xml_content = await _get_text(feed["url"])
-            if xml_content:
-                parsed_items = parse_rss_content(xml_content, feed["name"])
-                items.extend(parsed_items)
-                print(f"✓ Successfully parsed {len(parsed_items)} articles from {feed['name']}")
-            else:
-                print(f"✗ Empty response from {feed['name']}")
-        except Exception as e:
-            print(f"RSS fetch error for {feed['name']}: {e}")
+            while pending:
+                name, item, status, elapsed = await queue.get()
+                if item is not None:
+                    if dedup and deduplicator.is_duplicate(item):
+                        counts[name][1] += 1
+                        ITEMS_DUPLICATE.inc()
+                        continue
+                    counts[name][0] += 1
+                    ITEMS_INGESTED.inc()
+                    yield item
+                    continue
+                pending -= 1
+                n, dupes = counts[name]
+                timings[name] = {"seconds": round(elapsed, 3), "items": n,
+                                             "duplicates": dupes, "status": status}
+                if status == "ok":
+                    print(f"✓ {name}: {n} articles ({dupes} duplicates) in {elapsed:.2f}s")
+                else:
+                    print(f"✗ {name} ({status}) after {elapsed:.2f}s")
+            last_source_timings = timings
+        finally:
+            for t in tasks:
+                t.cancel()
 
+@traced("ingest_text_sources", root=True)
+async def ingest_text_sources(query: str = "breaking OR rumor OR viral OR claim", limit: int = 10) -> List[Dict]:
+    items = [item async for item in iter_text_sources(query=query, limit=limit)]
     print(f"🎯 Total articles ingested: {len(items)}")
-    return items
\ No newline at end of file
+    return items
@@ -0,0 +1,204 @@
+# ocr_service.py
+"""
+Async OCR backed by a process pool, so Tesseract never runs on the event loop.
+- get_ocr_service().extract_text(image_bytes) -> (text, method)   # awaitable
+- get_ocr_service().extract_text_from_url(url) -> (text, method)
+- get_ocr_service().analyze_image(image_bytes) -> {text, method, label, details, cached}
+  These also take a file path (MediaBuffer.payload()), so large downloads reach the worker
+  processes by path instead of being read into memory and pickled
+- get_ocr_service().fetch(url) -> MediaBuffer or None (close it, or use it as a context manager)
+  Results are cached by content hash (exact copies) and pHash (resized/recompressed copies),
+  see media_cache.py; URL and path helpers go through the cache, extract_text() does not.
+  Cache reads and writes are SQLite commits, so they run in a thread, never on the event loop
+- Bounded concurrency: OCR_MAX_CONCURRENCY jobs in flight per process, across every event loop
+  (the agent's and the ones Flask requests start with asyncio.run); the rest wait
+- Per-job timeout: passed to Tesseract itself (kills the tesseract subprocess) plus an outer
+  asyncio deadline that frees the caller and its slot. Preprocessing in the worker is not
+  interruptible, so a pathological image can still occupy that worker until preprocessing ends
+Images are preprocessed inside the worker (grayscale, border crop, rescale; see image_ocr.preprocess_image).
+"""
+
+import os
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple, Union
+
+from media_fetch import MediaBuffer, aload_media
+from image_ocr import ocr_image_bytes, classify_text_info, _PYTESS_OK
+from image_hashing import content_hash, image_hashes
+from media_cache import get_media_cache
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+OCR_MAX_CONCURRENCY = int(os.getenv("OCR_MAX_CONCURRENCY", str(OCR_WORKERS * 2)))
+OCR_TIMEOUT = float(os.getenv("OCR_TIMEOUT", "30"))
+OCR_DOWNLOAD_TIMEOUT = float(os.getenv("OCR_DOWNLOAD_TIMEOUT", "20"))
+
+class _SharedSemaphore:
+    """Counting semaphore that coroutines on any loop can await. asyncio.Semaphore is bound to
+    one loop, and each Flask request runs its own."""
+    def __init__(self, value: int):
+        self._value = value
+        self._lock = threading.Lock()
+        self._waiters = deque()         # [loop, future, granted]
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return
+            waiter = [loop, loop.create_future(), False]
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if not waiter[2]:
+                    self._waiters.remove(waiter)
+                    raise
+            self.release()              # granted as we were cancelled: pass the slot on
+            raise
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                loop, future, _ = waiter
+                try:
+                    loop.call_soon_threadsafe(lambda f=future: f.done() or f.set_result(None))
+                except RuntimeError:    # that loop is gone
+                    continue
+                waiter[2] = True
+                return
+            self._value += 1
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+class OCRService:
+    def __init__(self, workers: int = OCR_WORKERS, max_concurrency: int = OCR_MAX_CONCURRENCY,
+                 timeout: float = OCR_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self._max_concurrency = max_concurrency
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._sem = _SharedSemaphore(max_concurrency)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _semaphore(self) -> _SharedSemaphore:
+        return self._sem
+
+    async def extract_text(self, data: Union[bytes, str], timeout: Optional[float] = None) -> Tuple[str, str]:
+        """OCR image bytes in a worker process. Returns (text, method); method is 'none' on failure."""
+        if not _PYTESS_OK or not data:
+            return "", "none"
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        async with self._semaphore():
+            fut = loop.run_in_executor(self._executor(), ocr_image_bytes, data, timeout)
+            try:
+                # small grace period over Tesseract's own timeout for preprocessing/IPC
+                text = await asyncio.wait_for(fut, timeout + 5 if timeout else None)
+                return text, "pytesseract"
+            except asyncio.TimeoutError:
+                print(f"⚠️ OCR job timed out after {timeout}s")
+            except Exception as e:
+                print(f"⚠️ OCR error: {e}")
+        return "", "none"
+
+    async def hash_image(self, data: Union[bytes, str]) -> Tuple[Optional[int], Optional[int]]:
+        loop = asyncio.get_running_loop()
+        async with self._semaphore():
+            try:
+                _, ph, dh = await loop.run_in_executor(self._executor(), image_hashes, data)
+                return ph, dh
+            except Exception as e:
+                print(f"⚠️ Image hash error: {e}")
+        return None, None
+
+    async def analyze_image(self, data: Union[bytes, str], url: Optional[str] = None,
+                            timeout: Optional[float] = None, phash: Optional[int] = None) -> Dict:
+        """OCR + classify image bytes, consulting the media cache first (sha256, then pHash)."""
+        cache = get_media_cache()
+        sha, hit = await asyncio.to_thread(_lookup_sha, cache, data, url)
+        ph = phash
+        if hit is None:
+            if ph is None:
+                ph, _ = await self.hash_image(data)
+            if ph is not None:
+                hit = await asyncio.to_thread(_lookup_phash, cache, sha, ph, url)
+        if hit is not None:
+            return {"text": hit["text"], "method": "cache", "label": hit["label"],
+                    "details": hit["details"], "cached": True, "sha": sha}
+
+        cache.record_miss()
+        text, method = await self.extract_text(data, timeout)
+        label, details = classify_text_info(text)
+        if method != "none":
+            # failures (no tesseract, timeouts) are not cached so they can be retried
+            await asyncio.to_thread(cache.put, sha, ph, text, label, details, url)
+        return {"text": text, "method": method, "label": label, "details": details, "cached": False, "sha": sha}
+
+    async def extract_text_from_url(self, url: str, timeout: Optional[float] = None) -> Tuple[str, str]:
+        hit = await asyncio.to_thread(get_media_cache().get_by_url, url)
+        if hit is not None:
+            return hit["text"], "cache"
+        buf = await self.fetch(url)
+        if buf is None:
+            return "", "none"
+        with buf:
+            result = await self.analyze_image(buf.payload(), url=url, timeout=timeout)
+        return result["text"], result["method"]
+
+    async def fetch(self, url: str) -> Optional[MediaBuffer]:
+        """Download an image (http/https) or open a local path; None on failure. Streamed with the
+        media_fetch byte cap and content-type check; the caller closes the buffer."""
+        try:
+            return await aload_media(url, "image", timeout=OCR_DOWNLOAD_TIMEOUT)
+        except Exception as e:
+            print(f"⚠️ Image download error: {e}")
+            return None
+
+    async def extract_text_from_path(self, path: str, timeout: Optional[float] = None) -> Tuple[str, str]:
+        buf = await self.fetch(path)
+        if buf is None:
+            return "", "none"
+        with buf:
+            result = await self.analyze_image(buf.payload(), timeout=timeout)
+        return result["text"], result["method"]
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+def _lookup_sha(cache, data: Union[bytes, str], url: Optional[str]) -> Tuple[str, Optional[Dict]]:
+    sha = content_hash(data)
+    hit = cache.get_by_sha(sha)
+    if hit is not None and url:
+        cache.alias_url(url, sha)
+    return sha, hit
+
+def _lookup_phash(cache, sha: str, phash: int, url: Optional[str]) -> Optional[Dict]:
+    hit = cache.get_by_phash(phash)
+    if hit is not None:
+        # remember these exact bytes too (and the URL), so the next copy is a primary-key hit
+        cache.put(sha, phash, hit["text"], hit["label"], hit["details"], url=url)
+    return hit
+
+_service: Optional[OCRService] = None
+
+def get_ocr_service() -> OCRService:
+    global _service
+    if _service is None:
+        _service = OCRService()
+    return _service
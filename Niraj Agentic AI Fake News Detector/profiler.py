@@ -0,0 +1,171 @@
+# profiler.py
+"""
+On-demand sampling profiler for a running process (no restart, no tracing hooks).
+- A background thread snapshots every thread's Python stack (sys._current_frames) at a fixed
+  interval and counts identical stacks; the sampled threads pay nothing
+- Each sample is attributed to a pipeline stage: the innermost frame of a @tracing.traced
+  function (verify_claim, analyze_text_item, publish_realtime_only, ...), else "other"
+- Output: collapsed stacks ("stage;thread;file:func;... count") for flamegraph.pl / speedscope,
+  or a JSON summary with per-stage, per-thread and hottest-function counts
+Exposed as POST /admin/profile (ADMIN_TOKEN); the agent process profiles itself on SIGUSR2.
+Needs real OS threads: under eventlet/gevent monkey-patching (serve.py's default gunicorn worker)
+all requests are greenlets on one thread, so profile() refuses (see unsupported_reason()). Run the
+worker with WEB_WORKER_CLASS=gthread to profile it.
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+import tracing
+
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+MAX_DEPTH = 128
+
+# leaf frames of threads parked in the event loop / a lock / a queue: not CPU time
+_IDLE_LEAVES = {
+    ("selectors.py", "select"), ("threading.py", "wait"), ("queue.py", "get"),
+    ("socket.py", "accept"), ("socketserver.py", "serve_forever"), ("selectors.py", "poll"),
+}
+
+class ProfilerUnavailable(RuntimeError):
+    pass
+
+def unsupported_reason() -> Optional[str]:
+    """Why sampling can't see this process's work, or None when it can."""
+    eventlet = sys.modules.get("eventlet.patcher")
+    if eventlet is not None and eventlet.is_monkey_patched("thread"):
+        green = "eventlet"
+    else:
+        gevent = sys.modules.get("gevent.monkey")
+        green = "gevent" if gevent is not None and gevent.is_module_patched("threading") else None
+    if green is None:
+        return None
+    return (f"{green} worker: requests run as greenlets on one OS thread, which sys._current_frames() "
+            "can't tell apart. Profile a gthread worker (serve.py with WEB_WORKER_CLASS=gthread) or the "
+            "agent process (SIGUSR2)")
+
+_busy = threading.Lock()
+_labels: Dict[object, str] = {}
+
+def _label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        label = _labels[code] = f"{os.path.basename(code.co_filename)}:{code.co_name}".replace(";", ",")
+    return label
+
+class Profile:
+    def __init__(self, seconds: float, interval: float, include_idle: bool):
+        self.seconds = seconds
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.stages: Counter = Counter()
+        self.threads: Counter = Counter()
+        self.self_time: Counter = Counter()
+        self.samples = 0
+        self.idle = 0
+        self.ticks = 0
+        self.elapsed = 0.0
+
+    def sample(self, skip: int, names: Dict[int, str]):
+        self.ticks += 1
+        stage_codes = tracing.STAGE_CODES
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            code = frame.f_code
+            leaf = (os.path.basename(code.co_filename), code.co_name)
+            if leaf in _IDLE_LEAVES and not self.include_idle:
+                self.idle += 1
+                continue
+            stage = None
+            labels: List[str] = []
+            f = frame
+            while f is not None and len(labels) < MAX_DEPTH:
+                labels.append(_label(f.f_code))
+                if stage is None:
+                    stage = stage_codes.get(f.f_code)
+                f = f.f_back
+            stage = stage or "other"
+            thread = names.get(ident) or f"thread-{ident}"
+            labels.reverse()
+            self.stacks[";".join([stage, thread] + labels)] += 1
+            self.stages[stage] += 1
+            self.threads[thread] += 1
+            self.self_time[labels[-1]] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, top: int = 25) -> Dict:
+        def share(counter):
+            return {k: {"samples": v, "pct": round(100.0 * v / self.samples, 1) if self.samples else 0.0}
+                    for k, v in counter.most_common()}
+        return {
+            "seconds": round(self.elapsed, 2),
+            "interval_ms": self.interval * 1000,
+            "ticks": self.ticks,
+            "samples": self.samples,
+            "idle_samples": self.idle,
+            "stages": share(self.stages),
+            "threads": share(self.threads),
+            "top_functions": [{"function": f, "self_samples": n} for f, n in self.self_time.most_common(top)],
+        }
+
+def profile(seconds: float = 10.0, interval_ms: float = PROFILE_INTERVAL_MS,
+            include_idle: bool = False) -> Optional[Profile]:
+    """Sample all other threads for `seconds` (blocks the caller). None if a profile is already running;
+    raises ProfilerUnavailable under eventlet/gevent."""
+    reason = unsupported_reason()
+    if reason is not None:
+        raise ProfilerUnavailable(reason)
+    if not _busy.acquire(blocking=False):
+        return None
+    try:
+        seconds = max(0.1, min(seconds, PROFILE_MAX_SECONDS))
+        interval = max(0.001, interval_ms / 1000.0)
+        result = Profile(seconds, interval, include_idle)
+        me = threading.get_ident()
+        start = time.perf_counter()
+        deadline = start + seconds
+        next_tick = start
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            names = {t.ident: t.name for t in threading.enumerate()}
+            result.sample(me, names)
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()       # fell behind; don't burst to catch up
+        result.elapsed = time.perf_counter() - start
+        return result
+    finally:
+        _busy.release()
+
+def profile_to_file(path: str, seconds: float = 30.0, interval_ms: float = PROFILE_INTERVAL_MS):
+    """Run a profile in a background thread and write collapsed stacks to path."""
+    def run():
+        try:
+            result = profile(seconds, interval_ms)
+        except ProfilerUnavailable as e:
+            print(f"⚠️ Profiling unavailable: {e}")
+            return
+        if result is None:
+            print("⚠️ Profile already running; skipped")
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(result.collapsed())
+        stages = ", ".join(f"{k} {v}" for k, v in result.stages.most_common(5))
+        print(f"🔥 Profile written to {path}: {result.samples} samples ({stages})")
+    threading.Thread(target=run, name="profiler", daemon=True).start()
@@ -1,7 +1,11 @@
 # publisher.py - ENHANCED
+import asyncio
 from datetime import datetime
 from storage import upsert_claim, add_evidence
 from emergence_detector import canonicalize, add_claim_observation, detect_emerging
+from metrics import emit
+from tracing import traced, span
+from http_cache import bump
 
 # SocketIO instance (initialized in app.py)
 socketio = None
@@ -10,12 +14,25 @@ def init_socketio(sio):
     global socketio
     socketio = sio
 
+def _store(verification, claim, canonical, origin):
+    claim_id = upsert_claim(claim, canonical, verification.get("severity", "Uncertain"),
+                            verification.get("score", 0.0), origin)
+    for hit in verification.get("cross_hits", []):
+        add_evidence(claim_id, hit.get("source_id", "news"), hit.get("link"), hit.get("description"))
+
+@traced("publish_with_audiences")
 async def publish_with_audiences(verification, origin=None):
     claim = verification.get("claim", "")
     canonical = canonicalize(claim)
      
     # Add to emergence detection
     add_claim_observation(canonical)
+
+    # Persist (storage enforces length caps and compresses large snippets). sqlite can wait up
+    # to its busy timeout on a locked database, so it runs off the event loop
+    with span("storage"):
+        await asyncio.to_thread(_store, verification, claim, canonical, origin)
+    bump("claims")
     
     payload = {
         "timestamp": datetime.utcnow().isoformat(),
@@ -24,14 +41,14 @@ async def publish_with_audiences(verification, origin=None):
         "severity": verification.get("severity", "Uncertain"),
         "emerging": any(e["canonical"]==canonical for e in detect_emerging())
     }
+    if verification.get("image_provenance"):
+        payload["image_provenance"] = verification["image_provenance"]
 
     # Send via WebSocket instead of queue
-    if socketio:
-        socketio.emit('new_verification', payload)
+    emit(socketio, 'new_verification', payload)
     
     # For human review (high risk)
     if verification.get("score", 0) <= -0.5:
-        if socketio:
-            socketio.emit('human_review', payload)
+        emit(socketio, 'human_review', payload)
     
     return payload
\ No newline at end of file
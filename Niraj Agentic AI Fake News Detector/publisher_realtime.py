@@ -1,6 +1,8 @@
 # publisher_realtime.py - Storage-free version
 from datetime import datetime
 from emergence_detector import canonicalize, add_claim_observation, detect_emerging
+from metrics import emit
+from tracing import traced
 
 socketio = None
 
@@ -8,6 +10,7 @@ def init_socketio(sio):
     global socketio
     socketio = sio
 
+@traced("publish_realtime_only")
 async def publish_realtime_only(verification, origin=None):
     claim = verification.get("claim", "")
     canonical = canonicalize(claim)
@@ -25,19 +28,17 @@ async def publish_realtime_only(verification, origin=None):
     }
 
     # ✅ Real-time WebSocket broadcasting
-    if socketio:
-        socketio.emit('new_verification', payload)
+    emit(socketio, 'new_verification', payload)
     
     # ✅ High-risk alerts
     if verification.get("score", 0) <= -0.5:
-        if socketio:
-            socketio.emit('human_review', payload)
+        emit(socketio, 'human_review', payload)
     
     # ✅ Crisis alerts
     crisis_context = detect_crisis_context(claim) if 'detect_crisis_context' in globals() else None
     if crisis_context:
         if socketio:
-            socketio.emit('crisis_alert', {
+            emit(socketio, 'crisis_alert', {
                 **payload,
                 'crisis_context': crisis_context
             })
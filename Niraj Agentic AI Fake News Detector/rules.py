@@ -0,0 +1,269 @@
+# rules.py
+"""
+Rule tables for the offline verification tiers (known facts + pattern analysis) and their
+compiled matcher.
+- KNOWN_FACTS, BASIC_TRUTHS, CREDIBLE_PATTERNS, FALSE_PATTERNS, CRISIS_TERMS (app.py tiers) and
+  AGENT_* (simple_agent): phrase tables; a phrase matches anywhere in the lowercased claim
+- get_rule_matcher().match(text) -> {table: [(phrase_index, value), ...]} in table order
+All phrases are compiled into one Aho-Corasick automaton (a dense DFA over byte classes), so a
+claim is scanned once however many phrases there are. The automaton is saved as a memory-mapped
+artifact (see artifacts.py) keyed by a digest of the tables; editing a table rebuilds it.
+"""
+
+import json
+import array
+import hashlib
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from artifacts import artifact_path, open_artifact, write_artifact, ARTIFACT_AUTOBUILD
+
+# ===== TABLES =====
+
+# phrase -> truth value; the first phrase in table order that occurs in the claim wins
+KNOWN_FACTS = {
+    # Geography facts
+    "delhi is capital of india": True,
+    "new delhi is capital of india": True,
+    "mumbai is capital of india": False,
+    "tokyo is capital of japan": True,
+    "beijing is capital of china": True,
+    "washington dc is capital of usa": True,
+    "london is capital of uk": True,
+    "paris is capital of france": True,
+    # Political facts
+    "narendra modi is prime minister of india": True,
+    "prime minister of india is narendra modi": True,
+    "president of india is": True,
+    "joe biden is president of usa": True,
+    # Scientific facts
+    "earth is round": True,
+    "earth is flat": False,
+    "water boils at 100 degrees celsius": True,
+    "gravity exists": True,
+    "vaccines are effective": True,
+    "climate change is real": True,
+    # Known misinformation
+    "vaccines cause autism": False,
+    "covid is a hoax": False,
+    "5g causes coronavirus": False,
+    "moon landing was fake": False,
+    "holocaust didn't happen": False,
+    "chemtrails are real": False,
+}
+
+# basic factual statements that should be TRUE; first match wins
+BASIC_TRUTHS = {
+    "mumbai is in india": 0.9,
+    "india is a country": 0.9,
+    "delhi is capital of india": 0.9,
+    "new delhi is capital of india": 0.9,
+    "earth is round": 0.9,
+    "water boils at 100 degrees": 0.8,
+    "gravity exists": 0.9,
+    "vaccines are effective": 0.8,
+    "climate change is real": 0.8,
+}
+
+# Credibility indicators (weights add up)
+CREDIBLE_PATTERNS = {
+    "study shows": 0.7, "research indicates": 0.8, "according to study": 0.7,
+    "scientists found": 0.6, "evidence shows": 0.8, "data indicates": 0.7,
+    "official report": 0.6, "medical journal": 0.7, "clinical trial": 0.8,
+    "peer-reviewed": 0.9, "scientific consensus": 0.8,
+    "university of": 0.5, "research institute": 0.6,
+    "government announces": 0.4, "official statement": 0.4,
+}
+
+# Misinformation indicators (weights add up)
+FALSE_PATTERNS = {
+    "miracle cure": -0.9, "secret they don't want you to know": -0.8,
+    "government cover-up": -0.7, "big pharma": -0.6,
+    "mainstream media lying": -0.7, "100% effective": -0.8,
+    "instant cure": -0.9, "hidden truth": -0.7,
+    "conspiracy": -0.5, "they're hiding": -0.6,
+    "breakthrough doctors hate": -0.8, "lose weight fast": -0.6,
+    "cure they don't want you to know": -0.8,
+}
+
+# Crisis misinformation (extra penalty) - ONLY applied when combined with false patterns
+CRISIS_TERMS = {term: 1.0 for term in ["death", "kills", "dead", "died", "dangerous", "emergency", "outbreak"]}
+
+# simple_agent.enhanced_verify_claim scores with its own, slightly different lists
+AGENT_CREDIBLE_PATTERNS = {
+    "study shows": 0.7, "research indicates": 0.8, "according to study": 0.7,
+    "scientists found": 0.6, "evidence shows": 0.8, "data indicates": 0.7,
+    "official report": 0.6, "medical journal": 0.7, "clinical trial": 0.8,
+    "peer-reviewed": 0.9, "scientific consensus": 0.8,
+}
+AGENT_FALSE_PATTERNS = {
+    "miracle cure": -0.9, "secret they don't want you to know": -0.8,
+    "100% effective": -0.8, "instant results": -0.7,
+    "government cover-up": -0.7, "big pharma": -0.6,
+    "mainstream media lying": -0.7, "conspiracy": -0.5,
+    "breakthrough doctors hate": -0.8, "hidden truth": -0.7,
+}
+AGENT_CRISIS_TERMS = {term: 1.0 for term in ['death', 'kills', 'dead', 'emergency', 'outbreak', 'pandemic']}
+
+TABLES = {
+    "known_facts": KNOWN_FACTS,
+    "basic_truths": BASIC_TRUTHS,
+    "credible": CREDIBLE_PATTERNS,
+    "false": FALSE_PATTERNS,
+    "crisis": CRISIS_TERMS,
+    "agent_credible": AGENT_CREDIBLE_PATTERNS,
+    "agent_false": AGENT_FALSE_PATTERNS,
+    "agent_crisis": AGENT_CRISIS_TERMS,
+}
+_TABLE_NAMES = list(TABLES)
+
+def tables_digest() -> str:
+    return hashlib.sha256(json.dumps([[name, list(t.items())] for name, t in TABLES.items()]).encode("utf-8")).hexdigest()
+
+# ===== COMPILER =====
+
+def compile_tables() -> Dict[str, array.array]:
+    """Aho-Corasick over every phrase, flattened to arrays (see RuleMatcher for the layout)."""
+    phrases: List[Tuple[bytes, int, int, float]] = []       # (utf-8 phrase, table, index in table, value)
+    for t, name in enumerate(_TABLE_NAMES):
+        for i, (phrase, value) in enumerate(TABLES[name].items()):
+            phrases.append((phrase.lower().encode("utf-8"), t, i, float(value)))
+
+    # byte classes: every byte that appears in a phrase gets its own class, everything else is 0
+    classes = array.array("i", [0] * 256)
+    used = sorted({b for p, _, _, _ in phrases for b in p})
+    for c, b in enumerate(used, start=1):
+        classes[b] = c
+    nclasses = len(used) + 1
+
+    goto: List[Dict[int, int]] = [{}]
+    outputs: List[List[int]] = [[]]
+    for pid, (p, _, _, _) in enumerate(phrases):
+        state = 0
+        for b in p:
+            c = classes[b]
+            nxt = goto[state].get(c)
+            if nxt is None:
+                nxt = goto[state][c] = len(goto)
+                goto.append({})
+                outputs.append([])
+            state = nxt
+        outputs[state].append(pid)
+
+    # breadth-first: fail links, merged outputs and the full transition table
+    delta = array.array("i", [0] * (len(goto) * nclasses))
+    fail = [0] * len(goto)
+    queue = deque()
+    for c, s in goto[0].items():
+        delta[c] = s
+        queue.append(s)
+    while queue:
+        state = queue.popleft()
+        outputs[state] = outputs[state] + outputs[fail[state]]
+        row, fail_row = state * nclasses, fail[state] * nclasses
+        for c in range(nclasses):
+            nxt = goto[state].get(c)
+            if nxt is None:
+                delta[row + c] = delta[fail_row + c]
+            else:
+                fail[nxt] = delta[fail_row + c]
+                delta[row + c] = nxt
+                queue.append(nxt)
+
+    # store each target as its row offset (state * nclasses), negated when the state has
+    # outputs, so the scan loop is one lookup per byte and one sign test
+    for i, nxt in enumerate(delta):
+        delta[i] = -nxt * nclasses if outputs[nxt] else nxt * nclasses
+
+    out_start = array.array("i", [0])
+    out = array.array("i")
+    for ids in outputs:
+        out.extend(sorted(ids))
+        out_start.append(len(out))
+    return {
+        "classes": classes,
+        "delta": delta,
+        "out_start": out_start,
+        "out": out,
+        "phrase_table": array.array("i", [t for _, t, _, _ in phrases]),
+        "phrase_index": array.array("i", [i for _, _, i, _ in phrases]),
+        "phrase_value": array.array("d", [v for _, _, _, v in phrases]),
+    }
+
+def build_artifact(path: Optional[str] = None) -> Dict[str, array.array]:
+    arrays = compile_tables()
+    write_artifact(path or artifact_path("rules"), "rules", tables_digest(), arrays,
+                   {"phrases": len(arrays["phrase_table"]), "states": len(arrays["out_start"]) - 1,
+                    "classes": (len(arrays["delta"]) // (len(arrays["out_start"]) - 1)), "tables": _TABLE_NAMES})
+    return arrays
+
+# ===== MATCHER =====
+
+class RuleMatcher:
+    """
+    Scans a claim through the compiled automaton.
+    delta[row + classes[byte]] is the next state's row (state * nclasses), negative when phrases
+    end there; out[out_start[s]:out_start[s + 1]] are the phrase ids ending at state s
+    (fail-link outputs already merged in).
+    """
+    def __init__(self, arrays, source: str):
+        self.source = source                # "artifact" (mmap) or "compiled" (built in this process)
+        self.classes = arrays["classes"]
+        self.delta = arrays["delta"]
+        self.out_start = arrays["out_start"]
+        self.out = arrays["out"]
+        self.phrase_table = arrays["phrase_table"]
+        self.phrase_index = arrays["phrase_index"]
+        self.phrase_value = arrays["phrase_value"]
+        self.nclasses = len(self.delta) // (len(self.out_start) - 1)
+        # bytes.translate maps a whole claim to its byte classes in C
+        self._class_bytes = bytes(list(self.classes)) if self.nclasses <= 256 else None
+
+    def phrase_ids(self, text: str) -> List[int]:
+        """Distinct ids of the phrases occurring in text (already lowercased)."""
+        delta, out_start, out, n = self.delta, self.out_start, self.out, self.nclasses
+        data = text.encode("utf-8")
+        if self._class_bytes is not None:
+            data = data.translate(self._class_bytes)
+        else:
+            data = [self.classes[b] for b in data]
+        found = set()
+        row = 0
+        for c in data:
+            row = delta[row + c]
+            if row < 0:
+                row = -row
+                state = row // n
+                found.update(out[out_start[state]:out_start[state + 1]])
+        return sorted(found)
+
+    def match(self, text: str) -> Dict[str, List[Tuple[int, float]]]:
+        """{table name: [(index in table, value), ...]} for every table, in table order."""
+        result: Dict[str, List[Tuple[int, float]]] = {name: [] for name in _TABLE_NAMES}
+        for pid in self.phrase_ids(text):
+            result[_TABLE_NAMES[self.phrase_table[pid]]].append((self.phrase_index[pid], self.phrase_value[pid]))
+        return result
+
+_matcher: Optional[RuleMatcher] = None
+
+def get_rule_matcher() -> RuleMatcher:
+    global _matcher
+    if _matcher is None:
+        path = artifact_path("rules")
+        art = open_artifact(path, "rules", tables_digest())
+        if art is not None:
+            _matcher = RuleMatcher(art.arrays, "artifact")
+        else:
+            arrays = None
+            if ARTIFACT_AUTOBUILD:
+                try:
+                    arrays = build_artifact(path)
+                except OSError as e:        # read-only filesystem, unwritable ARTIFACT_DIR, ...
+                    print(f"⚠️ Could not save the rules artifact ({e}); compiling in memory")
+            _matcher = RuleMatcher(arrays if arrays is not None else compile_tables(), "compiled")
+    return _matcher
+
+if __name__ == "__main__":
+    m = get_rule_matcher()
+    print(json.dumps({"source": m.source, "phrases": len(m.phrase_table), "states": len(m.out_start) - 1,
+                      "classes": m.nclasses}, indent=2))
@@ -0,0 +1,147 @@
+# serve.py
+"""
+Production launcher: N web workers + one agent process, sharing state through SQLite.
+
+    python serve.py --workers 4 --port 5000 [--host 0.0.0.0] [--agent simple|multimodal|none]
+                    [--server auto|gunicorn|eventlet|dev]
+
+Worker i listens on port + i. Each worker is a one-process gunicorn with the eventlet worker class
+(WebSocket support; Flask-SocketIO needs exactly one gunicorn worker per port), falling back to
+gunicorn's threaded worker without eventlet, or to eventlet's own WSGI server without gunicorn.
+--server dev runs the Werkzeug development server and is for local testing only. Socket.IO keeps per-connection state in the worker that accepted
+the handshake, so put a proxy with sticky sessions in front (nginx ip_hash; snippet printed on
+start). Broadcasts go through SOCKETIO_MESSAGE_QUEUE (default: a local SQLite bus, or set a
+redis:// URL); dashboard state and the work scheduler's slot counts through SHARED_STATE_PATH.
+Crashed children are restarted.
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import subprocess
+import importlib.util
+from typing import Dict, List
+
+from work_scheduler import forget_process
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+RESTART_DELAY = 2.0
+WEB_THREADS = int(os.getenv("WEB_THREADS", "32"))      # gthread workers only
+# eventlet (default when installed) or gthread; /admin/profile only works with gthread
+WEB_WORKER_CLASS = os.getenv("WEB_WORKER_CLASS", "")
+SERVERS = ("auto", "gunicorn", "eventlet", "dev")
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def resolve_server(server: str) -> str:
+    if server == "auto":
+        if _installed("gunicorn"):
+            return "gunicorn"
+        if _installed("eventlet"):
+            return "eventlet"
+        raise SystemExit("❌ No production server installed: pip install gunicorn eventlet "
+                         "(or pass --server dev for local testing)")
+    if server in ("gunicorn", "eventlet") and not _installed(server):
+        raise SystemExit(f"❌ --server {server} needs the {server} package installed")
+    return server
+
+def _worker_class() -> str:
+    if WEB_WORKER_CLASS in ("eventlet", "gthread"):
+        return WEB_WORKER_CLASS
+    return "eventlet" if _installed("eventlet") else "gthread"
+
+def _web_command(host: str, port: int, server: str) -> List[str]:
+    if server == "gunicorn":
+        if _worker_class() == "eventlet":
+            worker = ["-k", "eventlet", "--worker-connections", "1000"]
+        else:
+            worker = ["-k", "gthread", "--threads", str(WEB_THREADS)]
+        return [sys.executable, "-m", "gunicorn", *worker, "-w", "1", "-b", f"{host}:{port}",
+                "--graceful-timeout", "10", "--chdir", _HERE, "app:app"]
+    if server == "eventlet":
+        code = ("import eventlet; eventlet.monkey_patch(); from app import app, socketio; "
+                f"socketio.run(app, host={host!r}, port={port}, debug=False, use_reloader=False)")
+    else:
+        code = ("from app import app, socketio; "
+                f"socketio.run(app, host={host!r}, port={port}, debug=False, use_reloader=False, "
+                "allow_unsafe_werkzeug=True)")
+    return [sys.executable, "-c", code]
+
+def nginx_snippet(host: str, port: int, workers: int) -> str:
+    servers = "\n".join(f"    server {host}:{port + i};" for i in range(workers))
+    return (f"upstream sachbol {{\n    ip_hash;\n{servers}\n}}\n"
+            "location / {\n    proxy_pass http://sachbol;\n    proxy_http_version 1.1;\n"
+            "    proxy_set_header Upgrade $http_upgrade;\n    proxy_set_header Connection \"upgrade\";\n}")
+
+def main(workers: int, host: str, port: int, agent: str, server: str = "auto"):
+    server = resolve_server(server)
+    env = dict(os.environ)
+    env["SHARED_STATE"] = "1"
+    env["AGENT_IN_PROCESS"] = "0"
+    env.setdefault("SOCKETIO_MESSAGE_QUEUE", "sqlite:///socketio_bus.db")
+    if server == "gunicorn" and _worker_class() == "gthread":
+        env["SOCKETIO_ASYNC_MODE"] = "threading"    # Flask-SocketIO would pick eventlet if installed
+
+    # compile the rule matcher and snapshot the image index once; every worker maps the files
+    try:
+        from artifacts import build_all
+        build_all()
+    except Exception as e:
+        print(f"⚠️ Artifact build failed ({e}); workers will build or load their own")
+    try:
+        from assets import build
+        build()
+    except Exception as e:
+        print(f"⚠️ Asset build failed ({e}); pages will link the unhashed /static/ files")
+
+    commands: Dict[str, List[str]] = {f"web-{port + i}": _web_command(host, port + i, server) for i in range(workers)}
+    if agent != "none":
+        commands["agent"] = [sys.executable, os.path.join(_HERE, "agent_worker.py"), "--agent", agent]
+
+    procs: Dict[str, subprocess.Popen] = {}
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    if server == "dev":
+        print("⚠️ Werkzeug development server: not for production traffic")
+    print(f"🚀 {workers} web workers ({server}) on {host}:{port}-{port + workers - 1}, agent={agent}, "
+          f"queue={env['SOCKETIO_MESSAGE_QUEUE']}")
+    print(nginx_snippet(host, port, workers))
+    while not stopping:
+        for name, cmd in commands.items():
+            proc = procs.get(name)
+            if proc is None or proc.poll() is not None:
+                if proc is not None:
+                    print(f"⚠️ {name} exited with {proc.returncode}; restarting")
+                    forget_process(proc.pid)        # its work slots in the shared scheduler are free
+                    time.sleep(RESTART_DELAY)
+                procs[name] = subprocess.Popen(cmd, cwd=_HERE, env=env)
+        time.sleep(1)
+
+    print("🛑 Stopping workers")
+    for proc in procs.values():
+        proc.terminate()
+    for proc in procs.values():
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Multi-process launcher (web workers + agent)")
+    ap.add_argument("--workers", type=int, default=int(os.getenv("WEB_WORKERS", str(os.cpu_count() or 2))))
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=5000)
+    ap.add_argument("--agent", choices=["simple", "multimodal", "none"], default="simple")
+    ap.add_argument("--server", choices=SERVERS, default=os.getenv("WEB_SERVER", "auto"))
+    args = ap.parse_args()
+    main(args.workers, args.host, args.port, args.agent, args.server)
@@ -0,0 +1,168 @@
+# shared_state.py
+"""
+State shared between processes in multi-worker mode (serve.py), kept in one local SQLite file.
+- SharedState: latest dashboard updates + claim observations for emergence detection
+- SQLiteQueueManager: Socket.IO pub/sub client manager over the same kind of file, so any web
+  worker (or the agent process) can broadcast to clients connected to any other worker
+Enabled with SHARED_STATE=1; single-process mode keeps using the module globals.
+
+    SOCKETIO_MESSAGE_QUEUE=sqlite:///socketio_bus.db   # local stand-in, no broker needed
+    SOCKETIO_MESSAGE_QUEUE=redis://localhost:6379/0    # handed to Flask-SocketIO as-is
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+SHARED_STATE_ENABLED = os.getenv("SHARED_STATE", "0") == "1"
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", os.path.join(_HERE, "shared_state.db"))
+SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE", "")
+SOCKETIO_ASYNC_MODE = os.getenv("SOCKETIO_ASYNC_MODE", "")      # serve.py sets it for gthread workers
+SOCKETIO_POLL_INTERVAL = float(os.getenv("SOCKETIO_POLL_INTERVAL", "0.05"))
+SOCKETIO_POLL_MAX_INTERVAL = float(os.getenv("SOCKETIO_POLL_MAX_INTERVAL", "0.5"))   # idle backoff cap
+MAX_UPDATES = 50
+BUS_RETENTION_SECONDS = 60
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+# ===== SHARED STATE =====
+
+class SharedState:
+    def __init__(self, path: str = SHARED_STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = _connect(path)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS updates (id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL, payload TEXT);
+            CREATE TABLE IF NOT EXISTS observations (ts REAL, canonical TEXT);
+            CREATE INDEX IF NOT EXISTS idx_observations_ts ON observations(ts);
+        """)
+
+    def push_update(self, update: Dict):
+        with self._lock:
+            self._conn.execute("INSERT INTO updates (ts, payload) VALUES (?, ?)", (time.time(), json.dumps(update)))
+            self._conn.execute("DELETE FROM updates WHERE id <= (SELECT MAX(id) FROM updates) - ?", (MAX_UPDATES,))
+            self._conn.commit()
+
+    def recent_updates(self, n: int = 10) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT payload FROM updates ORDER BY id DESC LIMIT ?", (n,)).fetchall()
+        return [json.loads(r[0]) for r in reversed(rows)]
+
+    def latest_update_id(self) -> int:
+        """Grows with every push_update; used as the cache version of the updates panel."""
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(id) FROM updates").fetchone()
+        return row[0] or 0
+
+    def add_observation(self, canonical: str, window_seconds: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT INTO observations (ts, canonical) VALUES (?, ?)", (now, canonical))
+            self._conn.execute("DELETE FROM observations WHERE ts < ?", (now - window_seconds,))
+            self._conn.commit()
+
+    def observations(self, window_seconds: float) -> List[Tuple[float, str]]:
+        with self._lock:
+            return self._conn.execute("SELECT ts, canonical FROM observations WHERE ts >= ? ORDER BY ts",
+                                      (time.time() - window_seconds,)).fetchall()
+
+_state: Optional[SharedState] = None
+
+def get_shared_state() -> SharedState:
+    global _state
+    if _state is None:
+        _state = SharedState()
+    return _state
+
+# ===== SOCKET.IO MESSAGE QUEUE =====
+
+try:
+    from socketio import PubSubManager as _PubSubManager
+except ImportError:
+    _PubSubManager = object
+
+class SQLiteQueueManager(_PubSubManager):
+    """
+    Socket.IO client manager using a SQLite table as the pub/sub channel.
+    Publishers append JSON messages; every listener polls for rows past the last id it saw. Polls
+    only run a query when PRAGMA data_version says another connection committed, and back off from
+    SOCKETIO_POLL_INTERVAL to SOCKETIO_POLL_MAX_INTERVAL while the bus is idle.
+    """
+    name = "sqlite"
+
+    def __init__(self, url: str = "sqlite:///socketio_bus.db", channel: str = "socketio",
+                 write_only: bool = False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        path = url[len("sqlite:///"):]          # sqlite:///rel.db or sqlite:////abs/path.db
+        self.path = path if os.path.isabs(path) else os.path.join(_HERE, path)
+        self._pub_lock = threading.Lock()
+        self._pub = _connect(self.path)
+        self._pub.execute("CREATE TABLE IF NOT EXISTS bus (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                          "channel TEXT, ts REAL, body TEXT)")
+        self._pub.commit()
+        self._published = 0
+
+    def _publish(self, data):
+        now = time.time()
+        with self._pub_lock:
+            self._pub.execute("INSERT INTO bus (channel, ts, body) VALUES (?, ?, ?)",
+                              (self.channel, now, json.dumps(data)))
+            self._published += 1
+            if self._published % 100 == 0:
+                self._pub.execute("DELETE FROM bus WHERE ts < ?", (now - BUS_RETENTION_SECONDS,))
+            self._pub.commit()
+
+    def _listen(self):
+        conn = _connect(self.path)
+        last = conn.execute("SELECT COALESCE(MAX(id), 0) FROM bus").fetchone()[0]
+        sleep = self.server.sleep if getattr(self, "server", None) else time.sleep
+        interval, version = SOCKETIO_POLL_INTERVAL, None
+        while True:
+            current = conn.execute("PRAGMA data_version").fetchone()[0]
+            rows = []
+            if current != version:
+                version = current
+                rows = conn.execute("SELECT id, body FROM bus WHERE id > ? AND channel = ? ORDER BY id",
+                                    (last, self.channel)).fetchall()
+            for row_id, body in rows:
+                last = row_id
+                try:
+                    message = json.loads(body)
+                except (TypeError, ValueError):
+                    self._get_logger().warning("Skipping undecodable bus message %s", row_id)
+                    continue
+                yield message
+            if rows:
+                interval = SOCKETIO_POLL_INTERVAL
+            else:
+                sleep(interval)
+                interval = min(interval * 2, SOCKETIO_POLL_MAX_INTERVAL)
+
+def socketio_options(url: str = SOCKETIO_MESSAGE_QUEUE) -> Dict:
+    """Extra SocketIO(...) kwargs: async mode and message queue ({} in single-process mode)."""
+    options = {"async_mode": SOCKETIO_ASYNC_MODE} if SOCKETIO_ASYNC_MODE else {}
+    if not url:
+        return options
+    if url.startswith("sqlite://"):
+        options["client_manager"] = SQLiteQueueManager(url)
+    else:
+        options["message_queue"] = url
+    return options
+
+def external_emitter(url: str = SOCKETIO_MESSAGE_QUEUE):
+    """Write-only emitter for processes without a Socket.IO server (the agent worker)."""
+    if not url:
+        return None
+    if url.startswith("sqlite://"):
+        return SQLiteQueueManager(url, write_only=True)
+    from flask_socketio import SocketIO
+    return SocketIO(message_queue=url)
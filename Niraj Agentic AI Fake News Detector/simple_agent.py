@@ -4,7 +4,17 @@ import asyncio
 import time
 from datetime import datetime
 
+import storage
+from metrics import AGENT_CYCLE_SECONDS, ITEMS_INGESTED, ITEMS_VERIFIED
+from tracing import start_trace, traced
+from rules import get_rule_matcher
+from http_cache import bump
+
 CHECK_INTERVAL = int(os.getenv("AGENT_CHECK_INTERVAL", "30"))
+# Offline load testing: stream a recorded JSONL corpus instead of SAMPLE_NEWS_ITEMS
+REPLAY_FILE = os.getenv("INGEST_REPLAY_FILE", "")
+MAX_CLAIMS_PER_ITEM = int(os.getenv("AGENT_MAX_CLAIMS_PER_ITEM", "2"))
+_CYCLE_SECONDS = AGENT_CYCLE_SECONDS.labels("simple")
 
 # Enhanced sample items with varied content
 SAMPLE_NEWS_ITEMS = [
@@ -31,6 +41,7 @@ SAMPLE_NEWS_ITEMS = [
     }
 ]
 
+@traced("analyze_text")
 async def enhanced_analyze_text(text):
     """Enhanced text analysis with better claim detection"""
     claims = []
@@ -72,6 +83,7 @@ def looks_like_factual_assertion(sentence):
     
     return any(pattern in sentence_lower for pattern in factual_patterns)
 
+@traced("verify_claim", root=True)
 async def enhanced_verify_claim(claim):
     """Enhanced verification with better scoring"""
     claim_lower = claim.lower()
@@ -79,35 +91,16 @@ async def enhanced_verify_claim(claim):
     # More sophisticated scoring
     score = 0.0
     
-    # Positive patterns (credible)
-    positive_patterns = {
-        "study shows": 0.7, "research indicates": 0.8, "according to study": 0.7,
-        "scientists found": 0.6, "evidence shows": 0.8, "data indicates": 0.7,
-        "official report": 0.6, "medical journal": 0.7, "clinical trial": 0.8,
-        "peer-reviewed": 0.9, "scientific consensus": 0.8,
-    }
-    
-    # Negative patterns (misinformation)  
-    negative_patterns = {
-        "miracle cure": -0.9, "secret they don't want you to know": -0.8,
-        "100% effective": -0.8, "instant results": -0.7,
-        "government cover-up": -0.7, "big pharma": -0.6,
-        "mainstream media lying": -0.7, "conspiracy": -0.5,
-        "breakthrough doctors hate": -0.8, "hidden truth": -0.7,
-    }
+    # Positive (credible) and negative (misinformation) patterns live in rules.py and are
+    # matched in one pass over the claim
+    matches = get_rule_matcher().match(claim_lower)
     
     # Calculate scores
-    for pattern, weight in positive_patterns.items():
-        if pattern in claim_lower:
-            score += weight
-    
-    for pattern, weight in negative_patterns.items():
-        if pattern in claim_lower:
-            score += weight
+    for _, weight in matches["agent_credible"] + matches["agent_false"]:
+        score += weight
     
     # Crisis detection
-    crisis_terms = ['death', 'kills', 'dead', 'emergency', 'outbreak', 'pandemic']
-    crisis_count = sum(1 for term in crisis_terms if term in claim_lower)
+    crisis_count = len(matches["agent_crisis"])
     if crisis_count > 0 and score < 0:
         score -= (crisis_count * 0.1)  # Extra penalty for crisis misinfo
     
@@ -138,49 +131,82 @@ async def enhanced_verify_claim(claim):
         "cross_hits": []
     }
 
+async def _iter_items():
+    if REPLAY_FILE:
+        from ingest_sources import JSONLReplaySource
+        from multimodal_ingest import iter_text_sources
+        if not hasattr(_iter_items, "source"):
+            _iter_items.source = JSONLReplaySource(REPLAY_FILE)
+        async for item in iter_text_sources(sources=[_iter_items.source], dedup=False):
+            yield item
+    else:
+        print(f"📰 Processing {len(SAMPLE_NEWS_ITEMS)} sample articles")
+        for item in SAMPLE_NEWS_ITEMS:
+            ITEMS_INGESTED.inc()
+            yield item
+
 async def cycle_once():
     """Enhanced processing cycle"""
     print(f"\n🔄 Cycle started at {time.strftime('%H:%M:%S')}")
-    
-    items = SAMPLE_NEWS_ITEMS
-    print(f"📰 Processing {len(items)} sample articles")
-    
-    for item in items:
-        title = item.get('title', 'No title')
-        text = item.get('text', '')
+    started = time.perf_counter()
+    item_count = claim_count = 0
+    verbose = not REPLAY_FILE
+    
+    async for item in _iter_items():
+        item_count += 1
+        title = item.get('title') or 'No title'
+        text = item.get('text') or ''
         
-        print(f"\n📄 Processing: {title}")
+        if verbose:
+            print(f"\n📄 Processing: {title}")
         
-        combined_text = f"{title}. {text}"
-        claims = await enhanced_analyze_text(combined_text)
+        with start_trace("item", title=title, source=item.get("source") or "sample"):
+            combined_text = f"{title}. {text}"
+            claims = await enhanced_analyze_text(combined_text)
         
-        if claims:
-            print(f"   Found {len(claims)} claims")
-            for claim in claims[:2]:  # Process max 2 claims
-                verification = await enhanced_verify_claim(claim)
-                await simple_publish(verification)
-        else:
-            print("   No claims detected")
-    
-    print(f"✅ Cycle completed at {time.strftime('%H:%M:%S')}")
+            if claims:
+                if verbose:
+                    print(f"   Found {len(claims)} claims")
+                for claim in claims[:MAX_CLAIMS_PER_ITEM]:  # Process max 2 claims
+                    verification = await enhanced_verify_claim(claim)   # rules only, no API quota
+                    ITEMS_VERIFIED.inc()
+                    await simple_publish(verification, quiet=not verbose)
+                    claim_count += 1
+            elif verbose:
+                print("   No claims detected")
+    
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    _CYCLE_SECONDS.observe(elapsed)
+    print(f"✅ Cycle completed at {time.strftime('%H:%M:%S')}: {item_count} items, {claim_count} claims "
+          f"in {elapsed:.2f}s ({item_count / elapsed:.1f} items/s)")
 
-async def simple_publish(verification):
+@traced("publish")
+async def simple_publish(verification, quiet=False):
     """Enhanced publishing with better formatting"""
-    print(f"🔍 CLAIM: {verification['claim'][:80]}...")
-    print(f"   📊 Score: {verification['score']:.2f} | Severity: {verification['severity']}")
+    if not quiet:
+        print(f"🔍 CLAIM: {verification['claim'][:80]}...")
+        print(f"   📊 Score: {verification['score']:.2f} | Severity: {verification['severity']}")
     
-    # Add to latest updates
-    from app import latest_updates
-    latest_updates.append({
+    update = {
         'title': f'Analysis: {verification["severity"]}',
         'content': verification['claim'][:100] + '...',
         'status': 'false' if verification['score'] < -0.3 else 'verified',
         'time': 'Just now'
-    })
+    }
+    # Separate agent process (serve.py): the web workers read updates from the shared store
+    from shared_state import SHARED_STATE_ENABLED, get_shared_state
+    if SHARED_STATE_ENABLED:
+        get_shared_state().push_update(update)
+        return
+
+    # Add to latest updates
+    from app import latest_updates
+    latest_updates.append(update)
     
     # Keep only recent updates
     if len(latest_updates) > 10:
         latest_updates.pop(0)
+    bump("updates")
 
 async def run_simple_agent():
     """Run the enhanced agent"""
@@ -188,10 +214,13 @@ async def run_simple_agent():
     print("   Features: Hybrid verification + Multiple APIs + Pattern analysis")
     print("   Press Ctrl+C to stop\n")
     
+    # this agent doesn't write claims, but the dashboard reads claims.db: keep retention running
+    await asyncio.to_thread(storage.init_db)
     cycle_count = 0
     while True:
         try:
             await cycle_once()
+            await asyncio.to_thread(storage.maybe_run_maintenance)
             cycle_count += 1
             print(f"\n♻️ Completed {cycle_count} cycles. Waiting {CHECK_INTERVAL} seconds...")
             await asyncio.sleep(CHECK_INTERVAL)
@@ -0,0 +1,87 @@
+# startup_report.py
+"""
+Import-time report for cold starts.
+Imports the given modules in a fresh interpreter with `python -X importtime` and lists the
+slowest imports (cumulative and self time), the project modules among them, and any media
+library (groq, elevenlabs, pytesseract, PIL) that got loaded.
+
+    python startup_report.py                          # import app, default profile
+    python startup_report.py --profile text app multimodal_agent
+    python startup_report.py --compare --runs 5       # full vs text-only, best of 5 runs each
+
+Importing app costs the same under both profiles (the media libraries are lazy in both); nearly
+all of it is Flask and Flask-SocketIO, which the web process can't defer. The profiles only
+differ once media code runs (the first image/audio analysis), which this report doesn't cover.
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_PROJECT_MODULES = {f[:-3] for f in os.listdir(_HERE) if f.endswith(".py")}
+
+def measure(modules: List[str], profile: str = "full") -> Dict:
+    """One cold import of modules in a child interpreter."""
+    code = ("import json, time; t = time.perf_counter()\n"
+            + "".join(f"import {m}\n" for m in modules)
+            + "import lazy_imports\n"
+            "print('\\n' + json.dumps({'wall': time.perf_counter() - t, "
+            "'media': lazy_imports.loaded_media_libraries()}))")
+    env = dict(os.environ, DEPLOYMENT_PROFILE=profile, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=_HERE, env=env,
+                          capture_output=True, text=True, encoding="utf-8", errors="replace")
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = []
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        imports.append({"module": name.strip(), "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+                        "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    result["imports"] = imports
+    result["profile"] = profile
+    return result
+
+def best_of(modules: List[str], profile: str, runs: int) -> Dict:
+    return min((measure(modules, profile) for _ in range(max(1, runs))), key=lambda r: r["wall"])
+
+def print_report(result: Dict, top: int = 20):
+    imports = result["imports"]
+    print(f"\n📦 profile={result['profile']}: {result['wall'] * 1000:.0f} ms wall, {len(imports)} modules imported")
+    print(f"{'cumulative':>11} {'self':>8}  module")
+    for imp in sorted(imports, key=lambda i: -i["cumulative_ms"])[:top]:
+        print(f"{imp['cumulative_ms']:>9.1f}ms {imp['self_ms']:>6.1f}ms  {'  ' * imp['depth']}{imp['module']}")
+    project = [i for i in imports if i["module"] in _PROJECT_MODULES]
+    print(f"\n🏠 project modules ({len(project)}):")
+    for imp in sorted(project, key=lambda i: -i["cumulative_ms"]):
+        print(f"{imp['cumulative_ms']:>9.1f}ms {imp['self_ms']:>6.1f}ms  {imp['module']}")
+    media = result["media"]
+    print(f"\n🎞️ media libraries loaded: {', '.join(media) if media else 'none'}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Per-module import time for a cold start")
+    ap.add_argument("modules", nargs="*", default=["app"])
+    ap.add_argument("--profile", default=os.getenv("DEPLOYMENT_PROFILE", "full"), help="full or text")
+    ap.add_argument("--compare", action="store_true", help="report both the full and text-only profiles")
+    ap.add_argument("--runs", type=int, default=3, help="best of N cold starts")
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    profiles = ["full", "text"] if args.compare else [args.profile]
+    results = [best_of(args.modules, p, args.runs) for p in profiles]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            print_report(r, args.top)
+        if len(results) == 2:
+            delta = (results[1]["wall"] - results[0]["wall"]) * 1000
+            print(f"\n⚖️ text vs full: {delta:+.0f} ms wall")
@@ -101,16 +101,14 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeCharts();
     
     // Load initial data
-    loadClaimsData();
-    loadInsights();
+    loadAnalysisData();
     
     // Set up event listeners
     document.getElementById('applyFilters').addEventListener('click', applyFilters);
     document.getElementById('exportData').addEventListener('click', exportData);
     
     // Set up periodic updates
-    setInterval(loadClaimsData, 15000);
-    setInterval(loadInsights, 20000);
+    setInterval(loadAnalysisData, 15000);
 });
 
 function getCurrentFilters() {
@@ -121,142 +119,137 @@ function getCurrentFilters() {
     };
 }
 
-function loadClaimsData() {
+function renderClaims(data, filters) {
+    const claimsTable = document.getElementById('claimsTable');
+    claimsTable.innerHTML = '';
+    
+    if (data.claims && data.claims.length > 0) {
+        data.claims.forEach(claim => {
+            const row = document.createElement('tr');
+            
+            const statusClass = claim.status === 'false' ? 'status-false' : 
+                              claim.status === 'verified' ? 'status-verified' : 'status-pending';
+            const statusText = claim.status === 'false' ? 'False' : 
+                             claim.status === 'verified' ? 'Verified' : 'Pending';
+            
+            row.innerHTML = `
+                <td>${claim.text}</td>
+                <td>${claim.category}</td>
+                <td><span class="status-badge ${statusClass}">${statusText}</span></td>
+                <td>${claim.date}</td>
+                <td>${claim.confidence}%</td>
+            `;
+            
+            claimsTable.appendChild(row);
+        });
+        
+        // Update table message
+        const filterMessage = generateFilterMessage(filters);
+        if (filterMessage) {
+            const messageRow = document.createElement('tr');
+            messageRow.innerHTML = `
+                <td colspan="5" style="text-align: center; padding: 0.5rem; font-size: 0.9rem; color: var(--gray);">
+                    ${filterMessage}
+                </td>
+            `;
+            claimsTable.appendChild(messageRow);
+        }
+    } else {
+        claimsTable.innerHTML = `
+            <tr>
+                <td colspan="5" style="text-align: center; padding: 2rem;">
+                    No claims found matching the current filters.
+                </td>
+            </tr>
+        `;
+    }
+}
+
+function renderClaimsError() {
+    const claimsTable = document.getElementById('claimsTable');
+    claimsTable.innerHTML = `
+        <tr>
+            <td colspan="5" style="text-align: center; padding: 2rem; color: var(--danger);">
+                Error loading claims data. Please try again later.
+            </td>
+        </tr>
+    `;
+}
+
+function loadAnalysisData() {
     const filters = getCurrentFilters();
     
-    // Build query string with filters
+    // Claims and insights for the current filters in one request (see /api/dashboard/bundle)
     const queryParams = new URLSearchParams({
+        panels: 'claims,insights',
         category: filters.category,
         status: filters.status,
         time_period: filters.timePeriod
     });
     
-    fetch(`/api/claims?${queryParams}`)
+    fetch(`/api/dashboard/bundle?${queryParams}`)
         .then(response => {
             if (!response.ok) {
                 throw new Error('Network response was not ok');
             }
             return response.json();
         })
-        .then(data => {
-            const claimsTable = document.getElementById('claimsTable');
-            claimsTable.innerHTML = '';
-            
-            if (data.claims && data.claims.length > 0) {
-                data.claims.forEach(claim => {
-                    const row = document.createElement('tr');
-                    
-                    const statusClass = claim.status === 'false' ? 'status-false' : 
-                                      claim.status === 'verified' ? 'status-verified' : 'status-pending';
-                    const statusText = claim.status === 'false' ? 'False' : 
-                                     claim.status === 'verified' ? 'Verified' : 'Pending';
-                    
-                    row.innerHTML = `
-                        <td>${claim.text}</td>
-                        <td>${claim.category}</td>
-                        <td><span class="status-badge ${statusClass}">${statusText}</span></td>
-                        <td>${claim.date}</td>
-                        <td>${claim.confidence}%</td>
-                    `;
-                    
-                    claimsTable.appendChild(row);
-                });
-                
-                // Update table message
-                const filterMessage = generateFilterMessage(filters);
-                if (filterMessage) {
-                    const messageRow = document.createElement('tr');
-                    messageRow.innerHTML = `
-                        <td colspan="5" style="text-align: center; padding: 0.5rem; font-size: 0.9rem; color: var(--gray);">
-                            ${filterMessage}
-                        </td>
-                    `;
-                    claimsTable.appendChild(messageRow);
-                }
-            } else {
-                claimsTable.innerHTML = `
-                    <tr>
-                        <td colspan="5" style="text-align: center; padding: 2rem;">
-                            No claims found matching the current filters.
-                        </td>
-                    </tr>
-                `;
-            }
+        .then(bundle => {
+            renderClaims(bundle.panels.claims, filters);
+            renderInsights(bundle.panels.insights);
         })
         .catch(error => {
-            console.error('Error fetching claims data:', error);
-            const claimsTable = document.getElementById('claimsTable');
-            claimsTable.innerHTML = `
-                <tr>
-                    <td colspan="5" style="text-align: center; padding: 2rem; color: var(--danger);">
-                        Error loading claims data. Please try again later.
-                    </td>
-                </tr>
-            `;
+            console.error('Error fetching analysis data:', error);
+            renderClaimsError();
+            renderInsightsError();
         });
 }
 
-function loadInsights() {
-    const filters = getCurrentFilters();
-    
-    // Build query string with time period filter
-    const queryParams = new URLSearchParams({
-        time_period: filters.timePeriod
-    });
+function renderInsights(data) {
+    const insightsList = document.getElementById('insightsList');
+    insightsList.innerHTML = '';
     
-    fetch(`/api/insights?${queryParams}`)
-        .then(response => {
-            if (!response.ok) {
-                throw new Error('Network response was not ok');
-            }
-            return response.json();
-        })
-        .then(data => {
-            const insightsList = document.getElementById('insightsList');
-            insightsList.innerHTML = '';
+    if (data.insights && data.insights.length > 0) {
+        data.insights.forEach(insight => {
+            const listItem = document.createElement('li');
+            listItem.className = 'insight-item';
             
-            if (data.insights && data.insights.length > 0) {
-                data.insights.forEach(insight => {
-                    const listItem = document.createElement('li');
-                    listItem.className = 'insight-item';
-                    
-                    listItem.innerHTML = `
-                        <div class="insight-header">
-                            <div class="insight-title">${insight.title}</div>
-                            <div class="insight-time">${insight.time}</div>
-                        </div>
-                        <div class="insight-content">${insight.content}</div>
-                        <div class="insight-metrics">
-                            <span><i class="fas fa-chart-line"></i> ${insight.trend}% trend</span>
-                            <span><i class="fas fa-exclamation-triangle"></i> ${insight.impact} impact</span>
-                        </div>
-                    `;
-                    
-                    insightsList.appendChild(listItem);
-                });
-            } else {
-                insightsList.innerHTML = `
-                    <li class="insight-item">
-                        <div class="insight-header">
-                            <div class="insight-title">No Insights Available</div>
-                        </div>
-                        <div class="insight-content">No insights match the current filter criteria.</div>
-                    </li>
-                `;
-            }
-        })
-        .catch(error => {
-            console.error('Error fetching insights:', error);
-            const insightsList = document.getElementById('insightsList');
-            insightsList.innerHTML = `
-                <li class="insight-item">
-                    <div class="insight-header">
-                        <div class="insight-title">Temporarily Unavailable</div>
-                    </div>
-                    <div class="insight-content">Insights data is currently unavailable.</div>
-                </li>
+            listItem.innerHTML = `
+                <div class="insight-header">
+                    <div class="insight-title">${insight.title}</div>
+                    <div class="insight-time">${insight.time}</div>
+                </div>
+                <div class="insight-content">${insight.content}</div>
+                <div class="insight-metrics">
+                    <span><i class="fas fa-chart-line"></i> ${insight.trend}% trend</span>
+                    <span><i class="fas fa-exclamation-triangle"></i> ${insight.impact} impact</span>
+                </div>
             `;
+            
+            insightsList.appendChild(listItem);
         });
+    } else {
+        insightsList.innerHTML = `
+            <li class="insight-item">
+                <div class="insight-header">
+                    <div class="insight-title">No Insights Available</div>
+                </div>
+                <div class="insight-content">No insights match the current filter criteria.</div>
+            </li>
+        `;
+    }
+}
+
+function renderInsightsError() {
+    const insightsList = document.getElementById('insightsList');
+    insightsList.innerHTML = `
+        <li class="insight-item">
+            <div class="insight-header">
+                <div class="insight-title">Temporarily Unavailable</div>
+            </div>
+            <div class="insight-content">Insights data is currently unavailable.</div>
+        </li>
+    `;
 }
 
 function applyFilters() {
@@ -265,8 +258,7 @@ function applyFilters() {
     console.log('Applying filters:', filters);
     
     // Reload data with filters
-    loadClaimsData();
-    loadInsights();
+    loadAnalysisData();
     
     // Show notification with actual filter values
     const filterMessage = generateFilterMessage(filters);
@@ -135,84 +135,81 @@ document.addEventListener('DOMContentLoaded', function() {
     }
     
     // Load initial data
-    loadUpdates();
-    loadTrends();
+    loadDashboard();
     
     // Set up periodic updates
-    setInterval(loadUpdates, 15000);
-    setInterval(loadTrends, 20000);
+    setInterval(loadDashboard, 15000);
 });
 
-function loadUpdates() {
-    fetch('/api/updates')
+function loadDashboard() {
+    // updates + trends in one request (see /api/dashboard/bundle)
+    fetch('/api/dashboard/bundle?panels=updates,trends')
         .then(response => response.json())
-        .then(data => {
-            const updatesList = document.getElementById('updatesList');
-            
-            if (data.updates && data.updates.length > 0) {
-                updatesList.innerHTML = '';
-                
-                data.updates.forEach(update => {
-                    const listItem = document.createElement('li');
-                    listItem.className = 'update-item';
-                    
-                    const statusClass = update.status === 'false' ? 'status-false' : 'status-verified';
-                    
-                    listItem.innerHTML = `
-                        <div class="update-header">
-                            <div class="update-title">${update.title}</div>
-                            <div class="update-time">${update.time}</div>
-                        </div>
-                        <div class="update-content">${update.content}</div>
-                        <span class="update-status ${statusClass}">${update.status}</span>
-                    `;
-                    
-                    updatesList.appendChild(listItem);
-                });
-            }
+        .then(bundle => {
+            renderUpdates(bundle.panels.updates);
+            renderTrends(bundle.panels.trends);
         })
         .catch(error => {
-            console.error('Error fetching updates:', error);
+            console.error('Error fetching dashboard data:', error);
         });
 }
 
-function loadTrends() {
-    fetch('/api/trends')
-        .then(response => response.json())
-        .then(data => {
-            const trendsList = document.getElementById('trendsList');
+function renderUpdates(data) {
+    const updatesList = document.getElementById('updatesList');
+    
+    if (data.updates && data.updates.length > 0) {
+        updatesList.innerHTML = '';
+        
+        data.updates.forEach(update => {
+            const listItem = document.createElement('li');
+            listItem.className = 'update-item';
             
-            if (data.trends && data.trends.length > 0) {
-                trendsList.innerHTML = '';
-                
-                data.trends.forEach((trend, index) => {
-                    const listItem = document.createElement('li');
-                    listItem.className = 'trend-item';
-                    
-                    const rankClass = index < 3 ? 'top' : '';
-                    
-                    listItem.innerHTML = `
-                        <div class="trend-rank ${rankClass}">${index + 1}</div>
-                        <div class="trend-info">
-                            <div class="trend-topic">${trend.topic}</div>
-                            <div class="trend-metrics">
-                                <span><i class="fas fa-comment"></i> ${trend.mentions} mentions</span>
-                                <span><i class="fas fa-times-circle"></i> ${trend.falseClaims} false</span>
-                            </div>
-                        </div>
-                    `;
-                    
-                    trendsList.appendChild(listItem);
-                });
-                
-                // Update trends count
-                const trendsCount = document.getElementById('trendsCount');
-                if (trendsCount) {
-                    trendsCount.textContent = data.trends.length;
-                }
-            }
-        })
-        .catch(error => {
-            console.error('Error fetching trends:', error);
+            const statusClass = update.status === 'false' ? 'status-false' : 'status-verified';
+            
+            listItem.innerHTML = `
+                <div class="update-header">
+                    <div class="update-title">${update.title}</div>
+                    <div class="update-time">${update.time}</div>
+                </div>
+                <div class="update-content">${update.content}</div>
+                <span class="update-status ${statusClass}">${update.status}</span>
+            `;
+            
+            updatesList.appendChild(listItem);
         });
+    }
+}
+
+function renderTrends(data) {
+    const trendsList = document.getElementById('trendsList');
+    
+    if (data.trends && data.trends.length > 0) {
+        trendsList.innerHTML = '';
+        
+        data.trends.forEach((trend, index) => {
+            const listItem = document.createElement('li');
+            listItem.className = 'trend-item';
+            
+            const rankClass = index < 3 ? 'top' : '';
+            
+            listItem.innerHTML = `
+                <div class="trend-rank ${rankClass}">${index + 1}</div>
+                <div class="trend-info">
+                    <div class="trend-topic">${trend.topic}</div>
+                    <div class="trend-metrics">
+                        <span><i class="fas fa-comment"></i> ${trend.mentions} mentions</span>
+                        <span><i class="fas fa-times-circle"></i> ${trend.falseClaims} false</span>
+                    </div>
+                </div>
+            `;
+            
+            trendsList.appendChild(listItem);
+        });
+        
+        // Update trends count
+        const trendsCount = document.getElementById('trendsCount');
+        if (trendsCount) {
+            trendsCount.textContent = data.trends.length;
+        }
+    }
 }
\ No newline at end of file
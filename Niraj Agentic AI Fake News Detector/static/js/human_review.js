@@ -191,6 +191,9 @@ function addHumanReviewItem(reviewItem) {
             <button class="btn btn-disputed" onclick="submitReview('${reviewItem.claim}', 'disputed', ${isCrisis})">
                 <i class="fas fa-user-edit"></i> Dispute AI Assessment
             </button>
+            <button class="btn" onclick="recheckClaim(this)">
+                <i class="fas fa-sync-alt"></i> Re-check
+            </button>
         </div>
     `;
     
@@ -269,6 +272,41 @@ function submitReview(claimId, decision, isCrisis = false) {
     }
 }
 
+// Re-run verification for a claim on the desk. "priority: review" queues it behind
+// interactive /api/analyze calls but ahead of the background agent (see work_scheduler.py)
+function recheckClaim(button) {
+    const item = button.closest('.review-item');
+    const claimText = item.querySelector('.claim-content').textContent.trim();
+    const assessment = item.querySelector('.ai-assessment div');
+    button.disabled = true;
+    
+    fetch('/api/analyze', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ text: claimText, priority: 'review' })
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) {
+                throw new Error(data.error);
+            }
+            const verification = data.verification || {};
+            const confidence = ((verification.confidence || 0) * 100).toFixed(0);
+            assessment.textContent = `AI Assessment (re-checked): ${verification.severity || 'Uncertain'}`;
+            item.querySelector('.confidence-label span:last-child').textContent = `${confidence}%`;
+            item.querySelector('.confidence-fill').style.width = `${confidence}%`;
+        })
+        .catch(error => {
+            console.error('Error re-checking claim:', error);
+            alert('Re-check failed. Please try again.');
+        })
+        .finally(() => {
+            button.disabled = false;
+        });
+}
+
 function loadReviewItems() {
     // In a real implementation, this would fetch from the API
     // For demo, we'll use static data
@@ -331,6 +369,9 @@ function loadReviewItems() {
                     <button class="btn btn-disputed" onclick="submitReview('${claim.id}', 'disputed')">
                         <i class="fas fa-user-edit"></i> Dispute AI Assessment
                     </button>
+                    <button class="btn" onclick="recheckClaim(this)">
+                        <i class="fas fa-sync-alt"></i> Re-check
+                    </button>
                 </div>
             `;
             
@@ -0,0 +1,278 @@
+# storage.py
+"""
+SQLite storage for verified claims and their evidence.
+- init_db() / upsert_claim(...) / add_evidence(...) / get_evidence(claim_id)
+- Hard caps on claim, canonical, provenance and snippet lengths (raw feed XML never lands in a row)
+- Large evidence snippets are stored zlib-compressed
+- Retention: claims not seen for RETENTION_DAYS move into compact daily archive tables
+  (claims_archive_YYYYMMDD), and freed pages are returned with incremental vacuum.
+Call maybe_run_maintenance() from long-running loops (both agents do, off the event loop); it is
+cheap when nothing is due. compact_db() runs once from init_db(), when the unique canonical index
+is first created (duplicates have to be merged first), and otherwise from `python storage.py compact`.
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict
+
+DB_PATH = os.getenv("CLAIMS_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "claims.db"))
+
+MAX_CLAIM_CHARS = int(os.getenv("MAX_CLAIM_CHARS", "500"))
+MAX_PROVENANCE_CHARS = int(os.getenv("MAX_PROVENANCE_CHARS", "500"))
+MAX_SNIPPET_CHARS = int(os.getenv("MAX_SNIPPET_CHARS", "2000"))
+SNIPPET_COMPRESS_MIN = int(os.getenv("SNIPPET_COMPRESS_MIN", "256"))
+MAX_EVIDENCE_PER_CLAIM = int(os.getenv("MAX_EVIDENCE_PER_CLAIM", "20"))
+
+RETENTION_DAYS = int(os.getenv("CLAIMS_RETENTION_DAYS", "30"))
+MAINTENANCE_INTERVAL = int(os.getenv("STORAGE_MAINTENANCE_INTERVAL", "3600"))
+VACUUM_PAGES = int(os.getenv("STORAGE_VACUUM_PAGES", "500"))
+
+ARCHIVE_PREFIX = "claims_archive_"
+
+_last_maintenance = 0.0
+
+def _connect(path: Optional[str] = None) -> sqlite3.Connection:
+    conn = sqlite3.connect(path or DB_PATH, timeout=30)
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+def _cap(text: Optional[str], limit: int) -> str:
+    text = (text or "").strip()
+    return text[:limit]
+
+def _pack_snippet(snippet: Optional[str]):
+    """Cap snippet length; compress when it is large enough to be worth it."""
+    snippet = _cap(snippet, MAX_SNIPPET_CHARS)
+    if len(snippet) >= SNIPPET_COMPRESS_MIN:
+        return sqlite3.Binary(zlib.compress(snippet.encode("utf-8"), 6))
+    return snippet
+
+def _unpack_snippet(value) -> str:
+    if isinstance(value, (bytes, memoryview)):
+        return zlib.decompress(bytes(value)).decode("utf-8")
+    return value or ""
+
+def init_db(path: Optional[str] = None):
+    """Create tables/indexes and switch the file to incremental auto-vacuum (one-off VACUUM)."""
+    conn = _connect(path)
+    conn.isolation_level = None
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS claims (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                claim TEXT,
+                canonical TEXT,
+                first_seen TEXT,
+                last_seen TEXT,
+                count INTEGER,
+                severity TEXT,
+                score REAL,
+                provenance TEXT
+            )""")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS evidence (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                claim_id INTEGER,
+                source TEXT,
+                url TEXT,
+                snippet TEXT,
+                timestamp TEXT
+            )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_claims_last_seen ON claims(last_seen)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_evidence_claim ON evidence(claim_id)")
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_claims_canonical_unique'"
+                            ).fetchone():
+            # upsert_claim relies on it; legacy files can hold duplicate canonicals
+            stats = compact_db(path)
+            conn.execute("DROP INDEX IF EXISTS idx_claims_canonical")
+            conn.execute("CREATE UNIQUE INDEX idx_claims_canonical_unique ON claims(canonical)")
+            print(f"🗜️ Claims compacted for the unique canonical index: {stats}")
+    finally:
+        conn.close()
+
+def upsert_claim(claim: str, canonical: Optional[str] = None, severity: str = "Uncertain",
+                 score: float = 0.0, provenance: Optional[str] = None) -> int:
+    """Insert a claim or bump count/last_seen of the row with the same canonical text. Returns claim id.
+    One statement on the unique canonical index (init_db), so concurrent writers can't duplicate it."""
+    claim = _cap(claim, MAX_CLAIM_CHARS)
+    canonical = _cap(canonical if canonical is not None else claim.lower(), MAX_CLAIM_CHARS)
+    provenance = _cap(provenance, MAX_PROVENANCE_CHARS)
+    now = datetime.utcnow().isoformat()
+
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO claims (claim, canonical, first_seen, last_seen, count, severity, score, provenance) "
+            "VALUES (?, ?, ?, ?, 1, ?, ?, ?) "
+            "ON CONFLICT(canonical) DO UPDATE SET last_seen = excluded.last_seen, count = count + 1, "
+            "severity = excluded.severity, score = excluded.score",
+            (claim, canonical, now, now, severity, score, provenance))
+        return conn.execute("SELECT id FROM claims WHERE canonical = ?", (canonical,)).fetchone()[0]
+
+def add_evidence(claim_id: int, source: str, url: Optional[str], snippet: Optional[str]) -> Optional[int]:
+    """Attach evidence to a claim. Duplicate URLs and evidence beyond MAX_EVIDENCE_PER_CLAIM are dropped."""
+    url = _cap(url, MAX_PROVENANCE_CHARS)
+    with _connect() as conn:
+        if url and conn.execute("SELECT 1 FROM evidence WHERE claim_id = ? AND url = ? LIMIT 1",
+                                (claim_id, url)).fetchone():
+            return None
+        existing = conn.execute("SELECT COUNT(*) FROM evidence WHERE claim_id = ?", (claim_id,)).fetchone()[0]
+        if existing >= MAX_EVIDENCE_PER_CLAIM:
+            return None
+        cur = conn.execute(
+            "INSERT INTO evidence (claim_id, source, url, snippet, timestamp) VALUES (?, ?, ?, ?, ?)",
+            (claim_id, _cap(source, 100), url, _pack_snippet(snippet), datetime.utcnow().isoformat()))
+        return cur.lastrowid
+
+def get_evidence(claim_id: int) -> List[Dict]:
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT source, url, snippet, timestamp FROM evidence WHERE claim_id = ? ORDER BY id",
+            (claim_id,)).fetchall()
+    return [{"source": s, "url": u, "snippet": _unpack_snippet(sn), "timestamp": ts} for s, u, sn, ts in rows]
+
+# ===== RETENTION / COMPACTION =====
+
+def _archive_table(day: str) -> str:
+    return ARCHIVE_PREFIX + "".join(ch for ch in day if ch.isdigit())
+
+def archive_cold_claims(retention_days: int = RETENTION_DAYS) -> int:
+    """Move claims whose last_seen is older than retention_days into per-day archive tables."""
+    cutoff = (datetime.utcnow() - timedelta(days=retention_days)).isoformat()
+    moved = 0
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT id, claim, canonical, first_seen, last_seen, count, severity, score "
+            "FROM claims WHERE last_seen < ?", (cutoff,)).fetchall()
+        for cid, claim, canonical, first_seen, last_seen, count, severity, score in rows:
+            table = _archive_table((last_seen or first_seen or cutoff)[:10])
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    canonical TEXT PRIMARY KEY,
+                    claim_z BLOB,
+                    first_seen TEXT,
+                    last_seen TEXT,
+                    count INTEGER,
+                    severity TEXT,
+                    score REAL,
+                    evidence_z BLOB
+                ) WITHOUT ROWID""")
+            urls = [u for (u,) in conn.execute(
+                "SELECT url FROM evidence WHERE claim_id = ? AND url != '' ORDER BY id", (cid,))]
+            # the same canonical can be archived twice on one day (re-seen after an earlier
+            # archive): add the counts and widen the seen window instead of replacing the row
+            conn.execute(
+                f"""INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(canonical) DO UPDATE SET
+                        first_seen = min(coalesce(first_seen, excluded.first_seen),
+                                         coalesce(excluded.first_seen, first_seen)),
+                        last_seen = max(coalesce(last_seen, excluded.last_seen),
+                                        coalesce(excluded.last_seen, last_seen)),
+                        count = coalesce(count, 0) + coalesce(excluded.count, 0),
+                        claim_z = excluded.claim_z,
+                        severity = excluded.severity,
+                        score = excluded.score,
+                        evidence_z = coalesce(excluded.evidence_z, evidence_z)""",
+                (_cap(canonical, MAX_CLAIM_CHARS),
+                 sqlite3.Binary(zlib.compress((claim or "").encode("utf-8"))),
+                 first_seen, last_seen, count, severity, score,
+                 sqlite3.Binary(zlib.compress(json.dumps(urls).encode("utf-8"))) if urls else None))
+            conn.execute("DELETE FROM evidence WHERE claim_id = ?", (cid,))
+            conn.execute("DELETE FROM claims WHERE id = ?", (cid,))
+            moved += 1
+    return moved
+
+def incremental_vacuum(pages: int = VACUUM_PAGES) -> int:
+    """Return up to `pages` free pages to the filesystem. Returns remaining freelist size."""
+    conn = _connect()
+    conn.isolation_level = None
+    try:
+        # executescript steps the pragma to completion; execute() would free a single page
+        conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        return conn.execute("PRAGMA freelist_count").fetchone()[0]
+    finally:
+        conn.close()
+
+def compact_db(path: Optional[str] = None) -> Dict[str, int]:
+    """One-off cleanup for legacy rows: enforce caps, merge duplicate canonicals, compress snippets."""
+    stats = {"truncated": 0, "merged": 0, "snippets_packed": 0}
+    with _connect(path) as conn:
+        for cid, claim, canonical, provenance in conn.execute(
+                "SELECT id, claim, canonical, provenance FROM claims").fetchall():
+            capped = (_cap(claim, MAX_CLAIM_CHARS), _cap(canonical, MAX_CLAIM_CHARS),
+                      _cap(provenance, MAX_PROVENANCE_CHARS))
+            if capped != (claim, canonical, provenance):
+                conn.execute("UPDATE claims SET claim = ?, canonical = ?, provenance = ? WHERE id = ?",
+                             (*capped, cid))
+                stats["truncated"] += 1
+
+        dupes = conn.execute(
+            "SELECT canonical, MIN(id), SUM(count), MIN(first_seen), MAX(last_seen) "
+            "FROM claims GROUP BY canonical HAVING COUNT(*) > 1").fetchall()
+        for canonical, keep_id, total, first_seen, last_seen in dupes:
+            others = [i for (i,) in conn.execute(
+                "SELECT id FROM claims WHERE canonical = ? AND id != ?", (canonical, keep_id))]
+            conn.executemany("UPDATE evidence SET claim_id = ? WHERE claim_id = ?",
+                             [(keep_id, i) for i in others])
+            conn.executemany("DELETE FROM claims WHERE id = ?", [(i,) for i in others])
+            conn.execute("UPDATE claims SET count = ?, first_seen = ?, last_seen = ? WHERE id = ?",
+                         (total, first_seen, last_seen, keep_id))
+            stats["merged"] += len(others)
+
+        for eid, snippet in conn.execute(
+                "SELECT id, snippet FROM evidence WHERE typeof(snippet) = 'text'").fetchall():
+            packed = _pack_snippet(snippet)
+            if packed != snippet:
+                conn.execute("UPDATE evidence SET snippet = ? WHERE id = ?", (packed, eid))
+                stats["snippets_packed"] += 1
+    return stats
+
+def run_maintenance(retention_days: int = RETENTION_DAYS) -> Dict[str, int]:
+    global _last_maintenance
+    _last_maintenance = time.time()
+    archived = archive_cold_claims(retention_days)
+    free_pages = incremental_vacuum()
+    if archived:
+        print(f"🗄️ Archived {archived} cold claims ({free_pages} free pages left)")
+    return {"archived": archived, "free_pages": free_pages}
+
+def maybe_run_maintenance() -> Optional[Dict[str, int]]:
+    """Run retention + incremental vacuum at most once per MAINTENANCE_INTERVAL seconds."""
+    if time.time() - _last_maintenance < MAINTENANCE_INTERVAL:
+        return None
+    try:
+        return run_maintenance()
+    except sqlite3.Error as e:
+        print(f"⚠️ Storage maintenance error: {e}")
+        return None
+
+def db_stats() -> Dict[str, int]:
+    with _connect() as conn:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            "claims": conn.execute("SELECT COUNT(*) FROM claims").fetchone()[0],
+            "evidence": conn.execute("SELECT COUNT(*) FROM evidence").fetchone()[0],
+            "archive_tables": conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name LIKE ?",
+                (ARCHIVE_PREFIX + "%",)).fetchone()[0],
+            "size_bytes": conn.execute("PRAGMA page_count").fetchone()[0] * page_size,
+            "free_bytes": conn.execute("PRAGMA freelist_count").fetchone()[0] * page_size,
+        }
+
+if __name__ == "__main__":
+    import sys
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    init_db()
+    if cmd == "compact":
+        print(compact_db())
+        print(run_maintenance())
+    elif cmd == "maintain":
+        print(run_maintenance())
+    print(db_stats())
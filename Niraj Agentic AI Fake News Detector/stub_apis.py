@@ -0,0 +1,288 @@
+# stub_apis.py
+"""
+Local stand-in for the external APIs used by verifier.py and the ingest sources, for load testing
+without spending real quota. Serves the subset of each API the code actually reads:
+- GET /v1alpha1/claims:search   (Google Fact Check: claims[].claimReview[].title/text)
+- GET /api/1/news               (NewsData: results[])
+- GET /api/v4/search            (GNews: articles[])
+- GET /v1/news                  (Mediastack: data[])
+- GET /rss/<name>               (RSS 2.0 feed with <ttl>, ETag / If-None-Match support)
+- POST /v1/audio/transcriptions (OpenAI-style STT: multipart WAV in, {"text": ...} out)
+Latency, error rate and 429 rate are configurable globally or per endpoint.
+
+    python stub_apis.py --port 8099 --latency lognormal:120,0.6 --error-rate 0.01 --rate-429 0.02
+
+Then point the app at it:
+    FACTCHECK_URL=http://127.0.0.1:8099/v1alpha1/claims:search
+    NEWSDATA_URL=http://127.0.0.1:8099/api/1/news
+    GNEWS_URL=http://127.0.0.1:8099/api/v4/search
+    MEDIASTACK_URL=http://127.0.0.1:8099/v1/news
+    STT_URL=http://127.0.0.1:8099/v1/audio/transcriptions
+    RSS_FEEDS=BBC=http://127.0.0.1:8099/rss/bbc,CNN=http://127.0.0.1:8099/rss/cnn
+(plus any non-empty GOOGLE_API_KEY / NEWSDATA_API_KEY / ... so the code paths are enabled)
+"""
+
+import io
+import json
+import math
+import time
+import wave
+import random
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from typing import Dict, Optional
+
+ENDPOINTS = {
+    "/v1alpha1/claims:search": "factcheck",
+    "/api/1/news": "newsdata",
+    "/api/v4/search": "gnews",
+    "/v1/news": "mediastack",
+}
+
+_VERDICTS = ["False", "Misleading", "True", "Mostly true", "Unproven", "Partially false"]
+_OUTLETS = ["reuters", "bbc", "cnn", "npr", "abc news", "the guardian", "infowars", "natural news", "local blog"]
+_TOPICS = ["vaccine", "flood", "election", "wildfire", "outbreak", "ceasefire", "stimulus", "5g tower"]
+
+class LatencyModel:
+    """'fixed:MS', 'uniform:MIN_MS,MAX_MS' or 'lognormal:MEDIAN_MS,SIGMA' -> seconds per request."""
+
+    def __init__(self, spec: str = "fixed:0"):
+        kind, _, args = spec.partition(":")
+        self.kind = kind
+        self.args = [float(a) for a in args.split(",") if a]
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.args[0], self.args[1]) / 1000.0
+        if self.kind == "lognormal":
+            median, sigma = self.args[0], (self.args[1] if len(self.args) > 1 else 0.5)
+            return rng.lognormvariate(math.log(max(median, 1e-3)), sigma) / 1000.0
+        return (self.args[0] if self.args else 0.0) / 1000.0
+
+class StubConfig:
+    def __init__(self, latency: str = "fixed:0", error_rate: float = 0.0, rate_429: float = 0.0,
+                 overrides: Optional[Dict[str, Dict]] = None, seed: Optional[int] = None):
+        self.default = {"latency": LatencyModel(latency), "error_rate": error_rate, "rate_429": rate_429}
+        self.overrides = {}
+        for name, opts in (overrides or {}).items():
+            merged = dict(self.default)
+            if "latency" in opts:
+                merged["latency"] = LatencyModel(opts["latency"])
+            for k in ("error_rate", "rate_429"):
+                if k in opts:
+                    merged[k] = float(opts[k])
+            self.overrides[name] = merged
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def for_endpoint(self, name: str) -> Dict:
+        return self.overrides.get(name, self.default)
+
+    def draw(self, name: str):
+        """(delay_seconds, outcome) with outcome in ok / error / 429."""
+        cfg = self.for_endpoint(name)
+        with self.rng_lock:
+            delay = cfg["latency"].sample(self.rng)
+            roll = self.rng.random()
+            if roll < cfg["rate_429"]:
+                outcome = "429"
+            elif roll < cfg["rate_429"] + cfg["error_rate"]:
+                outcome = "error"
+            else:
+                outcome = "ok"
+            counts = self.stats.setdefault(name, {"ok": 0, "error": 0, "429": 0})
+            counts[outcome] += 1
+        return delay, outcome
+
+def _seed(query: str) -> random.Random:
+    # same query -> same answer, so repeated load runs see the same verdict mix
+    return random.Random(int(hashlib.md5(query.encode("utf-8")).hexdigest()[:8], 16))
+
+def _articles(query: str, n: int):
+    rng = _seed(query)
+    now = datetime.utcnow()
+    for i in range(n):
+        outlet = rng.choice(_OUTLETS)
+        topic = rng.choice(_TOPICS)
+        yield {
+            "title": f"{query[:60]} - {topic} update {i + 1}",
+            "description": f"Reports on {topic}: {query[:120]}",
+            "content": f"{outlet} reported that {query[:200]}. Officials confirmed a {topic} statement.",
+            "url": f"https://{outlet.replace(' ', '')}.example/{rng.randint(0, 10**8)}",
+            "image": None,
+            "source": outlet,
+            "published": (now - timedelta(minutes=rng.randint(0, 600))).isoformat(),
+        }
+
+def factcheck_body(params: Dict) -> Dict:
+    query = params.get("query", [""])[0]
+    size = int(params.get("pageSize", ["5"])[0])
+    rng = _seed(query)
+    claims = []
+    for i in range(rng.randint(0, size)):
+        verdict = rng.choice(_VERDICTS)
+        claims.append({
+            "text": query,
+            "claimant": rng.choice(_OUTLETS),
+            "claimReview": [{
+                "publisher": {"name": "Stub Fact Check", "site": "factcheck.example"},
+                "url": f"https://factcheck.example/{i}",
+                "title": f"{verdict}: {query[:80]}",
+                "textualRating": verdict,
+            }],
+        })
+    return {"claims": claims}
+
+def newsdata_body(params: Dict) -> Dict:
+    q = params.get("q", [""])[0]
+    return {"status": "success", "results": [{
+        "title": a["title"], "description": a["description"], "content": a["content"],
+        "link": a["url"], "image_url": a["image"], "source_id": a["source"], "pubDate": a["published"],
+    } for a in _articles(q, 10)]}
+
+def gnews_body(params: Dict) -> Dict:
+    q = params.get("q", [""])[0]
+    n = int(params.get("max", ["10"])[0])
+    return {"totalArticles": n, "articles": [{
+        "title": a["title"], "description": a["description"], "content": a["content"], "url": a["url"],
+        "image": a["image"], "publishedAt": a["published"], "source": {"name": a["source"]},
+    } for a in _articles(q, n)]}
+
+def mediastack_body(params: Dict) -> Dict:
+    q = params.get("keywords", [""])[0]
+    n = int(params.get("limit", ["10"])[0])
+    return {"data": [{
+        "title": a["title"], "description": a["description"], "url": a["url"], "image": a["image"],
+        "source": a["source"], "published_at": a["published"],
+    } for a in _articles(q, n)]}
+
+BODIES = {"factcheck": factcheck_body, "newsdata": newsdata_body, "gnews": gnews_body, "mediastack": mediastack_body}
+
+def transcription_body(body: bytes) -> Dict:
+    # the multipart body carries the chunk as WAV; the transcript depends on its content and length
+    start = body.find(b"RIFF")
+    seconds = 0.0
+    if start >= 0:
+        try:
+            with wave.open(io.BytesIO(body[start:]), "rb") as wf:
+                seconds = wf.getnframes() / float(wf.getframerate())
+        except (wave.Error, EOFError):
+            pass
+    rng = random.Random(int(hashlib.md5(body).hexdigest()[:8], 16))
+    topic = rng.choice(_TOPICS)
+    return {"text": f"Officials confirmed a {topic} report today. A viral claim says the {topic} "
+                    f"was staged ({seconds:.1f} seconds of audio).", "duration": round(seconds, 2)}
+
+def rss_body(name: str, items: int = 30, ttl: int = 15) -> str:
+    # content changes every 5 minutes, so conditional GETs see 304s in between
+    epoch = int(time.time() // 300)
+    entries = "".join(
+        f"<item><title>{name} story {epoch}-{i}: {_TOPICS[i % len(_TOPICS)]} update</title>"
+        f"<description>&lt;p&gt;Stub article {i} about {_TOPICS[i % len(_TOPICS)]}.&lt;/p&gt;</description>"
+        f"<link>https://{name}.example/{epoch}/{i}</link><guid>{name}-{epoch}-{i}</guid></item>"
+        for i in range(items))
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>{name}</title>'
+            f"<ttl>{ttl}</ttl>{entries}</channel></rss>")
+
+class StubHandler(BaseHTTPRequestHandler):
+    config: StubConfig = StubConfig()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers: Dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        params = parse_qs(parts.query)
+        if parts.path == "/_stats":
+            return self._send(200, json.dumps(self.config.stats).encode())
+
+        if parts.path.startswith("/rss/"):
+            name = parts.path[5:] or "feed"
+            endpoint = "rss"
+        else:
+            endpoint = ENDPOINTS.get(parts.path)
+            if endpoint is None:
+                return self._send(404, b'{"error": "unknown endpoint"}')
+
+        delay, outcome = self.config.draw(endpoint)
+        if delay > 0:
+            time.sleep(delay)
+        if outcome == "429":
+            return self._send(429, b'{"error": "rate limited"}', headers={"Retry-After": "1"})
+        if outcome == "error":
+            return self._send(500, b'{"error": "stub failure"}')
+
+        if endpoint == "rss":
+            body = rss_body(name).encode("utf-8")
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, b"", headers={"ETag": etag})
+            return self._send(200, body, "application/rss+xml", {"ETag": etag})
+        self._send(200, json.dumps(BODIES[endpoint](params)).encode("utf-8"))
+
+    def do_POST(self):
+        parts = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if parts.path != "/v1/audio/transcriptions":
+            return self._send(404, b'{"error": "unknown endpoint"}')
+        delay, outcome = self.config.draw("stt")
+        if delay > 0:
+            time.sleep(delay)
+        if outcome == "429":
+            return self._send(429, b'{"error": "rate limited"}', headers={"Retry-After": "1"})
+        if outcome == "error":
+            return self._send(500, b'{"error": "stub failure"}')
+        self._send(200, json.dumps(transcription_body(body)).encode("utf-8"))
+
+def serve(port: int = 8099, config: Optional[StubConfig] = None, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Start the stub server in a background thread and return it (call .shutdown() to stop)."""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config or StubConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def _parse_overrides(values):
+    # --endpoint factcheck:latency=lognormal:300,0.8 --endpoint newsdata:rate_429=0.2
+    overrides: Dict[str, Dict] = {}
+    for value in values or []:
+        name, _, setting = value.partition(":")
+        key, _, val = setting.partition("=")
+        overrides.setdefault(name, {})[key] = val
+    return overrides
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local stand-in for Fact Check / news APIs")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8099)
+    ap.add_argument("--latency", default="lognormal:150,0.5", help="fixed:MS | uniform:MIN,MAX | lognormal:MEDIAN,SIGMA")
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--endpoint", action="append", help="per-endpoint override, e.g. factcheck:rate_429=0.1")
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args()
+
+    cfg = StubConfig(args.latency, args.error_rate, args.rate_429, _parse_overrides(args.endpoint), args.seed)
+    srv = serve(args.port, cfg, args.host)
+    print(f"🧪 Stub APIs listening on http://{args.host}:{args.port} (latency={args.latency}, "
+          f"errors={args.error_rate}, 429={args.rate_429})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.shutdown()
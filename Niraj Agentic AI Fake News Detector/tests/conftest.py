@@ -0,0 +1,7 @@
+# tests/conftest.py
+"""The project is a flat set of modules; make them importable from the tests."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,20 @@
+# tests/test_artifacts.py
+import artifacts
+import rules
+
+def test_truncated_artifact_is_treated_as_missing(tmp_path):
+    path = str(tmp_path / "rules.bin")
+    rules.build_artifact(path)
+    data = open(path, "rb").read()
+    for size in (10, 200, len(data) - 8):
+        with open(path, "wb") as f:
+            f.write(data[:size])
+        assert artifacts.open_artifact(path, "rules") is None
+
+def test_unwritable_artifact_dir_falls_back_to_compiling(monkeypatch):
+    monkeypatch.setattr(rules, "_matcher", None)
+    monkeypatch.setattr(rules, "ARTIFACT_AUTOBUILD", True)
+    monkeypatch.setattr(rules, "artifact_path", lambda kind: "/proc/nope/rules.bin")
+    matcher = rules.get_rule_matcher()
+    assert matcher.source == "compiled"
+    assert matcher.match("vaccines cause autism")["known_facts"]
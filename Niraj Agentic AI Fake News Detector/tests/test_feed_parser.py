@@ -0,0 +1,68 @@
+# tests/test_feed_parser.py
+import feed_parser
+from feed_parser import FeedParser, parse_feed
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+<channel><title>Feed</title><ttl>30</ttl>
+<item><title>First &amp; one</title><link>https://e.com/1</link><guid>g1</guid>
+  <description>&lt;p&gt;Body one&lt;/p&gt;</description><pubDate>Mon, 01 Jan 2024</pubDate></item>
+<item><title>Second</title><link>https://e.com/2</link><guid>g2</guid>
+  <content:encoded><![CDATA[<b>Body</b> two]]></content:encoded></item>
+<item><title>Third</title><link>https://e.com/3</link></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Atom</title>
+<entry><title>Atom entry</title><id>urn:a1</id>
+  <link rel="self" href="https://e.com/self"/><link href="https://e.com/a1"/>
+  <summary>Short</summary><updated>2024-01-02T00:00:00Z</updated></entry>
+<entry><title>No id</title><link rel="alternate" href="https://e.com/a2"/></entry>
+</feed>"""
+
+def test_rss_items():
+    items = parse_feed(RSS, "rss", max_items=10)
+    assert [i["guid"] for i in items] == ["g1", "g2", "https://e.com/3"]
+    assert items[0]["title"] == "First & one"
+    assert items[0]["text"] == "Body one"
+    assert items[1]["text"] == "Body two"
+    assert items[0]["published"] == "Mon, 01 Jan 2024"
+
+def test_atom_entries():
+    items = parse_feed(ATOM, "atom", max_items=10)
+    assert [(i["guid"], i["url"]) for i in items] == [("urn:a1", "https://e.com/a1"),
+                                                      ("https://e.com/a2", "https://e.com/a2")]
+    assert items[0]["text"] == "Short"
+    assert items[0]["published"] == "2024-01-02T00:00:00Z"
+
+def test_ttl_and_max_items_in_chunks():
+    parser = FeedParser("rss", max_items=2)
+    items = []
+    for i in range(0, len(RSS), 17):
+        items.extend(parser.feed(RSS[i:i + 17]))
+    items.extend(parser.close())
+    assert [i["guid"] for i in items] == ["g1", "g2"]
+    assert parser.done
+    assert parser.ttl == 30
+
+def test_finished_items_are_detached():
+    parser = FeedParser("rss", max_items=10)
+    assert len(parser.feed(RSS[:RSS.index(b"</channel>")])) == 3   # channel still open
+    channel = parser._stack[-1]
+    assert feed_parser._local(channel.tag) == "channel"
+    assert not [c for c in channel if feed_parser._local(c.tag) in feed_parser.ITEM_TAGS]
+
+def test_seen_ids_skipped_before_building(monkeypatch):
+    calls = []
+    real = feed_parser.strip_html
+    monkeypatch.setattr(feed_parser, "strip_html", lambda text: calls.append(text) or real(text))
+    parser = FeedParser("rss", max_items=10, seen_ids={"g1", "https://e.com/3"})
+    items = parser.feed(RSS) + parser.close()
+    assert [i["guid"] for i in items] == ["g2"]
+    assert parser.skipped == 2 and parser.items_seen == 3
+    # only the one new item had its fields cleaned up
+    assert len(calls) == 2
+
+def test_truncated_feed_keeps_complete_items():
+    cut = RSS[:RSS.index(b"<item><title>Second")] + b"<item><title>Sec"
+    assert [i["guid"] for i in parse_feed(cut, "rss", max_items=10)] == ["g1"]
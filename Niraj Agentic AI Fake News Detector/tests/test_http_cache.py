@@ -0,0 +1,45 @@
+# tests/test_http_cache.py
+from flask import Flask, jsonify
+
+import http_cache
+from http_cache import bump, cached_json
+
+def _app(calls):
+    app = Flask(__name__)
+
+    @app.route("/items")
+    @cached_json("test_items")
+    def items():
+        calls.append(1)
+        return jsonify({"n": len(calls)})
+
+    return app.test_client()
+
+def test_304_before_the_view_runs():
+    calls = []
+    client = _app(calls)
+    first = client.get("/items")
+    etag = first.headers["ETag"]
+    http_cache._entries.clear()             # evicted: still answered from the key alone
+    again = client.get("/items", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["ETag"] == etag
+    assert len(calls) == 1
+    bump("test_items")
+    changed = client.get("/items", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert changed.get_json() == {"n": 2}
+
+def test_hits_refresh_lru_order(monkeypatch):
+    calls = []
+    client = _app(calls)
+    monkeypatch.setattr(http_cache, "HTTP_CACHE_ENTRIES", 2)
+    http_cache._entries.clear()
+    client.get("/items?a")
+    client.get("/items?b")
+    client.get("/items?a")                  # hit: a becomes most recent
+    client.get("/items?c")                  # evicts b
+    assert len(calls) == 3
+    client.get("/items?a")
+    assert len(calls) == 3
+    client.get("/items?b")
+    assert len(calls) == 4
@@ -0,0 +1,42 @@
+# tests/test_metrics.py
+import threading
+
+import metrics
+from metrics import Counter, Histogram
+
+def _run_threads(fn, n=20):
+    barrier = threading.Barrier(n)        # all alive at once, so each gets its own ident
+
+    def run():
+        fn()
+        barrier.wait()
+
+    threads = [threading.Thread(target=run) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+def test_counter_family_is_total_everywhere():
+    Counter("test_family_requests", "Requests").inc()
+    text = metrics.render()
+    assert "# HELP test_family_requests_total Requests" in text
+    assert "# TYPE test_family_requests_total counter" in text
+    assert "\ntest_family_requests_total 1\n" in text
+    assert "# TYPE test_family_requests counter" not in text
+
+def test_dead_thread_shards_are_folded():
+    counter = Counter("test_fold_events", "Events", ("kind",))
+    hist = Histogram("test_fold_seconds", "Latency", buckets=(0.1, 1.0))
+    child = counter.labels("a")
+    _run_threads(lambda: (child.inc(2), hist.observe(0.5)))
+    assert len(child._shards) == 20
+    text = metrics.render()
+    assert 'test_fold_events_total{kind="a"} 40' in text
+    assert 'test_fold_seconds_bucket{le="1.0"} 20' in text
+    assert child._shards == {} and hist.labels()._shards == {}
+    child.inc()
+    hist.observe(5)
+    text = metrics.render()
+    assert 'test_fold_events_total{kind="a"} 41' in text
+    assert 'test_fold_seconds_count 21' in text
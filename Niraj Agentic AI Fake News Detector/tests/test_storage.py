@@ -0,0 +1,32 @@
+# tests/test_storage.py
+import sqlite3
+import threading
+
+import storage
+
+def test_init_db_merges_duplicates_and_upsert_is_atomic(tmp_path, monkeypatch):
+    path = str(tmp_path / "claims.db")
+    monkeypatch.setattr(storage, "DB_PATH", path)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE claims (id INTEGER PRIMARY KEY AUTOINCREMENT, claim TEXT, canonical TEXT, "
+                 "first_seen TEXT, last_seen TEXT, count INTEGER, severity TEXT, score REAL, provenance TEXT)")
+    conn.executemany("INSERT INTO claims (claim, canonical, first_seen, last_seen, count) VALUES (?, ?, ?, ?, ?)",
+                     [("A", "a", "2024-01-01", "2024-01-02", 2), ("A", "a", "2024-01-03", "2024-01-04", 3)])
+    conn.commit()
+    conn.close()
+
+    storage.init_db()
+    storage.init_db()                                   # second start: nothing left to migrate
+
+    def write():
+        for i in range(20):
+            storage.upsert_claim(f"Claim {i}")
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT count, first_seen FROM claims WHERE canonical = 'a'").fetchall() == [(5, "2024-01-01")]
+        assert conn.execute("SELECT COUNT(*), SUM(count) FROM claims WHERE canonical LIKE 'claim %'").fetchone() == (20, 80)
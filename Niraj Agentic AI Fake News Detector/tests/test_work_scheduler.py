@@ -0,0 +1,192 @@
+# tests/test_work_scheduler.py
+import os
+import time
+import asyncio
+import threading
+
+import pytest
+
+from work_scheduler import WorkScheduler, _SharedCounts, forget_process, INTERACTIVE, REVIEW, BACKGROUND
+
+def _scheduler(total=1, reserve=0, limits=None, max_wait_ms=None, max_queue=None, shared=None):
+    return WorkScheduler(total=total, reserve=reserve,
+                         limits=dict({INTERACTIVE: 0, REVIEW: 0, BACKGROUND: 0}, **(limits or {})),
+                         max_wait_ms=dict({INTERACTIVE: 0, REVIEW: 0, BACKGROUND: 0}, **(max_wait_ms or {})),
+                         max_queue=dict({INTERACTIVE: 0, REVIEW: 0, BACKGROUND: 0}, **(max_queue or {})),
+                         shared=shared, poll_ms=5)
+
+def _two_processes(tmp_path, **kwargs):
+    # two live pids, so neither treats the other's rows as left by a dead process
+    path = str(tmp_path / "shared.db")
+    return (_scheduler(shared=_SharedCounts(path, pid=os.getpid()), **kwargs),
+            _scheduler(shared=_SharedCounts(path, pid=os.getppid()), **kwargs))
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.001)
+
+def _queue_thread(sched, cls, order):
+    def run():
+        if sched.acquire(cls):
+            order.append(cls)
+            sched.release(cls)
+    thread = threading.Thread(target=run)
+    thread.start()
+    _wait_for(lambda: sched.snapshot()["waiting"][cls] == 1)
+    return thread
+
+def test_freed_slots_go_to_the_highest_priority_waiter():
+    sched = _scheduler()
+    assert sched.acquire(BACKGROUND)
+    order = []
+    threads = [_queue_thread(sched, cls, order) for cls in (BACKGROUND, REVIEW, INTERACTIVE)]
+    sched.release(BACKGROUND)
+    for thread in threads:
+        thread.join(2)
+    assert order == [INTERACTIVE, REVIEW, BACKGROUND]
+    assert sched.snapshot()["running"] == {INTERACTIVE: 0, REVIEW: 0, BACKGROUND: 0}
+
+def test_reserve_is_only_for_interactive():
+    sched = _scheduler(total=3, reserve=1)
+    assert sched.acquire(BACKGROUND) and sched.acquire(REVIEW)
+    assert sched.saturated(BACKGROUND) and not sched.saturated(INTERACTIVE)
+    assert not sched.acquire(BACKGROUND, timeout=0.01)
+    assert sched.acquire(INTERACTIVE, timeout=0.01)
+    assert sched.snapshot()["running"] == {INTERACTIVE: 1, REVIEW: 1, BACKGROUND: 1}
+
+def test_shed_after_max_wait_and_when_the_queue_is_full():
+    sched = _scheduler(max_wait_ms={INTERACTIVE: 50}, max_queue={INTERACTIVE: 1})
+    assert sched.acquire(BACKGROUND)
+    start = time.perf_counter()
+    assert not sched.acquire(INTERACTIVE)
+    assert time.perf_counter() - start >= 0.04
+    blocked = threading.Thread(target=sched.acquire, args=(INTERACTIVE, 0.2))
+    blocked.start()
+    _wait_for(lambda: sched.snapshot()["waiting"][INTERACTIVE] == 1)
+    start = time.perf_counter()
+    assert not sched.acquire(INTERACTIVE)           # queue full: refused without waiting
+    assert time.perf_counter() - start < 0.04
+    blocked.join(2)
+    assert sched.snapshot()["waiting"][INTERACTIVE] == 0
+
+def test_waiter_held_back_by_its_own_limit_does_not_block_others():
+    sched = _scheduler(total=3, limits={INTERACTIVE: 1})
+    assert sched.acquire(INTERACTIVE)
+    waiting = threading.Thread(target=sched.acquire, args=(INTERACTIVE, 0.5))
+    waiting.start()
+    _wait_for(lambda: sched.snapshot()["waiting"][INTERACTIVE] == 1)
+    start = time.perf_counter()
+    assert sched.acquire(BACKGROUND, timeout=0.3)
+    assert time.perf_counter() - start < 0.1
+    waiting.join(2)
+
+def test_slot_context_releases():
+    sched = _scheduler()
+    with sched.slot(REVIEW) as admitted:
+        assert admitted and sched.snapshot()["running"][REVIEW] == 1
+    assert sched.snapshot()["running"][REVIEW] == 0
+
+def test_async_priority_and_timeout():
+    async def main():
+        sched = _scheduler()
+        assert await sched.aacquire(BACKGROUND)
+        order = []
+
+        async def worker(cls):
+            async with sched.aslot(cls) as admitted:
+                if admitted:
+                    order.append(cls)
+
+        tasks = []
+        for cls in (BACKGROUND, REVIEW, INTERACTIVE):
+            tasks.append(asyncio.create_task(worker(cls)))
+            await asyncio.sleep(0.01)
+        assert not await sched.aacquire(INTERACTIVE, timeout=0.01)
+        sched.release(BACKGROUND)
+        await asyncio.gather(*tasks)
+        return order, sched.snapshot()
+
+    order, snap = asyncio.run(main())
+    assert order == [INTERACTIVE, REVIEW, BACKGROUND]
+    assert snap["running"] == snap["waiting"] == {INTERACTIVE: 0, REVIEW: 0, BACKGROUND: 0}
+
+@pytest.mark.parametrize("granted_first", [False, True])
+def test_async_cancellation_never_leaks_a_slot(granted_first):
+    async def main():
+        sched = _scheduler()
+        assert await sched.aacquire(BACKGROUND)
+        task = asyncio.create_task(sched.aacquire(INTERACTIVE))
+        await asyncio.sleep(0.01)
+        assert sched.snapshot()["waiting"][INTERACTIVE] == 1
+        if granted_first:
+            sched.release(BACKGROUND)               # grant lands, then the waiter is cancelled
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        if not granted_first:
+            sched.release(BACKGROUND)
+        return sched.snapshot()
+
+    snap = asyncio.run(main())
+    assert snap["running"] == snap["waiting"] == {INTERACTIVE: 0, REVIEW: 0, BACKGROUND: 0}
+
+def test_shared_counts_bound_all_processes(tmp_path):
+    web, agent = _two_processes(tmp_path)
+    assert agent.acquire(BACKGROUND)
+    assert not web.acquire(INTERACTIVE, timeout=0.05)
+    threading.Timer(0.05, agent.release, (BACKGROUND,)).start()
+    start = time.perf_counter()
+    assert web.acquire(INTERACTIVE, timeout=1.0)     # freed in the other process, seen by polling
+    assert time.perf_counter() - start < 0.5
+    assert web.snapshot()["other_processes"]["running"][BACKGROUND] == 0
+
+def test_shared_waiters_keep_priority_across_processes(tmp_path):
+    web, agent = _two_processes(tmp_path)
+    assert agent.acquire(BACKGROUND)
+    order = []
+    threads = [_queue_thread(web, INTERACTIVE, order), _queue_thread(agent, BACKGROUND, order)]
+    agent.release(BACKGROUND)       # the agent's own waiter fits, but the web worker's goes first
+    for thread in threads:
+        thread.join(2)
+    assert order == [INTERACTIVE, BACKGROUND]
+
+def test_forget_process_frees_its_slots(tmp_path):
+    web, agent = _two_processes(tmp_path)
+    assert agent.acquire(BACKGROUND)
+    assert not web.acquire(INTERACTIVE, timeout=0.02)
+    forget_process(os.getppid(), path=str(tmp_path / "shared.db"))
+    assert web.acquire(INTERACTIVE, timeout=0.02)
+
+def test_shared_async_waiter_polls(tmp_path):
+    web, agent = _two_processes(tmp_path)
+
+    async def main():
+        assert await agent.aacquire(BACKGROUND)
+        asyncio.get_running_loop().call_later(0.05, agent.release, BACKGROUND)
+        return await web.aacquire(REVIEW, timeout=1.0)
+
+    assert asyncio.run(main())
+    assert web.snapshot()["running"][REVIEW] == 1
+
+def test_shared_waiters_poll_once_per_process_and_write_only_on_change(tmp_path, monkeypatch):
+    web, agent = _two_processes(tmp_path)
+    writes = []
+    publish = agent._shared.publish
+    monkeypatch.setattr(agent._shared, "publish", lambda *a: writes.append(1) or publish(*a))
+
+    async def main():
+        assert await web.aacquire(BACKGROUND)
+        waiters = [asyncio.create_task(agent.aacquire(BACKGROUND)) for _ in range(20)]
+        await asyncio.sleep(0.2)                   # ~40 poll intervals
+        queued = len(writes)
+        web.release(BACKGROUND)
+        assert all(await asyncio.gather(*waiters[:1]))
+        for task in waiters[1:]:
+            task.cancel()
+        await asyncio.gather(*waiters[1:], return_exceptions=True)
+        return queued
+
+    assert asyncio.run(main()) == 20                # one write per waiter queued, none per poll
+    assert threading.active_count() < 5
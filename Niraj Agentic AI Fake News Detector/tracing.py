@@ -0,0 +1,195 @@
+# tracing.py
+"""
+Lightweight per-item / per-claim tracing.
+- with start_trace("item", source=...):     # new trace id, becomes the current trace
+- with span("verify_claim", claim=...):     # timed span inside the current trace (no-op without one)
+- @traced("name", root=True)                # decorator for sync/async functions; root=True starts a
+                                            # trace when none is active
+- recent_traces(limit, min_ms)              # finished traces, slowest first (GET /debug/traces)
+The current trace/span live in contextvars, so they follow asyncio tasks and asyncio.run() calls
+made inside a trace. Finished traces go into a ring buffer of the last TRACE_BUFFER_SIZE.
+External HTTP calls add an "http:<provider>" span (see cassette.MetricsTransport).
+"""
+
+import os
+import time
+import random
+import asyncio
+import itertools
+import functools
+import threading
+import contextvars
+from collections import deque
+from typing import Dict, List, Optional
+
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "1") == "1"
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "500"))
+MAX_SPANS_PER_TRACE = 500
+_ATTR_CHARS = 200
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("span", default=None)
+_finished: deque = deque(maxlen=TRACE_BUFFER_SIZE)
+_finished_lock = threading.Lock()
+STAGE_CODES: Dict[object, str] = {}     # code object of each @traced function -> span name (profiler.py)
+
+def _clip(attrs: Dict) -> Dict:
+    return {k: (v[:_ATTR_CHARS] if isinstance(v, str) else v) for k, v in attrs.items()}
+
+class Trace:
+    __slots__ = ("trace_id", "name", "attrs", "start", "wall_start", "duration", "spans", "dropped", "_next_id")
+
+    def __init__(self, name: str, attrs: Dict):
+        self.trace_id = "%016x" % random.getrandbits(64)     # uuid4() reads os.urandom on every call
+        self.name = name
+        self.attrs = _clip(attrs)
+        self.start = time.perf_counter()
+        self.wall_start = time.time()
+        self.duration: Optional[float] = None
+        self.spans: List[Dict] = []
+        self.dropped = 0
+        self._next_id = itertools.count(1).__next__     # atomic under the GIL
+
+    def add_span(self, record: Dict):
+        if len(self.spans) < MAX_SPANS_PER_TRACE:
+            self.spans.append(record)
+        else:
+            self.dropped += 1
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "attrs": self.attrs,
+            "started_at": self.wall_start,
+            "duration_ms": round((self.duration or 0.0) * 1000, 2),
+            "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+            "dropped_spans": self.dropped,
+        }
+
+class _Span:
+    __slots__ = ("trace", "name", "attrs", "span_id", "parent", "start", "_token")
+
+    def __init__(self, trace: Trace, name: str, attrs: Dict):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.span_id = self.trace._next_id()
+        self.parent = _current_span.get()
+        self._token = _current_span.set(self.span_id)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        _current_span.reset(self._token)
+        record = {
+            "span_id": self.span_id,
+            "parent_id": self.parent,
+            "name": self.name,
+            "start_ms": round((self.start - self.trace.start) * 1000, 2),
+            "duration_ms": round((end - self.start) * 1000, 2),
+        }
+        if self.attrs:
+            record["attrs"] = _clip(self.attrs)
+        if exc_type is not None:
+            record["error"] = f"{exc_type.__name__}: {exc}"[:_ATTR_CHARS]
+        self.trace.add_span(record)
+        return False
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP = _NoopSpan()
+
+class _TraceScope:
+    def __init__(self, name: str, attrs: Dict):
+        self.trace = Trace(name, attrs)
+
+    def set(self, **attrs):
+        self.trace.attrs.update(_clip(attrs))
+
+    def __enter__(self):
+        self._trace_token = _current_trace.set(self.trace)
+        self._span_token = _current_span.set(None)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.duration = time.perf_counter() - self.trace.start
+        if exc_type is not None:
+            self.trace.attrs["error"] = f"{exc_type.__name__}: {exc}"[:_ATTR_CHARS]
+        _current_span.reset(self._span_token)
+        _current_trace.reset(self._trace_token)
+        with _finished_lock:
+            _finished.append(self.trace)
+        return False
+
+def start_trace(name: str, **attrs):
+    if not TRACE_ENABLED:
+        return _NOOP
+    return _TraceScope(name, attrs)
+
+def span(name: str, **attrs):
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name, attrs)
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace is not None else None
+
+def traced(name: Optional[str] = None, root: bool = False):
+    """Wrap a sync or async function in a span (or a new trace when root=True and none is active)."""
+    def decorator(fn):
+        label = name or fn.__name__
+        STAGE_CODES[fn.__code__] = label
+
+        def scope():
+            if _current_trace.get() is not None:
+                return span(label)
+            return start_trace(label) if root else _NOOP
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with scope():
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with scope():
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def recent_traces(limit: int = 20, min_ms: float = 0.0, name: Optional[str] = None) -> List[Dict]:
+    with _finished_lock:
+        traces = list(_finished)
+    if name:
+        traces = [t for t in traces if t.name == name]
+    traces = [t for t in traces if (t.duration or 0) * 1000 >= min_ms]
+    traces.sort(key=lambda t: t.duration or 0, reverse=True)
+    return [t.to_dict() for t in traces[:limit]]
+
+def get_trace(trace_id: str) -> Optional[Dict]:
+    with _finished_lock:
+        for t in _finished:
+            if t.trace_id == trace_id:
+                return t.to_dict()
+    return None
@@ -0,0 +1,226 @@
+# transcription.py
+"""
+Chunked, concurrent speech-to-text for long recordings (livestreams, hour-long uploads).
+- iter_transcript(path) -> async generator of segments {index, start, end, text} as chunks finish
+- transcribe_file(path) -> (stitched_text, segments)      # "[hh:mm:ss] text" lines, in order
+Audio is split into STT_CHUNK_SECONDS windows; each cut is moved to the quietest frame in the
+last STT_SILENCE_SEARCH seconds so words aren't split. Chunks are cut lazily, so at most
+STT_CONCURRENCY chunk buffers are in memory at once. Non-WAV input is converted with ffmpeg
+when it is installed; otherwise the file is sent whole, streamed from disk.
+
+Backends (STT_BACKEND):
+- "http": OpenAI-compatible POST {STT_URL} multipart (file, model) -> {"text": ...}.
+  Works with Groq (https://api.groq.com/openai/v1/audio/transcriptions) and stub_apis.py.
+- "groq": voice_of_patient.transcribe_with_groq in a thread (one temp file per chunk)
+Default is "http" when STT_URL is set, else "groq".
+"""
+
+import io
+import os
+import array
+import wave
+import shutil
+import asyncio
+import tempfile
+import subprocess
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+STT_CHUNK_SECONDS = float(os.getenv("STT_CHUNK_SECONDS", "30"))
+STT_SILENCE_SEARCH = float(os.getenv("STT_SILENCE_SEARCH", "3"))
+STT_CONCURRENCY = int(os.getenv("STT_CONCURRENCY", "4"))
+STT_TIMEOUT = float(os.getenv("STT_TIMEOUT", "120"))
+STT_URL = os.getenv("STT_URL", "")
+STT_MODEL = os.getenv("STT_MODEL", "whisper-large-v3")
+STT_BACKEND = os.getenv("STT_BACKEND", "http" if STT_URL else "groq")
+_FRAME_MS = 20          # silence search resolution
+
+# ===== BACKENDS =====
+
+class STTBackend:
+    name = "base"
+
+    async def transcribe(self, wav, filename: str = "chunk.wav") -> str:
+        """`wav` is bytes (a chunk) or an open binary file (a whole unsplittable recording)."""
+        raise NotImplementedError
+
+class HTTPSTTBackend(STTBackend):
+    name = "http"
+
+    def __init__(self, url: str = STT_URL, model: str = STT_MODEL, api_key: Optional[str] = None,
+                 timeout: float = STT_TIMEOUT):
+        self.url = url
+        self.model = model
+        self.api_key = api_key or os.getenv("STT_API_KEY") or os.getenv("GROQ_API_KEY")
+        self.timeout = timeout
+
+    async def transcribe(self, wav, filename: str = "chunk.wav") -> str:
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            r = await client.post(self.url, headers=headers, data={"model": self.model},
+                                  files={"file": (filename, wav, "audio/wav")})
+            r.raise_for_status()
+            return (r.json().get("text") or "").strip()
+
+class GroqSTTBackend(STTBackend):
+    name = "groq"
+
+    def __init__(self, model: str = STT_MODEL):
+        self.model = model
+
+    async def transcribe(self, wav, filename: str = "chunk.wav") -> str:
+        from voice_of_patient import transcribe_with_groq
+
+        def run():
+            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
+                if hasattr(wav, "read"):
+                    shutil.copyfileobj(wav, f)
+                else:
+                    f.write(wav)
+            try:
+                return transcribe_with_groq(stt_model=self.model, audio_filepath=f.name)
+            finally:
+                os.unlink(f.name)
+        return (await asyncio.to_thread(run) or "").strip()
+
+def get_backend(name: str = STT_BACKEND) -> STTBackend:
+    if name == "http":
+        if not STT_URL:
+            raise RuntimeError("STT_URL not set for the http STT backend")
+        return HTTPSTTBackend()
+    return GroqSTTBackend()
+
+# ===== CHUNKING =====
+
+def _frame_rms(frames: bytes, sampwidth: int) -> float:
+    if sampwidth != 2 or not frames:
+        return 0.0
+    samples = array.array("h", frames[:len(frames) - len(frames) % 2])
+    if not samples:
+        return 0.0
+    # every 4th sample is plenty to find a quiet spot
+    step = samples[::4]
+    return (sum(s * s for s in step) / len(step)) ** 0.5
+
+def _quietest_offset(wf: wave.Wave_read, start: int, end: int) -> int:
+    """Frame index of the quietest _FRAME_MS slice in [start, end)."""
+    rate, width = wf.getframerate(), wf.getsampwidth()
+    step = max(1, rate * _FRAME_MS // 1000)
+    wf.setpos(start)
+    best, best_rms = end, float("inf")
+    pos = start
+    while pos + step <= end:
+        rms = _frame_rms(wf.readframes(step), width)
+        if rms < best_rms:
+            best, best_rms = pos + step // 2, rms
+        pos += step
+    return best
+
+def plan_chunks(path: str, chunk_seconds: float = STT_CHUNK_SECONDS,
+                silence_search: float = STT_SILENCE_SEARCH) -> List[Tuple[int, int]]:
+    """(start_frame, end_frame) boundaries for a WAV file, cut at the quietest nearby point."""
+    with wave.open(path, "rb") as wf:
+        rate, total = wf.getframerate(), wf.getnframes()
+        window, search = int(chunk_seconds * rate), int(silence_search * rate)
+        bounds, start = [], 0
+        while start < total:
+            end = min(start + window, total)
+            if end < total and search > 0 and wf.getsampwidth() == 2:
+                end = _quietest_offset(wf, max(start + 1, end - search), end)
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+def _chunk_wav(path: str, start: int, end: int) -> bytes:
+    with wave.open(path, "rb") as src:
+        src.setpos(start)
+        frames = src.readframes(end - start)
+        out = io.BytesIO()
+        with wave.open(out, "wb") as dst:
+            dst.setnchannels(src.getnchannels())
+            dst.setsampwidth(src.getsampwidth())
+            dst.setframerate(src.getframerate())
+            dst.writeframes(frames)
+    return out.getvalue()
+
+def _to_wav(path: str) -> Optional[str]:
+    """Convert any audio to 16 kHz mono WAV with ffmpeg; None when ffmpeg isn't available."""
+    if not shutil.which("ffmpeg"):
+        return None
+    fd, out = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    proc = subprocess.run(["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", path, "-ac", "1", "-ar", "16000", out])
+    if proc.returncode != 0:
+        os.unlink(out)
+        return None
+    return out
+
+def _is_wav(path: str) -> bool:
+    try:
+        with wave.open(path, "rb"):
+            return True
+    except (wave.Error, EOFError):
+        return False
+
+# ===== TRANSCRIPTION =====
+
+async def iter_transcript(path: str, backend: Optional[STTBackend] = None,
+                          chunk_seconds: float = STT_CHUNK_SECONDS,
+                          concurrency: int = STT_CONCURRENCY) -> AsyncIterator[Dict]:
+    """Yield {index, start, end, text} per chunk in completion order (not necessarily time order)."""
+    backend = backend or get_backend()
+    converted = None
+    wav_path = path
+    if not _is_wav(path):
+        converted = await asyncio.to_thread(_to_wav, path)
+        if converted is None:
+            # no way to split it; send the file as one chunk (size-capped, streamed from disk)
+            from media_fetch import open_media
+            with open_media(path, "audio") as buf:
+                text = await backend.transcribe(buf.fileobj(), os.path.basename(path))
+            yield {"index": 0, "start": 0.0, "end": None, "text": text}
+            return
+        wav_path = converted
+
+    try:
+        bounds = await asyncio.to_thread(plan_chunks, wav_path, chunk_seconds)
+        with wave.open(wav_path, "rb") as wf:
+            rate = wf.getframerate()
+        results: asyncio.Queue = asyncio.Queue()
+        pending = iter(enumerate(bounds))
+
+        async def worker():
+            for index, (start, end) in pending:
+                seg = {"index": index, "start": round(start / rate, 2), "end": round(end / rate, 2)}
+                try:
+                    wav = await asyncio.to_thread(_chunk_wav, wav_path, start, end)
+                    seg["text"] = await backend.transcribe(wav, f"chunk{index:05d}.wav")
+                except Exception as e:
+                    print(f"⚠️ STT chunk {index} failed: {e}")
+                    seg["text"], seg["error"] = "", str(e)
+                await results.put(seg)
+
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, len(bounds))))]
+        try:
+            for _ in range(len(bounds)):
+                yield await results.get()
+        finally:
+            for w in workers:
+                w.cancel()
+    finally:
+        if converted:
+            os.unlink(converted)
+
+def _clock(seconds: Optional[float]) -> str:
+    s = int(seconds or 0)
+    return f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}"
+
+def stitch(segments: List[Dict]) -> str:
+    return "\n".join(f"[{_clock(s['start'])}] {s['text']}" for s in sorted(segments, key=lambda s: s["index"])
+                     if s.get("text"))
+
+async def transcribe_file(path: str, backend: Optional[STTBackend] = None) -> Tuple[str, List[Dict]]:
+    segments = [seg async for seg in iter_transcript(path, backend)]
+    segments.sort(key=lambda s: s["index"])
+    return stitch(segments), segments
@@ -3,10 +3,18 @@ import os
 import httpx
 from typing import List, Dict, Any
 import asyncio
+from cassette import async_client
+from metrics import register_provider
+from tracing import traced
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
-FACTCHECK_URL = "https://factchecktools.googleapis.com/v1alpha1/claims:search"
+# Endpoints are overridable so load tests can point at stub_apis.py instead of the real services
+FACTCHECK_URL = os.getenv("FACTCHECK_URL", "https://factchecktools.googleapis.com/v1alpha1/claims:search")
+NEWSDATA_URL = os.getenv("NEWSDATA_URL", "https://newsdata.io/api/1/news")
+register_provider(FACTCHECK_URL, "google_factcheck")
+register_provider(NEWSDATA_URL, "newsdata")
 
+@traced("newsdata_search")
 async def _search_newsdata(query: str, max_results: int = 5) -> List[Dict]:
     """Enhanced news search with better error handling"""
     key = os.getenv("NEWSDATA_API_KEY", "")
@@ -16,8 +24,8 @@ async def _search_newsdata(query: str, max_results: int = 5) -> List[Dict]:
     
     try:
         params = {"apikey": key, "q": query, "language": "en", "page": 1}
-        async with httpx.AsyncClient(timeout=15) as client:
-            r = await client.get("https://newsdata.io/api/1/news", params=params)
+        async with async_client(timeout=15) as client:
+            r = await client.get(NEWSDATA_URL, params=params)
             if r.status_code != 200:
                 print(f"⚠️ NewsData API error: {r.status_code}")
                 return []
@@ -27,6 +35,7 @@ async def _search_newsdata(query: str, max_results: int = 5) -> List[Dict]:
         print(f"⚠️ NewsData search error: {e}")
         return []
 
+@traced("google_factcheck_search")
 async def google_factcheck_search(query: str, max_results: int = 5) -> List[Dict]:
     """Enhanced Google Fact Check with better error handling"""
     if not GOOGLE_API_KEY:
@@ -35,7 +44,7 @@ async def google_factcheck_search(query: str, max_results: int = 5) -> List[Dict
     
     try:
         params = {"query": query, "key": GOOGLE_API_KEY, "pageSize": max_results}
-        async with httpx.AsyncClient(timeout=15) as client:
+        async with async_client(timeout=15) as client:
             r = await client.get(FACTCHECK_URL, params=params)
             if r.status_code != 200:
                 print(f"⚠️ Google Fact Check API error: {r.status_code}")
@@ -90,6 +99,7 @@ def is_credible_source(article: Dict) -> bool:
     source = article.get('source_id', '').lower()
     return any(credible in source for credible in credible_sources)
 
+@traced("verify_claim", root=True)
 async def verify_claim(claim: str) -> Dict[str, Any]:
     """Enhanced verification with better error handling"""
     try:
@@ -1,62 +1,107 @@
 # voice_of_doctor.py
 """
 Safe ElevenLabs TTS wrapper.
-- text_to_speech_with_elevenlabs(text, filename, voice=None) -> filepath or None
+- text_to_speech_with_elevenlabs(text, filename=None, voice=None) -> filepath or None
+- await text_to_speech_async(text, voice=None) -> filepath or None   # runs in a worker pool
+Audio is cached on disk by sha256(text + voice) under TTS_CACHE_DIR, so a correction that is
+broadcast many times is synthesized once. Files are written atomically under their own hash,
+the cache is trimmed least-recently-used past TTS_CACHE_MAX_BYTES, and concurrent requests for
+the same text share one synthesis.
 No network calls on import. Raises ValueError if API key missing when called.
 Works with multiple client versions by attempting a few common interfaces.
 """
 
 import os
-from typing import Optional
-
-# Try to import elevenlabs client functions (best-effort)
-try:
-    # new official client or community clients may differ
-    # import dynamically to avoid static import-time errors in editors/linters
-    import importlib
-    spec = importlib.util.find_spec("elevenlabs")
-    if spec is not None:
-        module = importlib.import_module("elevenlabs")
-        # common names; some clients expose helpers at package level
-        generate = getattr(module, "generate", None)
-        save = getattr(module, "save", None)
-        voices = getattr(module, "voices", None)
-        # ApiError may be in elevenlabs.core.api_error
-        try:
-            api_err_module = importlib.import_module("elevenlabs.core.api_error")
-            ApiError = getattr(api_err_module, "ApiError", Exception)
-        except Exception:
-            ApiError = Exception
-        _ELEVEN_OK = True
-    else:
-        generate = None
-        save = None
-        voices = None
-        ApiError = Exception
-        _ELEVEN_OK = False
-except Exception:
-    generate = None
-    save = None
-    voices = None
-    ApiError = Exception
-    _ELEVEN_OK = False
+import re
+import shutil
+import asyncio
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from lazy_imports import optional
+
+def _elevenlabs():
+    """(generate, save, ApiError) from the elevenlabs client, imported on first synthesis (best-effort)."""
+    module = optional("elevenlabs")
+    if module is None:
+        return None, None, Exception
+    # common names; some clients expose helpers at package level
+    # ApiError may be in elevenlabs.core.api_error
+    api_err_module = optional("elevenlabs.core.api_error")
+    return (getattr(module, "generate", None), getattr(module, "save", None),
+            getattr(api_err_module, "ApiError", Exception))
 
 def _get_elevenlabs_key() -> Optional[str]:
     return os.getenv("ELEVENLABS_API_KEY") or os.getenv("ELEVEN_LABS_API_KEY") or os.getenv("XI_API_KEY")
 
-def text_to_speech_with_elevenlabs(text: str, filename: str = "tts_output.mp3", voice: Optional[str] = None) -> Optional[str]:
-    """
-    Convert text -> speech via ElevenLabs.
-    Returns the output filepath on success, else None.
-    Raises ValueError if no API key is present.
-    """
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts_cache"))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "2"))
+
+_cache_lock = threading.Lock()
+_cache_bytes: Optional[int] = None          # running total, computed on first use
+_inflight: Dict[str, Future] = {}
+_pool: Optional[ThreadPoolExecutor] = None
+
+def tts_cache_key(text: str, voice: Optional[str] = None) -> str:
+    normalized = re.sub(r"\s+", " ", (text or "").strip())
+    return hashlib.sha256(f"{voice or ''}\x00{normalized}".encode("utf-8")).hexdigest()
+
+def _cache_path(key: str) -> str:
+    return os.path.join(TTS_CACHE_DIR, key[:2], key + ".mp3")
+
+def _cache_files():
+    for root, _, files in os.walk(TTS_CACHE_DIR):
+        for name in files:
+            if name.endswith(".mp3"):
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+def _account(added: int):
+    """Track cache size; past the cap, drop least-recently-used files down to 90% of it."""
+    global _cache_bytes
+    with _cache_lock:
+        if _cache_bytes is None:
+            _cache_bytes = sum(size for _, size, _ in _cache_files())
+        else:
+            _cache_bytes += added
+        if _cache_bytes <= TTS_CACHE_MAX_BYTES:
+            return
+        target = int(TTS_CACHE_MAX_BYTES * 0.9)
+        for path, size, _ in sorted(_cache_files(), key=lambda f: f[2]):
+            if _cache_bytes <= target:
+                break
+            try:
+                os.unlink(path)
+                _cache_bytes -= size
+            except OSError:
+                pass
+
+def _touch(path: str) -> bool:
+    """Bump a cached file's LRU clock (its mtime); False when it is missing or was just evicted."""
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+def _synthesize(text: str, filename: str, voice: Optional[str]) -> Optional[str]:
+    """Uncached ElevenLabs call writing to filename."""
     api_key = _get_elevenlabs_key()
     if not api_key:
         raise ValueError("ElevenLabs API key missing. Set ELEVENLABS_API_KEY in environment or .env")
 
     # ensure client sees the key (some clients read env var)
     os.environ["ELEVENLABS_API_KEY"] = api_key
-    if not _ELEVEN_OK:
+    generate, save, ApiError = _elevenlabs()
+    if generate is None:
         print("ElevenLabs client library not available. Install 'elevenlabs' package or adapt this function.")
         return None
 
@@ -87,6 +132,71 @@ def text_to_speech_with_elevenlabs(text: str, filename: str = "tts_output.mp3",
         print("ElevenLabs TTS generation error:", e)
         return None
 
+def _cached_tts(text: str, voice: Optional[str]) -> Optional[str]:
+    key = tts_cache_key(text, voice)
+    path = _cache_path(key)
+    if _touch(path):
+        return path
+
+    with _cache_lock:
+        fut = _inflight.get(key)
+        owner = fut is None
+        if owner:
+            fut = _inflight[key] = Future()
+    if not owner:
+        return fut.result()
+
+    result = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix=".mp3.part", dir=os.path.dirname(path))
+        os.close(fd)
+        try:
+            if _synthesize(text, tmp, voice) and os.path.getsize(tmp) > 0:
+                os.replace(tmp, path)       # atomic: readers never see a half-written file
+                result = path
+                _account(os.path.getsize(path))
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        return result
+    finally:
+        with _cache_lock:
+            _inflight.pop(key, None)
+        fut.set_result(result)
+
+def text_to_speech_with_elevenlabs(text: str, filename: Optional[str] = None, voice: Optional[str] = None) -> Optional[str]:
+    """
+    Convert text -> speech via ElevenLabs (cached).
+    Returns the cached file path, or a copy at filename when one is given; None on failure.
+    Raises ValueError if no API key is present.
+    """
+    for _ in range(2):
+        path = _cached_tts(text, voice)
+        if not path or not filename:
+            return path
+        # _account() evicts under the same lock, so the file can't vanish mid-copy
+        with _cache_lock:
+            if os.path.exists(path):
+                shutil.copyfile(path, filename)
+                return filename
+        # evicted between lookup and copy: synthesize it again
+    return None
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=TTS_WORKERS, thread_name_prefix="tts")
+    return _pool
+
+async def text_to_speech_async(text: str, voice: Optional[str] = None) -> Optional[str]:
+    """Cached TTS off the event loop; cache hits return without touching the pool."""
+    path = _cache_path(tts_cache_key(text, voice))
+    if _touch(path):
+        return path
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor(), _cached_tts, text, voice)
+
 if __name__ == "__main__":
-    print("voice_of_doctor module loaded. Call text_to_speech_with_elevenlabs(text, filename).")
+    print("voice_of_doctor module loaded. Call text_to_speech_with_elevenlabs(text) or await text_to_speech_async(text).")
 
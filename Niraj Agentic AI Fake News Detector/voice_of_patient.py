@@ -8,16 +8,14 @@ No network calls on import. Raises RuntimeError if groq client missing or API ke
 import os
 from typing import Optional
 
-# Try to import Groq client if available (use importlib to avoid static analysis errors when package is not installed)
-try:
-    import importlib
-    groq_mod = importlib.import_module("groq")
+from media_fetch import open_media
+from lazy_imports import optional, TEXT_ONLY
+
+def _groq_client_class():
+    # groq is imported on the first transcription, not when this module loads
+    groq_mod = optional("groq")
     # prefer an exported Groq symbol if present, otherwise use the module itself
-    Groq = getattr(groq_mod, "Groq", groq_mod)
-    _GROQ_OK = True
-except Exception:
-    Groq = None
-    _GROQ_OK = False
+    return getattr(groq_mod, "Groq", groq_mod) if groq_mod is not None else None
 
 def transcribe_with_groq(GROQ_API_KEY: Optional[str] = None, stt_model: str = "whisper-large-v3", audio_filepath: str = None) -> str:
     """
@@ -27,7 +25,10 @@ def transcribe_with_groq(GROQ_API_KEY: Optional[str] = None, stt_model: str = "w
     key = GROQ_API_KEY or os.getenv("GROQ_API_KEY") or os.getenv("GROQ_APIKEY")
     if not key:
         raise RuntimeError("GROQ_API_KEY not provided. Set GROQ_API_KEY env var or pass it to transcribe_with_groq().")
-    if not _GROQ_OK:
+    if TEXT_ONLY:
+        raise RuntimeError("Speech-to-text is disabled in the text-only profile (DEPLOYMENT_PROFILE=text).")
+    Groq = _groq_client_class()
+    if Groq is None:
         raise RuntimeError("Groq client not installed. Install 'groq' package or implement a fallback STT method.")
 
     client = Groq(api_key=key)
@@ -37,9 +38,9 @@ def transcribe_with_groq(GROQ_API_KEY: Optional[str] = None, stt_model: str = "w
     try:
         # Preferred: a dedicated transcription method (pseudocode)
         if hasattr(client, "speech") and hasattr(client.speech, "transcriptions"):
-            with open(audio_filepath, "rb") as f:
-                audio_bytes = f.read()
-            result = client.speech.transcriptions.create(model=stt_model, file=audio_bytes)
+            # hand the client the (size-checked) file handle instead of a bytes copy
+            with open_media(audio_filepath, "audio") as buf:
+                result = client.speech.transcriptions.create(model=stt_model, file=buf.fileobj())
             # adapt to returned structure
             return result.get("text") or result.get("transcript") or str(result)
         else:
@@ -53,9 +54,14 @@ def transcribe_with_groq(GROQ_API_KEY: Optional[str] = None, stt_model: str = "w
         raise RuntimeError(f"Groq STT error: {e}")
 
 def _encode_file_base64(path: str) -> str:
+    # only the remote chat fallback needs a data: URL; encode straight from the mmap view
     import base64
-    with open(path, "rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
+    with open_media(path, "audio") as buf:
+        view = buf.view()
+        try:
+            return base64.b64encode(view).decode("utf-8")
+        finally:
+            view.release()
 
 if __name__ == "__main__":
     print("voice_of_patient module loaded. Use transcribe_with_groq(GROQ_API_KEY, stt_model, audio_filepath).")
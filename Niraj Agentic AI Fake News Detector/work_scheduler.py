@@ -0,0 +1,416 @@
+# work_scheduler.py
+"""
+Admission control for work that competes for external API quota and CPU.
+- Priority classes: interactive (/api/analyze) > review (re-checks from the human review desk)
+  > background (agent ingest). Freed slots go to the highest-priority waiter first
+- Per-class concurrency limits plus a total; WORK_INTERACTIVE_RESERVE slots of the total are
+  never given to lower classes, so an agent cycle can't fill every slot
+- The wait for a slot is a "queue:<class>" span in the current trace (tracing.py)
+- Load shedding: interactive/review work waits at most WORK_<CLASS>_MAX_WAIT_MS (and only if
+  fewer than WORK_<CLASS>_MAX_QUEUE are already waiting); otherwise it is refused at once and the
+  caller answers from the local tiers instead. Background work just waits its turn
+- with get_scheduler().slot("interactive") as admitted: ...         # threads (Flask views)
+- async with get_scheduler().aslot("background") as admitted: ...   # coroutines (agents)
+With SHARED_STATE=1 (serve.py) every process keeps its running/waiting counts in the shared
+SQLite store and the limits apply to all web workers and the agent process together. A slot freed
+in another process notifies nobody here, so while anything waits one thread per process re-checks
+every WORK_SHARED_POLL_MS. Decisions read the other processes' counts without a write lock, so
+two processes admitting at the same instant can overshoot a shared limit until one releases.
+"""
+
+import os
+import time
+import heapq
+import atexit
+import asyncio
+import sqlite3
+import itertools
+import functools
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+from metrics import Counter, Histogram, register_collector
+from tracing import span
+from shared_state import SHARED_STATE_ENABLED, SHARED_STATE_PATH, _connect
+
+INTERACTIVE, REVIEW, BACKGROUND = "interactive", "review", "background"
+CLASSES = (INTERACTIVE, REVIEW, BACKGROUND)     # in priority order
+
+WORK_MAX_CONCURRENCY = int(os.getenv("WORK_MAX_CONCURRENCY", "8"))
+WORK_INTERACTIVE_RESERVE = int(os.getenv("WORK_INTERACTIVE_RESERVE", "2"))
+# 0 = no limit / wait forever
+DEFAULT_LIMITS = {INTERACTIVE: 8, REVIEW: 4, BACKGROUND: 3}
+DEFAULT_MAX_WAIT_MS = {INTERACTIVE: 250, REVIEW: 2000, BACKGROUND: 0}
+DEFAULT_MAX_QUEUE = {INTERACTIVE: 32, REVIEW: 32, BACKGROUND: 0}
+WORK_SHARED_POLL_MS = int(os.getenv("WORK_SHARED_POLL_MS", "20"))
+WORK_SHARED_REAP_SECONDS = 5.0
+
+WORK_ADMISSIONS = Counter("sachbol_work_admissions", "Scheduler decisions by class", ("class", "outcome"))
+WORK_WAIT_SECONDS = Histogram("sachbol_work_wait_seconds", "Time queued before admission", ("class",),
+                              buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30))
+
+def _env_int(cls: str, name: str, default: int) -> int:
+    return int(os.getenv(f"WORK_{cls.upper()}_{name}", str(default)))
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "cls", "notify", "state")
+
+    def __init__(self, priority: int, seq: int, cls: str, notify):
+        self.priority = priority
+        self.seq = seq
+        self.cls = cls
+        self.notify = notify            # called (outside the lock) when the slot is granted
+        self.state = "waiting"          # -> "granted" | "cancelled"
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+def _alive(pid: int) -> bool:
+    if os.name != "posix":
+        return True                     # os.kill(pid, 0) terminates the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+class _SharedCounts:
+    """
+    Running/waiting counts of every process using the same store, one row per (pid, class).
+    read() is a plain SELECT; publish() takes the write lock and is only called when this process's
+    counts changed. Rows of processes that are gone are dropped (serve.py also forgets each child
+    it restarts).
+    """
+
+    def __init__(self, path: str = SHARED_STATE_PATH, pid: Optional[int] = None):
+        self.pid = pid or os.getpid()
+        self._conn = _connect(path)
+        self._conn.isolation_level = None          # transactions are explicit
+        self._conn.execute("CREATE TABLE IF NOT EXISTS work_slots (pid INTEGER, cls TEXT, "
+                           "running INTEGER, waiting INTEGER, PRIMARY KEY (pid, cls))")
+        self._conn.execute("DELETE FROM work_slots WHERE pid = ?", (self.pid,))   # an earlier owner of the pid
+        self._lock = threading.Lock()               # read() runs outside the scheduler's lock
+        self._last_reap = 0.0
+        atexit.register(self.close)
+
+    def read(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """The other processes' running and waiting counts."""
+        running, waiting = {c: 0 for c in CLASSES}, {c: 0 for c in CLASSES}
+        with self._lock:
+            rows = self._conn.execute("SELECT cls, SUM(running), SUM(waiting) FROM work_slots "
+                                      "WHERE pid != ? GROUP BY cls", (self.pid,)).fetchall()
+        for cls, r, w in rows:
+            if cls in running:
+                running[cls], waiting[cls] = r, w
+        return running, waiting
+
+    def publish(self, running: Dict[str, int], waiting: Dict[str, int]):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.monotonic()
+                if now - self._last_reap > WORK_SHARED_REAP_SECONDS:
+                    self._last_reap = now
+                    pids = self._conn.execute("SELECT DISTINCT pid FROM work_slots WHERE pid != ?", (self.pid,))
+                    dead = [(pid,) for (pid,) in pids.fetchall() if not _alive(pid)]
+                    self._conn.executemany("DELETE FROM work_slots WHERE pid = ?", dead)
+                self._conn.executemany("INSERT OR REPLACE INTO work_slots VALUES (?, ?, ?, ?)",
+                                       [(self.pid, c, running[c], waiting[c]) for c in CLASSES])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        forget_process(self.pid, conn=self._conn)
+
+def forget_process(pid: int, path: str = SHARED_STATE_PATH, conn: Optional[sqlite3.Connection] = None):
+    """Drop a process's shared counts (it exited, so its slots are free)."""
+    try:
+        conn = conn or _connect(path)
+        conn.execute("DELETE FROM work_slots WHERE pid = ?", (pid,))
+        conn.commit()
+    except sqlite3.Error:
+        pass
+
+class WorkScheduler:
+    def __init__(self, total: int = WORK_MAX_CONCURRENCY, reserve: int = WORK_INTERACTIVE_RESERVE,
+                 limits: Optional[Dict[str, int]] = None, max_wait_ms: Optional[Dict[str, int]] = None,
+                 max_queue: Optional[Dict[str, int]] = None, shared: Optional[_SharedCounts] = None,
+                 poll_ms: int = WORK_SHARED_POLL_MS):
+        self.total = total
+        self.reserve = min(reserve, max(0, total - 1))
+        self.limits = limits or {c: _env_int(c, "LIMIT", DEFAULT_LIMITS[c]) for c in CLASSES}
+        self.max_wait = {c: ms / 1000 for c, ms in (max_wait_ms or {
+            c: _env_int(c, "MAX_WAIT_MS", DEFAULT_MAX_WAIT_MS[c]) for c in CLASSES}).items()}
+        self.max_queue = max_queue or {c: _env_int(c, "MAX_QUEUE", DEFAULT_MAX_QUEUE[c]) for c in CLASSES}
+        self._lock = threading.Lock()
+        self._heap: List[_Waiter] = []
+        self._seq = itertools.count()
+        self.running = {c: 0 for c in CLASSES}
+        self.waiting = {c: 0 for c in CLASSES}
+        self._shared = shared
+        self._poll = poll_ms / 1000
+        self._poller: Optional[threading.Thread] = None
+        # other processes' counts as of the last read
+        self._others_running = {c: 0 for c in CLASSES}
+        self._others_waiting = {c: 0 for c in CLASSES}
+        self._outcomes = {c: {o: WORK_ADMISSIONS.labels(c, o) for o in ("admitted", "queued", "shed")}
+                          for c in CLASSES}
+        self._waits = {c: WORK_WAIT_SECONDS.labels(c) for c in CLASSES}
+
+    # ----- core (called with the lock held) -----
+
+    @contextmanager
+    def _synced(self):
+        """The lock; in shared mode the other processes' counts are read just before it is taken,
+        and this process's are written back at the end if they changed."""
+        others = None
+        if self._shared is not None:
+            try:
+                others = self._shared.read()
+            except sqlite3.Error as e:
+                print(f"⚠️ Shared work counts unavailable ({e}); using the last known ones")
+        with self._lock:
+            if self._shared is None:
+                yield
+                return
+            if others is not None:
+                self._others_running, self._others_waiting = others
+            before = (dict(self.running), dict(self.waiting))
+            try:
+                yield
+            finally:
+                if (self.running, self.waiting) != before:
+                    try:
+                        self._shared.publish(self.running, self.waiting)
+                    except sqlite3.Error as e:
+                        print(f"⚠️ Could not publish work counts: {e}")
+                if any(self.waiting.values()) and self._poller is None:
+                    self._poller = threading.Thread(target=self._poll_loop, name="work-scheduler-poll",
+                                                    daemon=True)
+                    self._poller.start()
+
+    def _poll_loop(self):
+        """One per process while anything waits: picks up slots freed by other processes."""
+        while True:
+            time.sleep(self._poll)
+            with self._lock:
+                if not any(self.waiting.values()):
+                    self._poller = None
+                    return
+            self._recheck()
+
+    def _at_limit(self, cls: str) -> bool:
+        limit = self.limits[cls]
+        return bool(limit) and self.running[cls] + self._others_running[cls] >= limit
+
+    def _fits(self, cls: str) -> bool:
+        if self._at_limit(cls):
+            return False
+        cap = self.total if cls == INTERACTIVE else self.total - self.reserve
+        return sum(self.running.values()) + sum(self._others_running.values()) < cap
+
+    def _remote_ahead(self, priority: int) -> bool:
+        """Another process has higher-priority work waiting that could go now."""
+        return any(self._others_waiting[c] and self._fits(c) for c in CLASSES[:priority])
+
+    def _dispatch(self) -> List[_Waiter]:
+        """Grant freed slots in priority order; a waiter blocked only by the total keeps lower
+        classes from overtaking it."""
+        granted, skipped = [], []
+        while self._heap:
+            waiter = heapq.heappop(self._heap)
+            if waiter.state != "waiting":
+                continue
+            if self._fits(waiter.cls) and not self._remote_ahead(waiter.priority):
+                waiter.state = "granted"
+                self.waiting[waiter.cls] -= 1
+                self.running[waiter.cls] += 1
+                granted.append(waiter)
+                continue
+            skipped.append(waiter)
+            if not self._at_limit(waiter.cls):
+                break                   # out of total capacity: nobody behind it may go first
+        for waiter in skipped:
+            heapq.heappush(self._heap, waiter)
+        return granted
+
+    def _enter(self, cls: str, notify) -> Optional[_Waiter]:
+        """Admit at once (returns None), shed (raises _Shed) or queue (returns the waiter)."""
+        if cls not in self.running:
+            raise ValueError(f"unknown work class: {cls}")
+        priority = CLASSES.index(cls)
+        with self._synced():
+            # same rule as _dispatch: only a waiter that could go now is ahead of this one
+            higher_waiting = self._remote_ahead(priority) or any(
+                w.state == "waiting" and w.priority <= priority and self._fits(w.cls) for w in self._heap)
+            if not higher_waiting and self._fits(cls):
+                self.running[cls] += 1
+                self._outcomes[cls]["admitted"].inc()
+                return None
+            max_queue = self.max_queue[cls]
+            if max_queue and self.waiting[cls] >= max_queue:
+                self._outcomes[cls]["shed"].inc()
+                raise _Shed()
+            waiter = _Waiter(priority, next(self._seq), cls, notify)
+            self.waiting[cls] += 1
+            heapq.heappush(self._heap, waiter)
+            self._outcomes[cls]["queued"].inc()
+            return waiter
+
+    def _cancel(self, waiter: _Waiter, shed: bool = True) -> bool:
+        """Give up waiting; False if the slot was granted in the meantime (caller now holds it)."""
+        with self._synced():
+            if waiter.state == "granted":
+                return False
+            waiter.state = "cancelled"
+            self.waiting[waiter.cls] -= 1
+            if shed:
+                self._outcomes[waiter.cls]["shed"].inc()
+            return True
+
+    def release(self, cls: str):
+        with self._synced():
+            self.running[cls] -= 1
+            granted = self._dispatch()
+        for waiter in granted:
+            waiter.notify()
+
+    def _recheck(self):
+        """Dispatch again with fresh shared counts (slots freed by other processes)."""
+        with self._synced():
+            granted = self._dispatch()
+        for waiter in granted:
+            waiter.notify()
+
+    def _abandon(self, cls: str, entering: "asyncio.Future"):
+        """The caller was cancelled while _enter ran in a thread: undo whatever it decided."""
+        if entering.cancelled() or entering.exception() is not None:
+            return
+        waiter = entering.result()
+        if waiter is None or not self._cancel(waiter, shed=False):
+            self.release(cls)
+
+    async def _off_loop(self, fn, *args):
+        """fn(*args) in a worker thread when it touches the shared store, inline otherwise."""
+        if self._shared is None:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    # ----- public -----
+
+    def acquire(self, cls: str, timeout: Optional[float] = None) -> bool:
+        """Blocking acquire; False when shed. timeout defaults to the class's max wait."""
+        event = threading.Event()
+        try:
+            waiter = self._enter(cls, event.set)
+        except _Shed:
+            return False
+        if waiter is None:
+            return True
+        start = time.perf_counter()
+        timeout = self.max_wait[cls] if timeout is None else timeout
+        if not event.wait(timeout or None) and self._cancel(waiter):
+            return False
+        self._waits[cls].observe(time.perf_counter() - start)
+        return True
+
+    async def aacquire(self, cls: str, timeout: Optional[float] = None) -> bool:
+        """acquire() for coroutines: waits on a future, never blocks the event loop."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def notify():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(True))
+
+        try:
+            if self._shared is None:
+                waiter = self._enter(cls, notify)
+            else:
+                entering = asyncio.ensure_future(asyncio.to_thread(self._enter, cls, notify))
+                try:
+                    waiter = await asyncio.shield(entering)
+                except asyncio.CancelledError:
+                    entering.add_done_callback(functools.partial(self._abandon, cls))
+                    raise
+        except _Shed:
+            return False
+        if waiter is None:
+            return True
+        start = time.perf_counter()
+        timeout = self.max_wait[cls] if timeout is None else timeout
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout or None)
+        except asyncio.TimeoutError:
+            if await self._off_loop(self._cancel, waiter):
+                return False
+        except asyncio.CancelledError:
+            # inline even in shared mode: awaiting here could be cancelled again and leak the slot
+            if not self._cancel(waiter, shed=False):
+                self.release(cls)
+            raise
+        self._waits[cls].observe(time.perf_counter() - start)
+        return True
+
+    @contextmanager
+    def slot(self, cls: str, timeout: Optional[float] = None):
+        """Yields True when admitted (the slot is released on exit), False when shed."""
+        with span("queue:" + cls) as s:
+            admitted = self.acquire(cls, timeout)
+            s.set(admitted=admitted)
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release(cls)
+
+    @asynccontextmanager
+    async def aslot(self, cls: str, timeout: Optional[float] = None):
+        with span("queue:" + cls) as s:
+            admitted = await self.aacquire(cls, timeout)
+            s.set(admitted=admitted)
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                await self._off_loop(self.release, cls)
+
+    def saturated(self, cls: str = INTERACTIVE) -> bool:
+        with self._lock:
+            return not self._fits(cls)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            snap = {"total": self.total, "reserve": self.reserve, "limits": dict(self.limits),
+                    "running": dict(self.running), "waiting": dict(self.waiting)}
+            if self._shared is not None:
+                snap["other_processes"] = {"running": dict(self._others_running),
+                                           "waiting": dict(self._others_waiting)}
+            return snap
+
+class _Shed(Exception):
+    pass
+
+_scheduler: Optional[WorkScheduler] = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> WorkScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = WorkScheduler(shared=_SharedCounts() if SHARED_STATE_ENABLED else None)
+    return _scheduler
+
+@register_collector
+def _collect():
+    if _scheduler is None:
+        return
+    snap = _scheduler.snapshot()
+    for cls in CLASSES:
+        yield "sachbol_work_running", "gauge", "Work in flight by class", {"class": cls}, snap["running"][cls]
+        yield "sachbol_work_waiting", "gauge", "Work queued by class", {"class": cls}, snap["waiting"][cls]